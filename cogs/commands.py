@@ -4,10 +4,11 @@ from discord.ext import commands
 import sqlite3
 from typing import List
 from os import kill, path
-import aiohttp, aiofiles, asyncio, os, string, re, json, datetime, random
+import aiohttp, aiofiles, asyncio, io, os, string, re, json, datetime, random
 from config import Config
-from utils.heatmap import generate_heatmap
+from utils.heatmap_renderer import renderer
 from utils.nitradoFuncs import NitradoFunctions
+from utils.nitrado_client import client, NITRADO_API_URL
 import logging
 import typing
 from typing import Union
@@ -30,26 +31,28 @@ Nitrado = NitradoFunctions()
 
 # Initialize consolidated database
 from utils import killfeed_database
+from utils.killfeed_db_executor import database
 killfeed_database.initialize_master_db()
+killfeed_database.ensure_rank_index()
 
-# Wrapper functions for backward compatibility
-def is_device_id_banned(device_id):
-    return killfeed_database.is_device_id_banned(device_id)
+# Wrapper functions for backward compatibility (queries run on the database executor)
+async def is_device_id_banned(device_id):
+    return await database.is_device_id_banned(device_id)
 
-def get_device_id_from_stats(username):
-    return killfeed_database.get_device_id_from_stats(username)
+async def get_device_id_from_stats(username):
+    return await database.get_device_id_from_stats(username)
 
-def get_all_banned_users():
-    return killfeed_database.get_all_banned_users()
+async def get_all_banned_users():
+    return await database.get_all_banned_users()
 
-def unban_device_id(device_id):
-    killfeed_database.unban_device_id(device_id)
+async def unban_device_id(device_id):
+    await database.unban_device_id(device_id)
 
-def get_all_users_by_device_id(device_id):
-    return killfeed_database.get_all_users_by_device_id(device_id)
+async def get_all_users_by_device_id(device_id):
+    return await database.get_all_users_by_device_id(device_id)
 
-def get_user_uid(username):
-    return killfeed_database.get_player_uid(username)
+async def get_user_uid(username):
+    return await database.get_player_uid(username)
     
 
 categories = ("Build", "Death", "Kill", "Hit", "Heatmap", "BaseInteraction", "OnlineCount", 'DeathCount', 'KillCount', "BanNotification", "Connect", "Disconnect", "AltAlert", "AltBanned")
@@ -191,11 +194,11 @@ class Commands(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.command(name="addarea", description="Set a location to be listened to by flag event")
     async def addarea(self, interaction:discord.Interaction, x_coord:float, z_coord:float, radius:int, channel:discord.TextChannel, name:str):
-        regions = killfeed_database.get_regions()
+        regions = await database.get_regions()
         if len(regions) > 25:
             await interaction.response.send_message("You have more than 25 events. Please remove some before adding more.")
         else:
-            killfeed_database.insert_region(x_coord, z_coord, radius, channel.id, name)
+            await database.insert_region(x_coord, z_coord, radius, channel.id, name)
             await interaction.response.send_message(f"Listening to flags at {x_coord} {z_coord} and posting to {channel}")
             await interaction.guild.id
 
@@ -235,14 +238,8 @@ class Commands(commands.Cog):
     @app_commands.command(name="terminatelastbatch", description="Deletes most recent generated keys")
     async def terminatelastbatch(self, interaction:discord.Interaction):
         if len(self.lastbatch) > 0:
-            count = 0
-            conn = killfeed_database.get_connection()
-            cursor = conn.cursor()
-            for i in self.lastbatch:
-                cursor.execute("DELETE FROM codes WHERE code = ?", (i,))
-                count += 1
-            conn.commit()
-            conn.close()
+            count = len(self.lastbatch)
+            await database.delete_codes(self.lastbatch)
             await interaction.response.send_message(f"Deleted {count} entries")
             self.lastbatch = []
         else:
@@ -265,27 +262,27 @@ class Commands(commands.Cog):
         
         # Get device ID if username provided
         if username and not device_id:
-            device_id = get_device_id_from_stats(username)
+            device_id = await get_device_id_from_stats(username)
             if not device_id:
                 await interaction.followup.send(f"No device ID associated with {username}. Please provide the device ID manually.")
                 return
         
         # Check if already banned
-        if is_device_id_banned(device_id):
+        if await is_device_id_banned(device_id):
             await interaction.followup.send(f"Device ID {device_id} is already banned.")
             return
         
         # Get all accounts using this device
-        all_accounts = get_all_users_by_device_id(device_id)
+        all_accounts = await get_all_users_by_device_id(device_id)
         
         if not all_accounts:
             # If no accounts found, just mark it as banned in database
-            killfeed_database.insert_device_ban("Unknown", device_id)
+            await database.insert_device_ban("Unknown", device_id)
             await interaction.followup.send(f"No accounts found for Device ID {device_id}, but it has been marked as banned in the database.")
             return
         
         # Get all servers
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         if not servers_list:
             await interaction.followup.send("No servers configured. Cannot ban accounts.")
             return
@@ -308,7 +305,7 @@ class Commands(commands.Cog):
                     ban_results.append(f"{account} on server {server_id} - {str(e)}")
         
         # Mark device as banned in database
-        killfeed_database.insert_device_ban(all_accounts[0], device_id)
+        await database.insert_device_ban(all_accounts[0], device_id)
         
         # Send results
         result_text = "\n".join(ban_results)
@@ -334,26 +331,26 @@ class Commands(commands.Cog):
         await interaction.response.defer()
 
         if username and not device_id:
-            device_id = get_device_id_from_stats(username)
+            device_id = await get_device_id_from_stats(username)
             if not device_id:
                 await interaction.followup.send(f"No device ID associated with {username}.")
                 return
 
-        if not is_device_id_banned(device_id):
+        if not await is_device_id_banned(device_id):
             await interaction.followup.send(f"Device ID {device_id} is not banned.")
             return
 
         # Get all accounts using this device
-        all_accounts = get_all_users_by_device_id(device_id)
+        all_accounts = await get_all_users_by_device_id(device_id)
         
         if not all_accounts:
             # If no accounts found, just unban in database
-            unban_device_id(device_id)
+            await unban_device_id(device_id)
             await interaction.followup.send(f"Device ID {device_id} has been unbanned in the database (no accounts found).")
             return
         
         # Get all servers
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         if not servers_list:
             await interaction.followup.send("No servers configured. Cannot unban accounts.")
             return
@@ -376,7 +373,7 @@ class Commands(commands.Cog):
                     unban_results.append(f"{account} on server {server_id} - {str(e)}")
         
         # Unban device in database
-        unban_device_id(device_id)
+        await unban_device_id(device_id)
         
         # Send results
         result_text = "\n".join(unban_results)
@@ -394,16 +391,16 @@ class Commands(commands.Cog):
     @app_commands.command(name="querydevice", description="Query a player's device ID and all accounts on that device")
     async def querydevice(self, interaction: discord.Interaction, username: str):
         """Query device ID and connected accounts for a player."""
-        device_id = get_device_id_from_stats(username)
-        uid = get_user_uid(username)
+        device_id = await get_device_id_from_stats(username)
+        uid = await get_user_uid(username)
         
         if not device_id:
             await interaction.response.send_message(f"No device ID found for player **{username}**. Player may not have connected yet or uses a different device.", ephemeral=True)
             return
         
         # Get all accounts using this device
-        alt_accounts = get_all_users_by_device_id(device_id)
-        is_banned = is_device_id_banned(device_id)
+        alt_accounts = await get_all_users_by_device_id(device_id)
+        is_banned = await is_device_id_banned(device_id)
         
         embed = discord.Embed(
             title=f"Alt Account Investigation: {username}",
@@ -433,8 +430,8 @@ class Commands(commands.Cog):
     @app_commands.command(name="queryalts", description="Find all accounts on a specific device ID")
     async def queryalts(self, interaction: discord.Interaction, device_id: str):
         """Find all player accounts connected to a device ID."""
-        accounts = get_all_users_by_device_id(device_id)
-        is_banned = is_device_id_banned(device_id)
+        accounts = await get_all_users_by_device_id(device_id)
+        is_banned = await is_device_id_banned(device_id)
         
         embed = discord.Embed(
             title="Device Alt Accounts Query",
@@ -457,7 +454,7 @@ class Commands(commands.Cog):
 # Create a command to show all banned users with pagination
     @app_commands.command(name="viewbans", description="View all banned users and their device IDs.")
     async def viewbans(self, interaction: discord.Interaction):
-        banned_users = get_all_banned_users()
+        banned_users = await get_all_banned_users()
     
         page_size = 5
         total_pages = (len(banned_users) // page_size) + (1 if len(banned_users) % page_size > 0 else 0)
@@ -522,8 +519,8 @@ class Commands(commands.Cog):
     async def querydevice(self, interaction: discord.Interaction, username: str):
         """Get device ID and UID for a player."""
         try:
-            device_id = get_device_id_from_stats(username)
-            uid = killfeed_database.get_player_uid(username)
+            device_id = await get_device_id_from_stats(username)
+            uid = await database.get_player_uid(username)
             
             if device_id or uid:
                 embed = discord.Embed(
@@ -543,13 +540,13 @@ class Commands(commands.Cog):
                     embed.add_field(name="UID", value="Not recorded", inline=True)
                 
                 # Check if device is banned
-                if device_id and is_device_id_banned(device_id):
+                if device_id and await is_device_id_banned(device_id):
                     embed.add_field(name="Status", value="**BANNED**", inline=False)
                     embed.color = 0xFF0000
                 
                 # Get all alts on this device
                 if device_id:
-                    alts = killfeed_database.get_all_users_by_device_id(device_id)
+                    alts = await database.get_all_users_by_device_id(device_id)
                     if alts:
                         alt_count = len(alts)
                         alt_text = f"Found {alt_count} accounts on this device:\n"
@@ -569,7 +566,7 @@ class Commands(commands.Cog):
     async def queryalts(self, interaction: discord.Interaction, device_id: str):
         """Find all accounts using a specific device ID."""
         try:
-            alts = killfeed_database.get_all_users_by_device_id(device_id)
+            alts = await database.get_all_users_by_device_id(device_id)
             
             if alts:
                 embed = discord.Embed(
@@ -579,7 +576,7 @@ class Commands(commands.Cog):
                 )
                 
                 # Check if device is banned
-                is_banned = is_device_id_banned(device_id)
+                is_banned = await is_device_id_banned(device_id)
                 if is_banned:
                     embed.color = 0xFF0000
                     embed.add_field(name="Status", value="**BANNED**", inline=False)
@@ -608,12 +605,7 @@ class Commands(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.command(name="terminatebatch", description="Deletes most recent generated keys")
     async def terminatebatch(self, interaction:discord.Interaction, batchid:int):
-        conn = killfeed_database.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM codes WHERE batchid = ?", (batchid,))
-        rowcount = cursor.rowcount
-        conn.commit()
-        conn.close()
+        rowcount = await database.delete_code_batch(batchid)
         await interaction.response.send_message(f"Terminated {rowcount} codes from the database")
 
     @app_commands.checks.has_permissions(administrator=True)
@@ -635,10 +627,7 @@ class Commands(commands.Cog):
                     codes = []
                     raw_string = f''
                     try:
-                        conn = killfeed_database.get_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT code FROM codes")
-                        memory_db = [code[0] for code in cursor.fetchall()]
+                        memory_db = await database.get_all_codes()
                         batchid = len(memory_db) + 1
                         with open('logs/audit.txt', 'a') as log:
                             log.write(f'{interaction.user} ({interaction.user.id}) Generated {amount} {value.value} Keys in {interaction.channel.name} ({interaction.channel.id}) at {datetime.datetime.now().strftime("%m/%d/%Y, %I:%M %p")}\n')
@@ -655,11 +644,9 @@ class Commands(commands.Cog):
                             raw_code = ''.join(l + '-' * (n % 5 == 4) for n, l in enumerate(co))[:-1]
                             batch.append(raw_code)
                             raw_string = raw_string + raw_code
-                            cursor.execute("INSERT INTO codes (code, data, redeemed, batchid) VALUES (?,?,?,?)", (raw_code, value.value, 1, batchid))
                             raw_string += '\n'
+                        await database.insert_codes(batch, value.value, batchid)
                         self.lastbatch = batch
-                        conn.commit()
-                        conn.close()
                         embed = discord.Embed(title=f"Generated {amount} {value.name} Keys", description=f'```\n{raw_string+"```"}', color=0xE40000).set_footer(text=f'Batch ID: {batchid}')
                         await choice.response.send_message(embed=embed)
                         await choice.message.delete()
@@ -679,7 +666,7 @@ class Commands(commands.Cog):
 
     @app_commands.command(name="redeem", description="Redeem keys")
     async def redeem(self, interaction:discord.Interaction):
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         
         if not servers_list:
             await interaction.response.send_message("No servers added to the database. Use `/nitradoserver` to add one.")
@@ -710,36 +697,27 @@ class Commands(commands.Cog):
                     code = discord.ui.TextInput(label='Code', required=True, max_length=29, min_length=29, style=discord.TextStyle.long)
                     
                     async def on_submit(modal_self, modal_interaction: discord.Interaction):
-                        conn = killfeed_database.get_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT * FROM codes WHERE code=?", (str(modal_self.code),))
-                        query = cursor.fetchall()
-                        if len(query) == 1:
-                            if query[0][3] == 1:  # redeemed column is at index 3 now
+                        # (code, data, redeemed, user, batchid); redeemed is 1 while the code is unused
+                        code_row = await database.get_code(str(modal_self.code))
+                        if code_row:
+                            if code_row[2] == 1:
                                 if re.compile(r'[a-zA-Z0-9-_]*$').match(str(modal_self.username)):
-                                    cursor.execute("SELECT code FROM codes WHERE code = ?", (str(modal_self.code),))
-                                    rows = cursor.fetchall()
-                                    print(rows)
-                                    if len(rows) > 0:
-                                        try:
-                                            with open('logs/audit.txt', 'a') as log:
-                                                log.write(f'{modal_interaction.user} ({modal_interaction.user.id}) Redeemed code in {modal_interaction.channel.name} ({modal_interaction.channel.id}) for username {modal_self.username} at {datetime.datetime.now().strftime("%m/%d/%Y, %I:%M %p")}\n')
-                                                print("Passed x1")
-                                        except Exception as e:
-                                            print(e)
-                                        data = str(await Nitrado.Priority(id=selected_server_id, username=modal_self.username, priority='Add'))
-                                        print(data)
-                                        if data.startswith("Successful"):
-                                            cursor.execute("UPDATE codes SET redeemed = ?, user = ? WHERE code = ?", (0, str(modal_self.username), str(modal_self.code)))
-                                            conn.commit()
-                                            conn.close()
-                                            await modal_interaction.response.send_message(f" Redeemed {query[0][2]} for {modal_self.username} on server {selected_server_id}")  # data column is at index 2
-                                        else:
-                                            conn.close()
-                                            await modal_interaction.response.send_message(data)
+                                    try:
+                                        with open('logs/audit.txt', 'a') as log:
+                                            log.write(f'{modal_interaction.user} ({modal_interaction.user.id}) Redeemed code in {modal_interaction.channel.name} ({modal_interaction.channel.id}) for username {modal_self.username} at {datetime.datetime.now().strftime("%m/%d/%Y, %I:%M %p")}\n')
+                                            print("Passed x1")
+                                    except Exception as e:
+                                        print(e)
+                                    data = str(await Nitrado.Priority(id=selected_server_id, username=modal_self.username, priority='Add'))
+                                    print(data)
+                                    if data.startswith("Successful"):
+                                        await database.redeem_code(str(modal_self.code), str(modal_self.username))
+                                        await modal_interaction.response.send_message(f" Redeemed {code_row[1]} for {modal_self.username} on server {selected_server_id}")
+                                    else:
+                                        await modal_interaction.response.send_message(data)
                                 else:
                                     await modal_interaction.response.send_message("Invalid username. Please try again!")
-                            elif query[0][2] == 0:
+                            else:
                                 await modal_interaction.response.send_message("Code already redeemed!")
                         else:
                             await modal_interaction.response.send_message("Invalid code!")
@@ -758,7 +736,7 @@ class Commands(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.command(name="removearea", description="Remove a flag listener")
     async def removearea(self, interaction:discord.Interaction):
-        rows = killfeed_database.get_regions()
+        rows = await database.get_regions()
         select = discord.ui.Select()
         select.placeholder = "Which area would you like to remove?"
         c = 0
@@ -781,11 +759,7 @@ class Commands(commands.Cog):
             selected_idx = int(select.values[0])
             region_name = region_data[selected_idx]
             
-            conn = killfeed_database.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM region WHERE name = ?", (region_name,))
-            conn.commit()
-            conn.close()
+            await database.delete_region(region_name)
             
             await select_interaction.response.send_message(f"Deleted {region_name} from your listeners")
             view.stop()
@@ -812,7 +786,7 @@ class Commands(commands.Cog):
     @app_commands.command(name="banlist", description="Banlist Options")
     async def banlist(self, interaction:discord.Interaction, username:str, action:app_commands.Choice[str]):
         """Banlist management with server selection dropdown"""
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         
         if not servers_list:
             await interaction.response.send_message("No servers added to the database. Use `/nitradoserver` to add one.")
@@ -865,7 +839,7 @@ class Commands(commands.Cog):
     @app_commands.command(name="priority", description="Priority Options")
     async def priority(self, interaction:discord.Interaction, username:str, action:app_commands.Choice[str]):
         """Priority management with server selection dropdown"""
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         if not servers_list:
             await interaction.response.send_message("No servers added to the database. Use `/nitradoserver` to add one.")
             return
@@ -924,7 +898,7 @@ class Commands(commands.Cog):
     @app_commands.command(name="logconfig", description="Change the output of logs")
     async def logconfig(self, interaction:discord.Interaction):
         """Interactive log configuration using dropdown menus"""
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         
         if not servers_list:
             await interaction.response.send_message("No servers added to the database. Use `/nitradoserver` to add one.")
@@ -936,7 +910,7 @@ class Commands(commands.Cog):
             async def select_channel_callback(final_interaction: discord.Interaction, channel: discord.TextChannel | discord.VoiceChannel):
                 """Callback for when user selects a channel"""
                 await final_interaction.response.defer()
-                killfeed_database.update_config(str(server_id), category, channel.id)
+                await database.update_config(str(server_id), category, channel.id)
                 await final_interaction.message.edit(
                     content=f"Updated server `{server_id}` to send `{category}` logs to {channel.mention}",
                     view=None
@@ -1054,30 +1028,30 @@ class Commands(commands.Cog):
                         await modal_interaction.response.send_message("Server ID must be a number.")
                         return
                     
-                    servers_list = killfeed_database.get_servers()
+                    servers_list = await database.get_servers()
                     r = servers_list
                     
                     try:
                         if nitradoserver not in [i[0] for i in r]:
                             # Initialize config for new server
                             for category in categories:
-                                killfeed_database.insert_config(str(nitradoserver), category)
-                            killfeed_database.insert_server(str(nitradoserver))
+                                await database.insert_config(str(nitradoserver), category)
+                            await database.insert_server(str(nitradoserver))
                             await modal_interaction.response.send_message(f"Initialized server `{nitradoserver}`\nUse `/logconfig` to configure the server.")
                         else:
                             await modal_interaction.response.send_message("This nitrado server already exists in the database.")
                     except Exception as e:
                         # Initialize config for new server if error
                         for category in categories:
-                            killfeed_database.insert_config(str(nitradoserver), category)
-                        killfeed_database.insert_server(str(nitradoserver))
+                            await database.insert_config(str(nitradoserver), category)
+                        await database.insert_server(str(nitradoserver))
                         await modal_interaction.response.send_message(f"Initialized server `{nitradoserver}`\nUse `/logconfig` to configure the server.")
             
             await interaction.response.send_modal(AddServerModal())
         
         elif action.name == "Remove":
             # For removing, use a dropdown
-            servers_list = killfeed_database.get_servers()
+            servers_list = await database.get_servers()
             
             if not servers_list:
                 await interaction.response.send_message("No servers in the database to remove.")
@@ -1106,11 +1080,7 @@ class Commands(commands.Cog):
                     
                     try:
                         os.remove(f"db/{server_id}.db")
-                        conn = killfeed_database.get_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("DELETE FROM servers WHERE serverid = ?", (server_id,))
-                        conn.commit()
-                        conn.close()
+                        await database.delete_server(server_id)
                         await sel_interaction.message.edit(
                             content=f"Removed server `{server_id}` from the database.",
                             view=None
@@ -1138,20 +1108,18 @@ class Commands(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.command(name="serverlist", description="Check servers list associated with your nitrado Token")
     async def servers(self, interaction:discord.Interaction):
-       headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
-       async with aiohttp.ClientSession() as ses:
-            async with ses.get(f"https://api.nitrado.net/services", headers=headers) as e:
-                parsed = json.loads(await e.read())
-                print(json.dumps(parsed, indent=4))
-                dictof = dict(parsed)
-                embed = discord.Embed(title="Nitrado Server List", description="Lists your current Nitrado Servers", color=0xE40000)
-                c = 0
-                for d in dictof['data']['services']:
-                    c += 1
-                    embed.add_field(name=f'Server # {d["id"]}', value=f"{d['details']['name']}")
-                    #for v in (i).values())
-                    #    print(v.get('id'))
-                await interaction.response.send_message(embed=embed)
+       async with client.get(f"{NITRADO_API_URL}/services") as e:
+            parsed = json.loads(await e.read())
+            print(json.dumps(parsed, indent=4))
+            dictof = dict(parsed)
+            embed = discord.Embed(title="Nitrado Server List", description="Lists your current Nitrado Servers", color=0xE40000)
+            c = 0
+            for d in dictof['data']['services']:
+                c += 1
+                embed.add_field(name=f'Server # {d["id"]}', value=f"{d['details']['name']}")
+                #for v in (i).values())
+                #    print(v.get('id'))
+            await interaction.response.send_message(embed=embed)
 
     #@app_commands.command(name="link", description="Link username with discord")
     #async def link(self, interaction:discord.Interaction):
@@ -1179,7 +1147,7 @@ class Commands(commands.Cog):
     @app_commands.command(name="generateallheatmap", description="Generates a heatmap with all player movement positions for the log file")
     async def maxkillfeed(self, interaction:discord.Interaction):
         """Generate heatmap with server selection dropdown"""
-        servers_list = killfeed_database.get_servers()
+        servers_list = await database.get_servers()
         
         if not servers_list:
             await interaction.response.send_message("No servers added to the database. Use `/nitradoserver` to add one.")
@@ -1211,9 +1179,12 @@ class Commands(commands.Cog):
                     image_file = './utils/s.jpg'
                 else:
                     image_file = './utils/y.jpg'
-                generate_heatmap(image_file, playercoords, detected_map)
-                embed = discord.Embed(title="Player Location Heatmap (All)",description=f'Entries: {len(playercoords)}', color=0xE40000).set_image(url="attachment://heatmap.jpg")
-                await cb_interaction.followup.send(embed=embed, file=discord.File("heatmap.jpg"))
+                heatmap_image = await renderer.render(image_file, playercoords, detected_map)
+                if heatmap_image is None:
+                    await cb_interaction.message.edit(content=f" Heatmap for server `{serverid}` could not be rendered right now, try again later.")
+                    return
+                embed = discord.Embed(title="Player Location Heatmap (All)",description=f'Entries: {len(playercoords)}', color=0xE40000).set_image(url=f"attachment://{renderer.filename}")
+                await cb_interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(heatmap_image), filename=renderer.filename))
                 await cb_interaction.message.edit(content=f"Heatmap generated for server `{serverid}`")
             except FileNotFoundError:
                 await cb_interaction.message.edit(content=f" Log file not found for server `{serverid}`.")
@@ -1252,41 +1223,21 @@ class Commands(commands.Cog):
 
     @app_commands.command(name="link", description="Links your account with DayZ Underworld bot")
     async def link_account(self, interaction:discord.Interaction, username:str):
-        conn = killfeed_database.get_connection()
-        cursor = conn.cursor()
-        
         # Check if already linked
-        cursor.execute("SELECT * FROM stats WHERE dcid = ?", (interaction.user.id,))
-        if len(cursor.fetchall()) >= 1:
-            conn.close()
+        if await database.get_linked_user(interaction.user.id):
             await interaction.response.send_message("You are already linked to a username!")
             return
         
-        # Check if username already linked
-        cursor.execute("SELECT dcid FROM stats WHERE dcid = ?", (interaction.user.id,))
-        if len(cursor.fetchall()) >= 1:
-            conn.close()
-            await interaction.response.send_message("That username is already linked!")
-            return
-        
         # Check if username exists
-        cursor.execute("SELECT * FROM stats WHERE user = ? COLLATE NOCASE", (username,))
-        if cursor.fetchall() == []:
-            conn.close()
+        username_from_database = await database.get_stats_username(username)
+        if username_from_database is None:
             await interaction.response.send_message("That username is not yet in the database. If it is your first time joining the DayZ server, allow the bot 5-10 minutes to update the database")
             return
         
-        try:
-            cursor.execute("SELECT user FROM stats WHERE user = ? COLLATE NOCASE", (username,))
-            username_from_database = cursor.fetchone()[0]
-            cursor.execute("UPDATE stats SET dcid = ? WHERE user = ?", (interaction.user.id, username_from_database))
-            conn.commit()
-            conn.close()
+        if await database.set_discord_link(username_from_database, interaction.user.id):
             await interaction.response.send_message(f"{username_from_database} is now linked to {interaction.user.mention}")
-        except Exception as e:
-            conn.close()
+        else:
             await interaction.response.send_message("Something went wrong, please open a ticket, or contact staff")
-            print(e)
 
     @app_commands.command(name="stats", description="View your own stats, or someone elses")
     async def stats(self, interaction:discord.Interaction, username:Union[str, None]=None):
@@ -1332,87 +1283,37 @@ class Commands(commands.Cog):
                 embed.add_field(name=key, value=value)
             return embed
         if username != None:
-            conn = killfeed_database.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-    SELECT p1.id, p1.user, p1.kills, p1.deaths, p1.alivetime, p1.deathstreak, p1.killstreak, p1.dcid, p1.money, p1.bounty, p1.created_at,
-           (SELECT COUNT(*) 
-            FROM stats AS p2
-            WHERE p2.kills > p1.kills
-           ) + 1 AS KillRank,
-           (SELECT COUNT(*) 
-            FROM stats AS p3
-            WHERE p3.deaths > p1.deaths
-           ) + 1 AS DeathRank
-    FROM stats AS p1
-    WHERE p1.user = ? COLLATE NOCASE;
-""", (username,))
-            data_result = cursor.fetchall()
-            conn.close()
-            if len(data_result) == 0:
+            data_result = await database.get_stats_profile(username)
+            if data_result is None:
                 await interaction.response.send_message(f"{username} does not exist in the database. Please check spelling.")
             else:
-                await interaction.response.send_message(embed=await gather_data(data_result[0]))
+                await interaction.response.send_message(embed=await gather_data(data_result))
         elif username == None:
-            conn = killfeed_database.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-    SELECT p1.id, p1.user, p1.kills, p1.deaths, p1.alivetime, p1.deathstreak, p1.killstreak, p1.dcid, p1.money, p1.bounty, p1.created_at,
-           (SELECT COUNT(*) 
-            FROM stats AS p2
-            WHERE p2.kills > p1.kills
-           ) + 1 AS KillRank,
-           (SELECT COUNT(*) 
-            FROM stats AS p3
-            WHERE p3.deaths > p1.deaths
-           ) + 1 AS DeathRank
-    FROM stats AS p1
-    WHERE p1.dcid = ? COLLATE NOCASE;
-""", (interaction.user.id,))
-            data_from_database = cursor.fetchall()
-            conn.close()
-            print(data_from_database)
-            if data_from_database == None or data_from_database == []:
+            data_from_database = await database.get_linked_stats_profile(interaction.user.id)
+            if data_from_database is None:
                 await interaction.response.send_message("You did not specify a username, and you are not linked to an account, please use /link username, or specify a username!")
             else:
-                await interaction.response.send_message(embed=await gather_data(data_from_database[0]))
+                await interaction.response.send_message(embed=await gather_data(data_from_database))
         
     @app_commands.command(name="unlink", description="Unlinks your account with the bot")
     async def unlink(self, interaction:discord.Interaction):
-        conn = killfeed_database.get_connection()
-        cursor = conn.cursor()
+        username = await database.get_linked_user(interaction.user.id)
         
-        cursor.execute("SELECT * FROM stats WHERE dcid = ?", (interaction.user.id,))
-        username_data = cursor.fetchall()
-        
-        if len(username_data) >= 1:
-            username = username_data[0][1]
-            cursor.execute("UPDATE stats SET dcid = ? WHERE user = ?", (None, username))
-            conn.commit()
-            conn.close()
+        if username:
+            await database.set_discord_link(username, None)
             await interaction.response.send_message(f"{username} is now unlinked from {interaction.user.mention}")
         else:
-            conn.close()
             await interaction.response.send_message("You are not linked to an account!")
 
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.command(name="staffunlink", description="Forces an unlink")
     async def staffunlink(self, interaction:discord.Interaction, discord_user:Union[discord.Member]):
-        conn = killfeed_database.get_connection()
-        cursor = conn.cursor()
         dcid = discord_user.id
         
-        cursor.execute("SELECT * FROM stats WHERE dcid = ?", (dcid,))
-        username_data = cursor.fetchall()
-        
-        if len(username_data) >= 1:
-            username = username_data[0][1]
-            cursor.execute("UPDATE stats SET dcid = ? WHERE dcid = ?", (None, dcid))
-            conn.commit()
-            conn.close()
+        if await database.get_linked_user(dcid):
+            await database.clear_discord_link(dcid)
             await interaction.response.send_message(f"{discord_user.mention} is now unlinked.")
         else:
-            conn.close()
             await interaction.response.send_message("That user is not linked!")
 
     @app_commands.checks.has_permissions(administrator=True)
@@ -1471,11 +1372,11 @@ class Commands(commands.Cog):
         """Toggle whether coordinate links are shown in kill embeds"""
         # Get current setting from database
         guild_id = interaction.guild_id
-        current_setting = killfeed_database.get_guild_setting(guild_id, "enable_coord_links", True)
+        current_setting = await database.get_guild_setting(guild_id, "enable_coord_links", True)
         
         # Toggle it
         new_setting = not current_setting
-        killfeed_database.set_guild_setting(guild_id, "enable_coord_links", new_setting)
+        await database.set_guild_setting(guild_id, "enable_coord_links", new_setting)
         
         status = "enabled" if new_setting else "disabled"
         embed = discord.Embed(
@@ -4,10 +4,13 @@ from os import path
 from datetime import datetime
 from utils.Weapons import Weapons as Weapons
 from utils.closestLoc import getClosestLocation
-from utils.heatmap import generate_heatmap
-from utils import killfeed_helpers, killfeed_database, killfeed_events, killfeed_nitrado
+from utils.heatmap_renderer import renderer
+from utils import killfeed_helpers, killfeed_database, killfeed_events, killfeed_nitrado, killfeed_tokenizer
+from utils.killfeed_db_executor import database
+from utils.killfeed_scheduler import PollScheduler
 from utils.nitradoFuncs import NitradoFunctions
-import sys, os, time, sqlite3, re, discord, logging, asyncio, aiofiles
+from utils.nitrado_client import client as nitrado_client
+import sys, os, io, time, sqlite3, re, discord, logging, asyncio, aiofiles
 import aiohttp
 
 # Initialize logging
@@ -18,18 +21,16 @@ logger = logging.getLogger(__name__)
 Nitrado = NitradoFunctions()# Initialize database connections
 killfeed_database.initialize_master_db()
 conn, st = killfeed_database.initialize_stats_db()
+killfeed_database.load_known_players()
+killfeed_database.ensure_rank_index()
 killfeed_database.initialize_activity_db()
 stats = conn
 class Killfeed(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.weapons = Weapons.weapons
-        self.reported = {}
-        self.last_log = {}
         self.server_maps = {}  # Store map info per server
         self.headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
-        self.FirstTime = True
-        self.server_iterator = 0
         self.testing = False
         self.last_updated_server = None
         self.task_started = False  # Flag to prevent duplicate task starts
@@ -37,6 +38,10 @@ class Killfeed(commands.Cog):
         self.dpnid_to_player = {}  # Track DPNID to player name mapping from CHAR_DEBUG
         self.dpnid_to_uid = {}  # Track DPNID to UID mapping from CHAR_DEBUG
         self.processed_rpt_entries = {}  # Track processed RPT entries per server to avoid duplicates
+        self.scheduler = PollScheduler()  # Per-server adaptive poll intervals
+        self.polls_in_flight = {}  # server_id -> running poll task
+        self.download_slots = None  # Shared download semaphore, created inside the running loop
+        self.series_compacted_at = None  # Monotonic time activity series were last rolled up
 
     async def safe_edit_channel(self, channel, **kwargs):
         try:
@@ -54,58 +59,113 @@ class Killfeed(commands.Cog):
         if not self.task_started and not self.fetch_logs.is_running():
             self.fetch_logs.start()
             self.task_started = True
+            await renderer.start()
+
+    async def cog_unload(self):
+        """Stop polling, close the shared Nitrado HTTP session, drain queued database calls and stop heatmap workers."""
+        self.fetch_logs.cancel()
+        for task in self.polls_in_flight.values():
+            task.cancel()
+        await nitrado_client.close()
+        await database.shutdown()
+        await renderer.shutdown()
 
     async def process_active_servers(self):
         """
-        Iterates over all known servers and processes their logs.
+        Starts a poll for every registered server that the scheduler reports as due.
+        Polls run as independent tasks so a slow server never delays the others;
+        downloads are bounded by NITRADO_CONCURRENT_DOWNLOADS and each server's logs
+        are parsed as soon as its own downloads finish.
         """
-        if self.testing:
-            log_acquired = True
-            self.FirstTime = False
-        tasks_to_run = []
-
         # Use consolidated database
-        registered_servers = killfeed_database.get_servers()
+        registered_servers = await database.get_servers()
 
         if not registered_servers:
-            print("No configured servers found. Initialize via setup commands.")
+            logger.debug("No configured servers found. Initialize via setup commands.")
             return
 
-        self.server_count = len(registered_servers)
+        if self.download_slots is None:
+            self.download_slots = asyncio.Semaphore(getattr(Config, "NITRADO_CONCURRENT_DOWNLOADS", 6))
 
-        for entry in registered_servers:
-            server_id = entry[0]
-            logger.debug(f"[{server_id}] Processing server entry")
+        self.scheduler.sync(entry[0] for entry in registered_servers)
+        for server_id in self.scheduler.due(exclude=self.polls_in_flight.keys()):
+            task = asyncio.create_task(self.poll_server(server_id))
+            self.polls_in_flight[server_id] = task
+            task.add_done_callback(lambda _, sid=server_id: self.polls_in_flight.pop(sid, None))
 
-            # Get config from consolidated database for this specific server
-            try:
-                channel_map = killfeed_database.get_all_config_dict(str(server_id))
-            except Exception as e:
-                logger.error(f"Server config ({server_id}) misconfigured:\n{e}")
-                continue
+        # Roll old activity series points up into hourly buckets now and then
+        now = time.monotonic()
+        if self.series_compacted_at is None or now - self.series_compacted_at >= getattr(Config, "SERIES_COMPACT_INTERVAL", 3600):
+            self.series_compacted_at = now
+            await database.compact_activity_series()
 
+    async def poll_server(self, server_id):
+        """Process one server and feed the outcome back into its schedule."""
+        try:
+            event_lines, online_players = await self.process_server(server_id, self.download_slots)
+            self.scheduler.record(server_id, event_lines, online_players)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[{server_id}] Poll failed: {e}", exc_info=True)
+            self.scheduler.record_failure(server_id)
+
+    async def fetch_limited(self, download_slots: asyncio.Semaphore, fetcher, *args) -> bool:
+        """Run a log fetcher while holding one of the shared download slots."""
+        async with download_slots:
+            return await fetcher(*args)
+
+    async def process_server(self, server_id, download_slots: asyncio.Semaphore):
+        """
+        Download and process the ADM and RPT logs of a single server.
+
+        Returns:
+            tuple: (event_lines, online_players) activity seen by this poll; online_players
+            is None when no PlayerList block was read
+        """
+        logger.debug(f"[{server_id}] Processing server entry")
+
+        # Get config from consolidated database for this specific server
+        try:
+            channel_map = await database.get_all_config_dict(str(server_id))
+        except Exception as e:
+            logger.error(f"Server config ({server_id}) misconfigured:\n{e}")
+            return 0, None
+
+        try:
             if not self.testing:
-                log_acquired = await killfeed_nitrado.fetch_server_log(server_id, self.server_maps)
-                # Also fetch RPT log for device ID tracking (alt detection)
-                rpt_acquired = await killfeed_nitrado.fetch_server_rpt_log(server_id)
+                # Fetch ADM and RPT (device IDs for alt detection) in parallel
+                log_acquired, rpt_acquired = await asyncio.gather(
+                    self.fetch_limited(download_slots, killfeed_nitrado.fetch_server_log, server_id, self.server_maps),
+                    self.fetch_limited(download_slots, killfeed_nitrado.fetch_server_rpt_log, server_id),
+                )
             else:
                 log_acquired = True
                 rpt_acquired = True
 
             if log_acquired:
-                server_map = self.server_maps.get(server_id, "chernarus").lower()
                 # Process RPT for device IDs first, then process ADM log
                 # This may need improvement to avoid redundant file reads (This is the best implementation I could think of for now)
-                alt_accounts, banned_devices = await self.process_rpt_log_for_device_ids(server_id)
-                server_map = await Nitrado.getMapFromSettings(server_id)
-                server_map = server_map.lower()
-                logger.info(f"Initializing log check for server {server_id} on map {server_map}")
-                tasks_to_run.append(self.check_server_log(server_id, channel_map, server_map, alt_accounts, banned_devices))
-
-        await asyncio.gather(*tasks_to_run)
+                # All stat changes of this cycle are written together in one transaction
+                batch = killfeed_database.StatsBatch()
+                try:
+                    alt_accounts, banned_devices = await self.process_rpt_log_for_device_ids(server_id, batch)
+                    server_map = await Nitrado.getMapFromSettings(server_id)
+                    server_map = server_map.lower()
+                    logger.info(f"Initializing log check for server {server_id} on map {server_map}")
+                    return await self.check_server_log(server_id, channel_map, batch, server_map, alt_accounts, banned_devices)
+                except Exception:
+                    # Only the RPT device links are kept; the ADM lines are read again next cycle
+                    batch.discard_log_changes()
+                    raise
+                finally:
+                    await database.write(batch.commit)
+        except Exception as e:
+            logger.error(f"[{server_id}] Error processing server: {e}", exc_info=True)
+        return 0, None
 
-    # Loop each server every 5 minutes
-    @tasks.loop(minutes=5)
+    # Check which servers are due; each server runs on its own adaptive interval
+    @tasks.loop(seconds=getattr(Config, "POLL_SCHEDULER_TICK", 15))
     async def fetch_logs(self):
         try:
             await self.process_active_servers()
@@ -116,15 +176,16 @@ class Killfeed(commands.Cog):
     async def before_fetch_logs(self):
         """Wait for bot to be ready before starting the task loop."""
         await self.bot.wait_until_ready()
-        logger.info("Fetch logs task started - running every 5 minutes")
+        logger.info("Fetch logs task started - polling servers on adaptive intervals")
 
-    async def process_rpt_log_for_device_ids(self, server_id: int):
+    async def process_rpt_log_for_device_ids(self, server_id: int, batch: killfeed_database.StatsBatch):
         """
         Process RPT log file to extract device IDs and UIDs for alt account detection.
         Also auto-bans players on banned devices.
         
         Args:
             server_id: The server ID
+            batch: Unit of work collecting this cycle's database changes
         
         Returns:
             tuple: (alt_accounts_list, banned_device_list) where:
@@ -147,10 +208,6 @@ class Killfeed(commands.Cog):
             self.processed_rpt_entries[server_id] = set()
         
         try:
-            # Get database connections
-            conn = killfeed_database.get_connection()
-            cursor = conn.cursor()
-            
             async with aiofiles.open(rpt_file_path, "r") as file:
                 async for raw_line in file:
                     line = raw_line.strip()
@@ -164,7 +221,7 @@ class Killfeed(commands.Cog):
                         if player_name and uid:
                             self.uid_to_player[uid] = player_name
                             # Ensure player exists in stats table
-                            killfeed_database.check_user_exists(cursor, player_name, conn)
+                            batch.add_player(player_name)
                             logger.debug(f"[{server_id}] Mapped UID {uid} to player {player_name}")
                     
                     # Check for CHAR_DEBUG events to map player name or UID
@@ -174,7 +231,7 @@ class Killfeed(commands.Cog):
                             if player_name:
                                 # Store player name for this DPNID
                                 self.dpnid_to_player[dpnid] = player_name
-                                killfeed_database.check_user_exists(cursor, player_name, conn)
+                                batch.add_player(player_name)
                                 logger.debug(f"[{server_id}] Found player {player_name} with DPNID {dpnid}")
                             elif uid:
                                 # Store UID for this DPNID, then try to link with previously seen player name
@@ -212,36 +269,16 @@ class Killfeed(commands.Cog):
                             player_name = self.uid_to_player.get(uid)
                             
                             if player_name:
-                                # Ensure player exists in stats table before updating
-                                killfeed_database.check_user_exists(cursor, player_name, conn)
+                                # Link the player (created if needed) to the device ID and UID on commit
+                                batch.set_device(player_name, device_id, uid)
+                                logger.info(f"[{server_id}] Alt Detection: {player_name} (UID: {uid}) - Device: {device_id}")
                                 
-                                # Update player with device ID and UID using existing connection
-                                cursor.execute(
-                                    "UPDATE stats SET device_id = ?, uid = ? WHERE user = ?",
-                                    (device_id, uid, player_name)
-                                )
-                                rows_affected = cursor.rowcount
-                                conn.commit()
-                                
-                                if rows_affected > 0:
-                                    logger.info(f"[{server_id}] Alt Detection: {player_name} (UID: {uid}) - Device: {device_id} ({rows_affected} row updated)")
-                                else:
-                                    logger.warning(f"[{server_id}] Failed to update device ID for {player_name} - no rows affected")
-                                
-                                # Verify the update
-                                cursor.execute("SELECT device_id, uid FROM stats WHERE user = ?", (player_name,))
-                                verify_result = cursor.fetchone()
-                                if verify_result and verify_result[0]:
-                                    logger.debug(f"[{server_id}] Verified - {player_name}: device_id={verify_result[0]}, uid={verify_result[1]}")
-                                else:
-                                    logger.warning(f"[{server_id}] Verification failed - {player_name} device_id still not set")
-                                
-                                # Get all accounts on this device
-                                all_accounts_on_device = killfeed_database.get_all_users_by_device_id(device_id)
+                                # Get all accounts on this device, including this cycle's assignments
+                                all_accounts_on_device = await database.read(batch.get_users_by_device_id, device_id)
                                 other_alts = [acc for acc in all_accounts_on_device if acc != player_name]
                                 
                                 # Check if device is banned
-                                if killfeed_database.is_device_id_banned(device_id):
+                                if await database.is_device_id_banned(device_id):
                                     logger.warning(f"[{server_id}] BANNED DEVICE DETECTED: {player_name} (Device: {device_id})")
                                     banned_devices.append({
                                         'player': player_name,
@@ -259,7 +296,6 @@ class Killfeed(commands.Cog):
                             else:
                                 logger.debug(f"[{server_id}] UID {uid} not found in mapping yet")
             
-            conn.close()
             logger.info(f"[{server_id}] RPT log processing complete")
         
         except Exception as e:
@@ -267,7 +303,16 @@ class Killfeed(commands.Cog):
         
         return alt_accounts, banned_devices
 
-    async def check_server_log(self, server_id: int, db_config, server_map: str = "chernarus", alt_accounts: list = None, banned_devices: list = None):
+    async def check_server_log(self, server_id: int, db_config, batch: killfeed_database.StatsBatch, server_map: str = "chernarus", alt_accounts: list = None, banned_devices: list = None):
+        """
+        Parse the new ADM lines of a server and post its events.
+        Stat changes are buffered in `batch`; the caller commits it, or discards it if this raises.
+
+        Returns:
+            tuple: (event_lines, online_players) for the poll scheduler; event_lines
+            leaves out PlayerList blocks and lines without a player, and online_players
+            is None when no PlayerList block was read
+        """
         
         if alt_accounts is None:
             alt_accounts = []
@@ -284,7 +329,7 @@ class Killfeed(commands.Cog):
         # Check if log file exists before processing
         if not os.path.exists(log_file_path):
             logger.warning(f"[{server_id}] Log file not found at {log_file_path}. Skipping this server.")
-            return
+            return 0, None
 
         # Build channel map from config dictionary - safely handle None values
         channel_map = {
@@ -370,343 +415,230 @@ class Killfeed(commands.Cog):
                         logger.error(f"[{server_id}] Error sending alt_alert: {e}")
 
 
-        if server_id not in self.reported:
-            self.reported[server_id] = []
-        if server_id not in self.last_log:
-            self.last_log[server_id] = ""
-
-        line_tracker = self.reported[server_id]
-        previous_log_marker = self.last_log[server_id]
+        # Resume from the persisted cursor; a server with no cursor yet replays its current log quietly
+        log_cursor = await database.get_log_cursor(str(server_id), "ADM")
+        replaying = log_cursor is None and not self.testing
+        offset, fingerprint = log_cursor if log_cursor else (0, "")
+        try:
+            new_lines, new_offset, new_fingerprint = await killfeed_helpers.read_log_increment(log_file_path, offset, fingerprint)
+        except OSError as e:
+            logger.error(f"[{server_id}] Error reading log file: {e}")
+            return 0, None
+        logger.info(f"[{server_id}] {len(new_lines)} new log lines")
 
         player_coords = []
-        current_bodypart = ""
-        counter_online = 0
+        counter_online = None  # Players in the latest PlayerList block, None until one is read
         counter_kills = 0
         counter_deaths = 0
         counter_activity = 0
+        counter_events = 0  # Lines showing activity, for the poll scheduler
         reading_players = False
         online_count_updated = False
 
-        async with aiofiles.open(log_file_path, "r") as file:
-            async for raw_line in file:
-                line = raw_line.strip()
-
-                # Check if player exists in database
-                match_player = re.search(r'Player "([^"]+)"', line)
-                if match_player:
-                    killfeed_database.check_user_exists(st, match_player.group(1), stats)
-
-                # Skip already reported lines
-                if line in line_tracker:
-                    continue
-
-                # Handle player list parsing
-                if "##### PlayerList log:" in line:
-                    reading_players = True
-                    player_coords.clear()
-                    counter_online = 0
-                elif re.match(r"\d{2}:\d{2}:\d{2} \| #####", line):
-                    reading_players = False
-                elif reading_players:
-                    coord_match = re.search(r'pos=<([\d.]+), [\d.]+, ([\d.]+)>', line)
-                    if coord_match:
-                        x, z = map(float, coord_match.groups())
-                        player_coords.append((x, z))
-                        counter_online += 1
-
-                # Update online player count if channel exists (only once per check to avoid rate limits)
-                if channel_map["online"] and not online_count_updated:
-                    online_match = re.search(r"(\d+)(?=\s*players)", line)
-                    if online_match:
-                        try:
-                            player_total = int(online_match.group(1))
-                            ch = channel_map.get("online")
-                            if ch:
-                                await self.safe_edit_channel(ch, name=f"Online: {player_total}")
-                            self.last_updated_server = server_id
-                            online_count_updated = True
-                        except Exception as e:
-                            logger.error(f"Error updating online count: {e}")
-
-                # Check for new log file
-                if "AdminLog" in line and previous_log_marker != line:
-                    if await killfeed_helpers.new_logfile(log_file_path):
-                        self.last_log[server_id] = line
-                        self.reported[server_id] = []
-                        line_tracker = self.reported[server_id]
-
-                line_tracker.append(line)
-                counter_activity += 1
-
-                # Extract body part hit
-                current_bodypart = killfeed_helpers.extract_bodypart(line)
-
-                # Handle different event types
-                try:
-                    # Check for StateMachine events first to capture UID-to-player mappings (for ADM processing)
-                    if "[StateMachine]:" in line and "Player" in line:
-                        player_name, uid = killfeed_helpers.extract_uid_from_state_machine_event(line)
-                        if player_name and uid:
-                            # Store the UID to player mapping for later reference
-                            self.uid_to_player[uid] = player_name
-                            logger.debug(f"Mapped UID {uid} to player {player_name} from ADM StateMachine")
-                    
-                    # Check connection/disconnection events first (no "(DEAD)" check)
-                    if killfeed_events.is_player_connected_event(line):
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        player = killfeed_helpers.extract_player_name(line)
-                        if player:
-                            # Extract UID from connection event and store mapping
-                            player_name, uid = killfeed_helpers.get_player_from_connection_event(line)
-                            if player_name and uid:
-                                self.uid_to_player[uid] = player_name
-                                logger.debug(f"Mapped UID {uid} to player {player_name} from connection event")
-                            
-                            # Initialize player stats on connect
-                            killfeed_database.check_user_exists(st, player, stats)
-                            embed = await killfeed_events.create_player_connected_embed(player, timestamp_str)
-                            if channel_map.get("connect") and not self.FirstTime:
-                                await channel_map["connect"].send(embed=embed)
-
-                    elif killfeed_events.is_player_disconnected_event(line):
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        player = killfeed_helpers.extract_player_name(line)
-                        if player:
-                            embed = await killfeed_events.create_player_disconnected_embed(player, timestamp_str)
-                            if channel_map.get("disconnect") and not self.FirstTime:
-                                await channel_map["disconnect"].send(embed=embed)
-
-                    # Check specific death types BEFORE generic "(DEAD)" check
-                    elif killfeed_events.is_suicide_event(line):
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        player_killed = killfeed_helpers.extract_player_name(line)
-                        
-                        # Update death stats
-                        if player_killed:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, player_killed, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, player_killed, conn_death)
-                            conn_death.close()
-                            logger.info(f"Suicide death recorded: {player_killed}")
+        for raw_line in new_lines:
+            # Classify the line once; everything below works on the typed record
+            event = killfeed_tokenizer.tokenize_line(raw_line)
+            kind = event.kind
+
+            # Collect players not in the database yet; they are inserted when the batch commits
+            if event.actor and kind != killfeed_tokenizer.STATE_MACHINE:
+                batch.add_player(event.actor)
+            if event.victim:
+                batch.add_player(event.victim)
+
+            # Handle player list parsing
+            if kind == killfeed_tokenizer.PLAYER_LIST:
+                reading_players = True
+                player_coords.clear()
+                counter_online = 0
+            elif kind == killfeed_tokenizer.PLAYER_LIST_END:
+                reading_players = False
+            elif reading_players and event.positions:
+                coords = killfeed_tokenizer.position_xz(event.positions[0])
+                if coords:
+                    player_coords.append(coords)
+                    counter_online += 1
+
+            # Update online player count if channel exists (only once per check to avoid rate limits)
+            if channel_map["online"] and not online_count_updated:
+                if kind == killfeed_tokenizer.PLAYER_LIST:
+                    try:
+                        player_total = event.players
+                        ch = channel_map.get("online")
+                        if ch:
+                            await self.safe_edit_channel(ch, name=f"Online: {player_total}")
+                        self.last_updated_server = server_id
+                        online_count_updated = True
+                    except Exception as e:
+                        logger.error(f"Error updating online count: {e}")
+
+            counter_activity += 1
+            # PlayerList blocks are written every 5 minutes even on an empty server, and
+            # lines without a player (log headers, bare timestamps) say nothing either
+            if (kind not in (killfeed_tokenizer.PLAYER_LIST, killfeed_tokenizer.PLAYER_LIST_END) and not reading_players
+                    and (kind != killfeed_tokenizer.OTHER or event.actor)):
+                counter_events += 1
+
+            # Handle different event types
+            try:
+                # Capture UID-to-player mappings from StateMachine events (for ADM processing)
+                if kind == killfeed_tokenizer.STATE_MACHINE:
+                    if event.actor and event.uid:
+                        # Store the UID to player mapping for later reference
+                        self.uid_to_player[event.uid] = event.actor
+                        logger.debug(f"Mapped UID {event.uid} to player {event.actor} from ADM StateMachine")
+                
+                # Check connection/disconnection events first (no "(DEAD)" check)
+                elif kind == killfeed_tokenizer.CONNECT:
+                    timestamp_str = await killfeed_helpers.time_func(event.time)
+                    player = event.actor
+                    if player:
+                        # Store the UID mapping from the connection event
+                        if event.uid:
+                            self.uid_to_player[event.uid] = player
+                            logger.debug(f"Mapped UID {event.uid} to player {player} from connection event")
                         
-                        embed = await killfeed_events.create_suicide_embed(player_killed, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
-
-                    elif killfeed_events.is_explosion_event(line):
-                        counter_deaths += 1
-                        counter_kills += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        player_killed = killfeed_helpers.extract_player_name(line)
+                        embed = await killfeed_events.create_player_connected_embed(player, timestamp_str)
+                        if channel_map.get("connect") and not replaying:
+                            await channel_map["connect"].send(embed=embed)
+
+                elif kind == killfeed_tokenizer.DISCONNECT:
+                    timestamp_str = await killfeed_helpers.time_func(event.time)
+                    player = event.actor
+                    if player:
+                        embed = await killfeed_events.create_player_disconnected_embed(player, timestamp_str)
+                        if channel_map.get("disconnect") and not replaying:
+                            await channel_map["disconnect"].send(embed=embed)
+
+                # Deaths without a killer (suicide, bleed out, animals, falls)
+                elif kind in killfeed_events.SIMPLE_DEATHS:
+                    create_embed, label = killfeed_events.SIMPLE_DEATHS[kind]
+                    counter_deaths += 1
+                    timestamp_str = await killfeed_helpers.time_func(event.time)
+                    victim = event.victim
+                    
+                    # Update death stats
+                    if victim:
+                        batch.record_death(victim)
+                        logger.info(f"{label} death recorded: {victim}")
+                    
+                    embed = await create_embed(victim, timestamp_str)
+                    if channel_map["death"] and not replaying:
+                        await channel_map["death"].send(embed=embed)
+
+                elif kind == killfeed_tokenizer.EXPLOSION:
+                    counter_deaths += 1
+                    counter_kills += 1
+                    timestamp_str = await killfeed_helpers.time_func(event.time)
+                    player_killed = event.victim
+                    
+                    # Update death stats
+                    if player_killed:
+                        batch.record_death(player_killed)
+                        logger.info(f"Explosion death recorded: {player_killed}")
+                    
+                    embed = await killfeed_events.create_explosion_embed(player_killed, event.detail, timestamp_str)
+                    if channel_map["kill"] and not replaying:
+                        await channel_map["kill"].send(embed=embed)
+
+                # Check PvP kills
+                elif kind == killfeed_tokenizer.PVP:
+                    counter_deaths += 1
+                    counter_kills += 1
+                    logger.info("PvP event detected")
+
+                    try:
+                        player_killer, player_killed = event.actor, event.victim
+                        logger.debug(f"Extracted - Killer: '{player_killer}', Victim: '{player_killed}'")
                         
-                        # Update death stats
-                        if player_killed:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, player_killed, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, player_killed, conn_death)
-                            conn_death.close()
-                            logger.info(f"Explosion death recorded: {player_killed}")
+                        if not player_killer or not player_killed:
+                            logger.warning(f"Failed to extract killer/victim from: {raw_line.strip()}")
+                            continue
                         
-                        explosion_type = killfeed_events.extract_explosion_type(line)
-                        embed = await killfeed_events.create_explosion_embed(player_killed, explosion_type, timestamp_str)
-                        if channel_map["kill"] and not self.FirstTime:
+                        timestamp_str = await killfeed_helpers.time_func(event.time)
+
+                        # Buffer the kill (players are created on commit if needed)
+                        batch.record_kill(player_killer, player_killed)
+                        logger.info(f"Stats updated: {player_killer} killed {player_killed}")
+
+                        # Get player stats, including this cycle's pending changes
+                        killer_stats = await database.write(batch.get_player_stats, player_killer)
+                        victim_stats = await database.write(batch.get_player_stats, player_killed)
+
+                        # Calculate time alive
+                        timealive_ts = victim_stats.get('alivetime') or int(time.time())
+                        timealive = datetime.now() - datetime.fromtimestamp(timealive_ts)
+                        days = timealive.days
+                        hours, remainder = divmod(timealive.seconds, 3600)
+                        minutes, seconds = divmod(remainder, 60)
+                        seconds += timealive.microseconds / 1e6
+                        timealivestr = killfeed_helpers.format_time_alive(int(seconds), minutes, hours, days)
+
+                        # Update this server's activity counters
+                        batch.add_counters(kills=1, deaths=0, server_id=str(server_id))
+
+                        # Format coordinates
+                        coords = event.positions
+                        killer_coords = killfeed_helpers.format_coordinates(coords[0]) if coords else ""
+                        victim_coords = killfeed_helpers.format_coordinates(coords[1]) if len(coords) > 1 else ""
+
+                        # Get location if available
+                        location = ""
+                        if can_use_locations:
+                            location = getClosestLocation(victim_coords, server_map) if victim_coords else ""
+
+                        # Map the weapon to its friendly name
+                        weapon = self.weapons['data'].get(event.weapon, event.weapon)
+                        distance = event.distance
+
+                        # Create embed with coordinate links
+                        embed = await killfeed_events.create_pvp_kill_embed(
+                            player_killer, player_killed, weapon, distance, event.bodypart,
+                            timestamp_str, killer_stats, victim_stats, timealivestr, dayz,
+                            killer_coords, victim_coords, enable_coord_links=True
+                        )
+
+                        if channel_map["kill"] and not replaying:
+                            logger.debug(f"[{server_id}] Sending kill data")
                             await channel_map["kill"].send(embed=embed)
 
-                    elif killfeed_events.is_bleed_out_event(line):
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        victim = killfeed_helpers.extract_player_name(line)
-                        
-                        # Update death stats
-                        if victim:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, victim, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, victim, conn_death)
-                            conn_death.close()
-                            logger.info(f"Bleed out death recorded: {victim}")
-                        
-                        embed = await killfeed_events.create_bleed_out_embed(victim, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
-
-                    elif killfeed_events.is_wolf_kill_event(line):
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        victim = killfeed_helpers.extract_player_name(line)
-                        
-                        # Update death stats
-                        if victim:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, victim, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, victim, conn_death)
-                            conn_death.close()
-                            logger.info(f"Wolf kill death recorded: {victim}")
-                        
-                        embed = await killfeed_events.create_wolf_kill_embed(victim, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
-
-                    elif killfeed_events.is_bear_kill_event(line):
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        victim = killfeed_helpers.extract_player_name(line)
-                        
-                        # Update death stats
-                        if victim:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, victim, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, victim, conn_death)
-                            conn_death.close()
-                            logger.info(f"Bear kill death recorded: {victim}")
-                        
-                        embed = await killfeed_events.create_bear_kill_embed(victim, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
-
-                    elif killfeed_events.is_fall_death_event(line):
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        victim = killfeed_helpers.extract_player_name(line)
-                        
-                        # Update death stats
-                        if victim:
-                            conn_death = killfeed_database.get_connection()
-                            cursor_death = conn_death.cursor()
-                            killfeed_database.check_user_exists(cursor_death, victim, conn_death)
-                            killfeed_database.update_death_stats(cursor_death, victim, conn_death)
-                            conn_death.close()
-                            logger.info(f"Fall death recorded: {victim}")
-                        
-                        embed = await killfeed_events.create_fall_death_embed(victim, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
-
-                    # Check PvP kills
-                    elif killfeed_events.is_pvp_kill_event(line):
-                        counter_deaths += 1
-                        counter_kills += 1
-                        logger.info("PvP event detected")
-
-                        try:
-                            player_killer, player_killed = killfeed_helpers.extract_killer_victim(line)
-                            logger.debug(f"Extracted - Killer: '{player_killer}', Victim: '{player_killed}'")
-                            
-                            if not player_killer or not player_killed:
-                                logger.warning(f"Failed to extract killer/victim from: {line}")
-                                continue
-                            
-                            timestamp = killfeed_helpers.extract_timestamp(line)
-                            timestamp_str = await killfeed_helpers.time_func(timestamp)
-
-                            # Ensure both players exist and update stats with fresh connection
-                            conn_ensure = killfeed_database.get_connection()
-                            cursor_ensure = conn_ensure.cursor()
-                            killfeed_database.check_user_exists(cursor_ensure, player_killer, conn_ensure)
-                            killfeed_database.check_user_exists(cursor_ensure, player_killed, conn_ensure)
-                            conn_ensure.close()
-                            
-                            # Update stats using fresh connection
-                            conn_stats = killfeed_database.get_connection()
-                            cursor_stats = conn_stats.cursor()
-                            killfeed_database.update_kill_stats(cursor_stats, player_killer, player_killed, conn_stats)
-                            conn_stats.close()
-                            logger.info(f"Stats updated: {player_killer} killed {player_killed}")
-
-                            # Calculate time alive
-                            conn_temp = killfeed_database.get_connection()
-                            cursor_temp = conn_temp.cursor()
-                            cursor_temp.execute("SELECT alivetime FROM stats WHERE user = ?", (player_killed,))
-                            result = cursor_temp.fetchone()
-                            conn_temp.close()
-                            timealive_ts = result[0] if result else int(time.time())
-                            timealive = datetime.now() - datetime.fromtimestamp(timealive_ts)
-                            days = timealive.days
-                            hours, remainder = divmod(timealive.seconds, 3600)
-                            minutes, seconds = divmod(remainder, 60)
-                            seconds += timealive.microseconds / 1e6
-                            timealivestr = killfeed_helpers.format_time_alive(int(seconds), minutes, hours, days)
-
-                            # Update global stats (using consolidated database)
-                            killfeed_database.increment_activity_counters(kills=1, deaths=0)
-
-                            # Get player stats
-                            killer_stats = killfeed_database.get_player_stats(st, player_killer)
-                            victim_stats = killfeed_database.get_player_stats(st, player_killed)
-
-                            # Extract coordinates
-                            coords = killfeed_helpers.extract_coordinates_from_line(line)
-                            killer_coords = killfeed_helpers.format_coordinates(coords[0]) if coords else ""
-                            victim_coords = killfeed_helpers.format_coordinates(coords[1]) if len(coords) > 1 else ""
-
-                            # Get location if available
-                            location = ""
-                            if can_use_locations:
-                                location = getClosestLocation(victim_coords, server_map) if victim_coords else ""
-
-                            # Extract weapon
-                            weapon = killfeed_helpers.extract_weapon(line, Weapons.weapons)
-
-                            # Extract distance
-                            distance = killfeed_helpers.extract_distance(line)
-
-                            # Create embed with coordinate links
-                            embed = await killfeed_events.create_pvp_kill_embed(
-                                player_killer, player_killed, weapon, distance, current_bodypart,
-                                timestamp_str, killer_stats, victim_stats, timealivestr, dayz,
-                                killer_coords, victim_coords, enable_coord_links=True
-                            )
-
-                            if channel_map["kill"] and not self.FirstTime:
-                                print("Sending kill data")
-                                await channel_map["kill"].send(embed=embed)
-
-                        except Exception as e:
-                            logger.error(f"Error processing PvP kill: {e}")
-                            logger.exception(e)
-
-                    # Generic death as last resort
-                    elif killfeed_events.is_death_event(line) and "died" in line:
-                        counter_deaths += 1
-                        timestamp = killfeed_helpers.extract_timestamp(line)
-                        timestamp_str = await killfeed_helpers.time_func(timestamp)
-                        victim = killfeed_helpers.extract_player_name(line)
-                        embed = await killfeed_events.create_generic_death_embed(victim, timestamp_str)
-                        if channel_map["death"] and not self.FirstTime:
-                            await channel_map["death"].send(embed=embed)
+                    except Exception as e:
+                        logger.error(f"Error processing PvP kill: {e}")
+                        logger.exception(e)
+
+                # Generic death as last resort
+                elif kind == killfeed_tokenizer.DEATH:
+                    counter_deaths += 1
+                    timestamp_str = await killfeed_helpers.time_func(event.time)
+                    victim = event.victim
+                    embed = await killfeed_events.create_generic_death_embed(victim, timestamp_str)
+                    if channel_map["death"] and not replaying:
+                        await channel_map["death"].send(embed=embed)
 
-                except Exception as e:
-                    logger.error(f"Error processing log line: {e}")
-                    continue
+            except Exception as e:
+                logger.error(f"Error processing log line: {e}")
+                continue
+
+        batch.set_log_cursor(str(server_id), "ADM", new_offset, new_fingerprint)
 
         # Commit aggregate stats to activity database
         logger.info(f"[{server_id}] Log review complete. Activity - Kills: {counter_kills}, Deaths: {counter_deaths}")
-        killfeed_database.increment_activity_counters(counter_kills, counter_deaths)
+        batch.add_counters(counter_kills, counter_deaths, str(server_id))
 
         # Update activity series
-        killfeed_database.update_series('onlinecount', counter_online)
-        killfeed_database.update_series('killdata', counter_kills)
-        killfeed_database.update_series('deathdata', counter_deaths)
-        killfeed_database.update_series('data', counter_activity)
+        # Most polls see no PlayerList block; a 0 for those would drag down the online averages
+        if counter_online is not None:
+            batch.add_series_value('onlinecount', counter_online, str(server_id))
+        batch.add_series_value('killdata', counter_kills, str(server_id))
+        batch.add_series_value('deathdata', counter_deaths, str(server_id))
+        batch.add_series_value('data', counter_activity, str(server_id))
 
         # Update Discord channel stats (only if there was new activity and not first time)
-        if (counter_kills > 0 or counter_deaths > 0) and not self.FirstTime:
+        if (counter_kills > 0 or counter_deaths > 0) and not replaying:
             try:
-                total_deaths = killfeed_database.get_total_deaths()
-                total_kills = killfeed_database.get_total_kills()
+                # This cycle's counters are committed by process_server once we return
+                total_deaths = await database.get_total_deaths() + counter_deaths
+                total_kills = await database.get_total_kills() + counter_kills
                 
                 if channel_map["deathcount"]:
                     try:
@@ -727,32 +659,28 @@ class Killfeed(commands.Cog):
             except Exception as e:
                 logger.error(f"[{server_id}] Error updating Discord channels: {e}")
 
-        # Finalize per-server processing state
-        self.server_iterator += 1
-        if self.server_iterator >= self.server_count:
-            self.FirstTime = False
-            print("FirstTime flag reset after all servers processed.")
-
         # Generate heatmap (only if there's new location data)
         unique_locations = list({coord for coord in player_coords})
-        if channel_map["heatmap"] and len(unique_locations) > 0 and counter_activity > 0:
+        if channel_map["heatmap"] and len(unique_locations) > 0 and counter_activity > 0 and not replaying:
             try:
                 image_file = './utils/l.jpg' if server_map == "livonia" else './utils/y.jpg'
                 
-                generate_heatmap(image_file, unique_locations, server_map)
-                heatmap_embed = discord.Embed(
-                    title="Player Location Heatmap",
-                    description=f"Entries: {len(unique_locations)}\n<t:{int(time.mktime(datetime.now().timetuple()))}:R>",
-                    color=0xE40000
-                ).set_image(url="attachment://heatmap.jpg")
-                if channel_map["heatmap"] and not self.FirstTime:
-                    await channel_map["heatmap"].send(embed=heatmap_embed, file=discord.File("heatmap.jpg"))
+                # Rendered in a worker process so other servers keep being processed meanwhile
+                heatmap_image = await renderer.render(image_file, unique_locations, server_map)
+                if heatmap_image is not None:
+                    heatmap_embed = discord.Embed(
+                        title="Player Location Heatmap",
+                        description=f"Entries: {len(unique_locations)}\n<t:{int(time.mktime(datetime.now().timetuple()))}:R>",
+                        color=0xE40000
+                    ).set_image(url=f"attachment://{renderer.filename}")
+                    await channel_map["heatmap"].send(embed=heatmap_embed, file=discord.File(io.BytesIO(heatmap_image), filename=renderer.filename))
                     logger.info(f"[{server_id}] Heatmap sent with {len(unique_locations)} location entries")
             except asyncio.TimeoutError:
                 logger.warning(f"[{server_id}] Discord API timeout when sending heatmap")
             except Exception as e:
                 logger.error(f"[{server_id}] Error generating heatmap: {e}")
 
+        return counter_events, counter_online
 
 
 async def setup(bot):
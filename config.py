@@ -6,3 +6,47 @@ class Config:
     EMBED_FOOTER = "Placeholder Server"
     EMBED_FOOTER_IMAGE = ''
     EMBED_COLOR = 0xE40000
+
+    # Nitrado HTTP client (shared connection pool)
+    NITRADO_MAX_CONNECTIONS = 20          # Total pooled connections
+    NITRADO_MAX_CONNECTIONS_PER_HOST = 10 # Pooled connections per host
+    NITRADO_DNS_CACHE_TTL = 300           # Seconds to cache DNS lookups
+    NITRADO_KEEPALIVE_TIMEOUT = 60        # Seconds to keep idle connections open
+    NITRADO_CONNECT_TIMEOUT = 10          # Seconds to wait for a connection
+    NITRADO_READ_TIMEOUT = 60             # Seconds to wait between received chunks
+    NITRADO_METADATA_TTL = 900            # Seconds to reuse cached server info (username, game, map)
+    NITRADO_SETTINGS_TIMEOUT = 30         # Seconds allowed per settings update attempt (bans, priority)
+    NITRADO_CONCURRENT_DOWNLOADS = 6      # Log downloads allowed to run at the same time
+    NITRADO_RATE_LIMIT = 60               # Nitrado API requests per minute (match your account limit)
+    NITRADO_RATE_BURST = 10               # Requests that may be sent back to back
+    NITRADO_MAX_RETRIES = 3               # Retries for 429, 5xx and connection errors
+    NITRADO_BACKOFF_BASE = 1.0            # First retry backoff in seconds (doubles, jittered)
+    NITRADO_BACKOFF_CAP = 60.0            # Longest retry backoff in seconds
+    POLL_SCHEDULER_TICK = 15              # Seconds between checks for servers due a poll
+    POLL_INTERVAL_INITIAL = 300           # Starting poll interval per server (seconds)
+    POLL_INTERVAL_FLOOR = 60              # Fastest poll interval for an active server
+    POLL_INTERVAL_CEILING = 600           # Slowest poll interval for an idle server
+    POLL_IDLE_BACKOFF = 1.5               # Interval multiplier after an idle poll
+    POLL_RPM_BUDGET = 0                   # API calls per minute for polling (0 = servers x calls per 5 min)
+    POLL_CALLS_PER_POLL = 4               # Estimated API calls spent by one server poll
+    DB_READER_THREADS = 4                 # Threads serving read-only database queries
+    DB_MAX_PENDING = 64                   # Database calls allowed in the queue before callers wait
+    DB_SLOW_QUERY_MS = 250                # Log a warning for database calls slower than this
+    DB_STATS_INTERVAL = 600               # Seconds between database queue/latency summaries (0 = off)
+    DB_CACHE_SIZE_MB = 16                 # SQLite page cache per connection
+    DB_MMAP_SIZE_MB = 128                 # Bytes of the database file SQLite may memory-map (in MB)
+    DB_BUSY_TIMEOUT = 5                   # Seconds to wait for a database lock
+    DB_STATEMENT_CACHE = 256              # Prepared statements kept per connection
+    SERIES_RAW_INTERVAL = 300             # Seconds per raw activity series point
+    SERIES_RAW_RETENTION_DAYS = 7         # Days raw points are kept before hourly rollup
+    SERIES_ROLLUP_INTERVAL = 3600         # Seconds per rolled-up series point
+    SERIES_ROLLUP_RETENTION_DAYS = 365    # Days rollups are kept (0 keeps them forever)
+    SERIES_COMPACT_INTERVAL = 3600        # Seconds between series rollup runs
+    HEATMAP_WORKERS = 2                   # Processes rendering heatmaps in parallel
+    HEATMAP_MAX_QUEUED = 4                # Heatmap renders allowed to wait before new ones are skipped
+    HEATMAP_TIMEOUT = 60                  # Seconds a heatmap render may take before its worker is restarted
+    HEATMAP_FORMAT = "jpg"                # Heatmap image format: jpg, png or webp
+    HEATMAP_QUALITY = 85                  # Heatmap jpg/webp quality (1-100); lower means smaller uploads
+    HEATMAP_SIZE = 0                      # Longest side of heatmap images in pixels; maps are downscaled to fit (0 = full size)
+    HEATMAP_MODE = "coverage"             # Heatmap shading: "coverage" (where players were) or "density" (how many)
+    HEATMAP_REFERENCE = 0                 # Density shown as full heat, fixed so days compare (0 = scale to each render's peak)
@@ -47,6 +47,8 @@ async def main():
     await load()
     await bot.start(Config.DISCORD_TOKEN)
 
-asyncio.run(main())
+# Guarded so heatmap worker processes (which import this module) don't start the bot
+if __name__ == '__main__':
+    asyncio.run(main())
 
     
\ No newline at end of file
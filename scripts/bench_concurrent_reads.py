@@ -0,0 +1,125 @@
+"""
+Concurrent /stats read benchmark.
+Runs /stats lookups from several concurrent readers through the database
+executor while a writer commits kill batches, once with the connection layer as
+shipped (WAL, tuned pragmas, per-thread persistent connections) and once the way
+it used to be (rollback journal, default pragmas, a new connection per call).
+Each configuration runs in its own process on a scratch database.
+
+Usage:
+    python scripts/bench_concurrent_reads.py [seconds]
+"""
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLAYERS = 20000
+READERS = 8
+KILLS_PER_BATCH = 50
+MODES = ("legacy", "pooled")
+
+
+def use_legacy_connections(killfeed_database) -> None:
+    """Put back what the connection layer replaced: rollback journal and a fresh default connection per call."""
+    conn = sqlite3.connect(killfeed_database.KILLFEED_DB_PATH)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+    killfeed_database.get_connection = lambda db_path=killfeed_database.KILLFEED_DB_PATH: sqlite3.connect(db_path)
+
+
+async def ingest(database, killfeed_database, stop: asyncio.Event, timings: list) -> None:
+    """Commit batches of kills (plus new players, counters and a series point) until stopped."""
+    while not stop.is_set():
+        batch = killfeed_database.StatsBatch()
+        started = time.perf_counter()
+        for _ in range(KILLS_PER_BATCH):
+            batch.record_kill(f"P{random.randrange(PLAYERS)}", f"P{random.randrange(PLAYERS)}")
+        for _ in range(20):
+            batch.add_player(f"New{random.random()}")
+        batch.add_counters(KILLS_PER_BATCH, KILLS_PER_BATCH)
+        batch.add_series_value('data', 5)
+        await database.write(batch.commit)
+        timings.append(time.perf_counter() - started)
+
+
+async def reader(database, stop: asyncio.Event, timings: list) -> None:
+    """What /stats reads for a player: the profile row and the UID."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await database.get_stats_profile(f"P{random.randrange(PLAYERS)}")
+        await database.get_player_uid(f"P{random.randrange(PLAYERS)}")
+        timings.append(time.perf_counter() - started)
+
+
+async def measure(duration: float):
+    from utils.killfeed_db_executor import DatabaseExecutor
+    from utils import killfeed_database
+
+    database = DatabaseExecutor()
+    stop = asyncio.Event()
+    batches, reads = [], []
+    tasks = [asyncio.create_task(ingest(database, killfeed_database, stop, batches))]
+    tasks += [asyncio.create_task(reader(database, stop, reads)) for _ in range(READERS)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await database.shutdown()
+    return batches, reads
+
+
+def run_mode(mode: str, duration: float) -> None:
+    """Benchmark one connection configuration in the current process."""
+    logging.disable(logging.CRITICAL)
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as directory:
+        # The database lives at db/killfeed.db relative to the working directory
+        os.chdir(directory)
+        os.makedirs("db")
+        from utils import killfeed_database
+
+        conn, _ = killfeed_database.initialize_master_db()
+        killfeed_database.initialize_activity_db()
+        conn.executemany("INSERT INTO stats (user, kills, deaths, alivetime) VALUES (?, ?, ?, 0)",
+                         [(f"P{i}", random.randint(0, 500), random.randint(0, 500)) for i in range(PLAYERS)])
+        conn.commit()
+        conn.close()
+        killfeed_database.load_known_players()
+        killfeed_database.close_connections()
+        if mode == "legacy":
+            use_legacy_connections(killfeed_database)
+
+        batches, reads = asyncio.run(measure(duration))
+        reads.sort()
+
+        def percentile(share):
+            return reads[min(len(reads) - 1, int(len(reads) * share))] * 1000
+
+        print(f"{mode:>7}: /stats {len(reads) / duration:6.0f} reads/s  p50 {percentile(0.5):6.1f}ms  "
+              f"p95 {percentile(0.95):6.1f}ms  max {reads[-1] * 1000:6.0f}ms | "
+              f"ingest {len(batches) / duration:5.1f} batches/s ({KILLS_PER_BATCH} kills each)")
+        killfeed_database.close_connections()
+
+
+def main(duration: float = 6.0) -> int:
+    print(f"{READERS} /stats readers against {PLAYERS} players during ingest, {duration:.0f}s per run")
+    for mode in MODES:
+        # A fresh process per mode, so no connection or cache carries over
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, str(duration)])
+        if result.returncode:
+            return result.returncode
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2], float(sys.argv[3]) if len(sys.argv) > 3 else 6.0)
+        sys.exit(0)
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 6.0))
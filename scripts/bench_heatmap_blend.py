@@ -0,0 +1,75 @@
+"""
+Heatmap blend benchmark.
+Times the original per-pixel blending loop against blend_overlay() on a random
+map with a real heatmap overlay (positions, blur, colormap) at several sizes,
+and checks that both produce the same image.
+
+Usage:
+    python scripts/bench_heatmap_blend.py [size ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from utils import heatmap  # noqa: E402
+
+SIZES = (1024, 2048, 4096)
+POINTS = 300
+
+
+def loop_blend(image, overlay_rgba):
+    """The blend as generate_heatmap did it before blend_overlay, one pixel at a time."""
+    height, width = image.shape[:2]
+    for y in range(height):
+        for x in range(width):
+            if overlay_rgba[y, x, 3] > 0:
+                alpha = overlay_rgba[y, x, 3] / 255.0
+                image[y, x] = (1 - alpha) * image[y, x] + alpha * overlay_rgba[y, x, :3]
+    return image
+
+
+def build_overlay(size: int, points: int, rng: np.random.Generator) -> np.ndarray:
+    """BGRA overlay built the same way as draw_heatmap, for random Chernarus positions."""
+    map_size = heatmap.MAP_DIMENSIONS["chernarus"]
+    coords = np.column_stack([rng.uniform(0, map_size, points), rng.uniform(0, map_size, points), np.zeros(points)])
+    density = heatmap.accumulate_density(coords, "chernarus", size, size)
+    density = cv2.GaussianBlur(density, (35, 35), 0)
+    normalized = cv2.normalize(density, None, 0, 1, cv2.NORM_MINMAX, dtype=cv2.CV_32F)
+    alpha_channel = np.clip(normalized * 255, 0, 255).astype(np.uint8)
+    colored = cv2.applyColorMap(alpha_channel, heatmap.create_custom_colormap())
+    blue_mask = (colored[:, :, 0] > 100) & (colored[:, :, 1] < 100) & (colored[:, :, 2] < 100)
+    alpha_channel[blue_mask] = np.clip(alpha_channel[blue_mask] * 3, 0, 255)
+    return cv2.merge((colored[:, :, 0], colored[:, :, 1], colored[:, :, 2], alpha_channel))
+
+
+def main(sizes=SIZES) -> int:
+    rng = np.random.default_rng(3)
+    mismatches = 0
+    print(f"{'size':>11} {'points':>7} {'loop':>9} {'blend_overlay':>14} {'max diff':>9}")
+    for size in sizes:
+        background = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        overlay = build_overlay(size, POINTS, rng)
+
+        started = time.perf_counter()
+        expected = loop_blend(background.copy(), overlay)
+        loop_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        blended = heatmap.blend_overlay(background.copy(), overlay)
+        blend_time = time.perf_counter() - started
+
+        diff = int(np.abs(expected.astype(np.int16) - blended).max())
+        mismatches += diff > 0
+        print(f"{size:>5}x{size:<5} {POINTS:>7} {loop_time:>8.2f}s {blend_time * 1000:>12.1f}ms {diff:>9}")
+    if mismatches:
+        print("blend_overlay differs from the per-pixel loop")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(size) for size in sys.argv[1:]] or SIZES))
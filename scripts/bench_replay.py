@@ -0,0 +1,121 @@
+"""
+Killfeed replay benchmark.
+Replays a synthetic ADM log (kills, deaths, hits and PlayerList blocks) through
+check_server_log on a scratch database, committing the cycle's batch the way
+process_server does, and reports the SQLite commits, batch commits sent to the
+writer thread and wall time of the cycle together with the resulting stat totals.
+
+Usage:
+    python scripts/bench_replay.py [lines]
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Server ID the synthetic log is written under in files/
+REPLAY_SERVER_ID = 990001
+
+
+def synthetic_log(count, rng):
+    """`count` ADM lines of a busy server: mostly hits, with kills, deaths and PlayerList blocks."""
+    names = [f"Player{i}" for i in range(150)]
+
+    def player(dead=False):
+        position = f"{rng.uniform(0, 15000):.1f}, {rng.uniform(0, 400):.1f}, {rng.uniform(0, 15000):.1f}"
+        return f'Player "{rng.choice(names)}"{" (DEAD)" if dead else ""} (id=X pos=<{position}>)'
+
+    lines = ["AdminLog started on 2025-01-31 at 06:17:39"]
+    while len(lines) < count:
+        roll = rng.random()
+        stamp = f"12:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        if roll < 0.05:
+            online = rng.randint(10, 40)
+            lines.append(f"{stamp} | ##### PlayerList log: {online} players")
+            lines += [f"{stamp} | {player()}" for _ in range(online)]
+            lines.append(f"{stamp} | #####")
+        elif roll < 0.12:
+            lines.append(f"{stamp} | {player(True)} killed by {player()} with M4-A1 from 55.2 meters ")
+        elif roll < 0.16:
+            lines.append(f"{stamp} | {player(True)} bled out")
+        elif roll < 0.18:
+            lines.append(f"{stamp} | {player(True)}[HP: 0] hit by FallDamage")
+        else:
+            lines.append(f"{stamp} | {player()}[HP: 80] hit by {player()} into Torso(1) for 20 damage (Bullet) with M4-A1 from 40 meters")
+    return lines
+
+
+class ReplayBot:
+    """Just enough of a bot for the cog: no channels are configured."""
+
+    def get_channel(self, _):
+        return None
+
+
+async def replay(cog, database, killfeed_database):
+    """One server cycle, committed like process_server does."""
+    batch = killfeed_database.StatsBatch()
+    await cog.check_server_log(REPLAY_SERVER_ID, {}, batch, "chernarus")
+    await database.write(batch.commit)
+
+
+def main(count: int = 3000) -> int:
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        # The database lives at db/killfeed.db relative to the working directory
+        os.chdir(directory)
+        os.makedirs("db")
+
+        from utils import killfeed_database
+        from utils.killfeed_db_executor import database
+        from cogs.newkillfeed import Killfeed
+
+        commits = []
+        open_connection = killfeed_database.open_connection
+
+        def counted_connection(*args, **kwargs):
+            conn = open_connection(*args, **kwargs)
+            conn.set_trace_callback(lambda statement: commits.append(1) if statement.startswith("COMMIT") else None)
+            return conn
+
+        killfeed_database.open_connection = counted_connection
+
+        batch_commits = []
+        write = database.write
+
+        async def counted_write(func, *args, **kwargs):
+            if getattr(func, "__name__", "") == "commit":
+                batch_commits.append(1)
+            return await write(func, *args, **kwargs)
+
+        database.write = counted_write
+
+        lines = synthetic_log(count, random.Random(7))
+        log_path = os.path.join(ROOT, "files", f"{REPLAY_SERVER_ID}.ADM")
+        with open(log_path, "w") as log_file:
+            log_file.write("\n".join(lines) + "\n")
+        try:
+            cog = Killfeed(ReplayBot())
+            cog.testing = True
+            started = time.perf_counter()
+            asyncio.run(replay(cog, database, killfeed_database))
+            elapsed = time.perf_counter() - started
+        finally:
+            os.remove(log_path)
+
+        conn = killfeed_database.get_connection()
+        kills, deaths, players = conn.execute("SELECT SUM(kills), SUM(deaths), COUNT(*) FROM stats").fetchone()
+        print(f"Replayed {len(lines)} lines: {len(commits)} SQLite commits, {len(batch_commits)} batch commits, {elapsed:.2f}s wall")
+        print(f"Stats: {players} players, {kills} kills, {deaths} deaths")
+        killfeed_database.close_connections()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
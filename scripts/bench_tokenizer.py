@@ -0,0 +1,212 @@
+"""
+ADM tokenizer benchmark.
+Classifies a synthetic ADM log (a realistic mix of hits, kills, deaths, connects,
+PlayerList blocks and emotes) with a frozen copy of the per-line predicate and
+extractor chain check_server_log used before the tokenizer, and with
+killfeed_tokenizer.tokenize_line(). Both are first compared line by line on the
+sample log in files/ and part of the synthetic one; the script exits with an
+error if they disagree.
+
+Usage:
+    python scripts/bench_tokenizer.py [lines]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import killfeed_tokenizer  # noqa: E402
+from utils.Weapons import Weapons  # noqa: E402
+
+SAMPLE_LOG = os.path.join(ROOT, "files", "15987256.ADM")
+COMPARED_LINES = 50000
+
+
+# Frozen copy of the classifier the tokenizer replaced: the killfeed_events
+# predicates and killfeed_helpers extractors, applied in check_server_log's order
+def extract_player_name(line):
+    match = re.search(r'Player\s+"([^"]+)"', line)
+    return str(match.group(1)).strip() if match else ""
+
+
+def extract_killer_victim(line):
+    victim = re.search(r'Player\s+"([^"]+)"\s+(?:\(DEAD\))?\s*\(id=[^)]+\s+pos=<[^>]+>\)\s+killed by', line)
+    killer = re.search(r'killed by Player\s+"([^"]+)"', line)
+    return (killer.group(1) if killer else ""), (victim.group(1) if victim else "")
+
+
+def extract_timestamp(line):
+    match = re.search(r"(\d+:\d+:\d+)", line)
+    return match.group(1) if match else ""
+
+
+def extract_distance(line):
+    try:
+        match = re.search(r"from ([0-9.]+) meters", line)
+        return round(float(match.group(1)), 2) if match else 0.0
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def extract_weapon(line, weapons_data=None):
+    weapon_match = re.search(r" with (.*) from", line) or re.search(r"with (.*)", line)
+    weapon = weapon_match.group(1) if weapon_match else "Unknown"
+    if weapons_data and weapon in weapons_data.get('data', {}):
+        weapon = weapons_data['data'][weapon]
+    return weapon
+
+
+def extract_bodypart(line):
+    match = re.search(r'into ([^(]+)', line)
+    return match.group(1) if match else ""
+
+
+def extract_coordinates_from_line(line):
+    return re.findall(r'pos=<([^>]+)>', line)
+
+
+def extract_explosion_type(line):
+    match = re.search(r"\[HP: 0\] hit by explosion \((.*)\)", line)
+    return match.group(1) if match else "Unknown"
+
+
+def extract_uid_from_state_machine_event(line):
+    match = re.search(r'\[StateMachine\]: Player\s+(.+?)\s+\(dpnid\s+\d+\s+uid\s+([A-F0-9]*)\)', line)
+    return (match.group(1).strip(), match.group(2) or "") if match else ("", "")
+
+
+def legacy_classify(raw):
+    """Everything the old loop worked out for one line: (actor, marker, position, online, kind, fields)."""
+    line = raw.strip()
+    actor = extract_player_name(line)
+    marker = "list" if "##### PlayerList log:" in line else ("end" if re.match(r"\d{2}:\d{2}:\d{2} \| #####", line) else "")
+    position = re.search(r'pos=<([\d.]+), [\d.]+, ([\d.]+)>', line)
+    position = tuple(map(float, position.groups())) if position else None
+    online = re.search(r"(\d+)(?=\s*players)", line)
+    online = int(online.group(1)) if online else -1
+    bodypart = extract_bodypart(line)
+    if "[StateMachine]:" in line and "Player" in line:
+        extract_uid_from_state_machine_event(line)
+    kind, fields = None, ()
+    if "is connected" in line and "(id=" in line and "has been disconnected" not in line:
+        kind, fields = "connect", (extract_timestamp(line), extract_player_name(line))
+    elif "has been disconnected" in line:
+        kind, fields = "disconnect", (extract_timestamp(line), extract_player_name(line))
+    elif "committed suicide" in line:
+        kind, fields = "suicide", (extract_timestamp(line), extract_player_name(line))
+    elif "hit by explosion" in line:
+        kind, fields = "explosion", (extract_timestamp(line), extract_player_name(line), extract_explosion_type(line))
+    elif "bled out" in line:
+        kind, fields = "bleed_out", (extract_timestamp(line), extract_player_name(line))
+    elif any(wolf in line for wolf in ["Animal_CanisLupus_Grey", "Animal_CanisLupus_White"]):
+        kind, fields = "wolf", (extract_timestamp(line), extract_player_name(line))
+    elif any(bear in line for bear in ["Animal_UrsusArctos", "Brown Bear"]):
+        kind, fields = "bear", (extract_timestamp(line), extract_player_name(line))
+    elif "hit by FallDamage" in line:
+        kind, fields = "fall", (extract_timestamp(line), extract_player_name(line))
+    elif "killed by Player" in line:
+        killer, victim = extract_killer_victim(line)
+        kind, fields = "pvp", (extract_timestamp(line), killer, victim, tuple(extract_coordinates_from_line(line)),
+                               extract_weapon(line, Weapons.weapons), extract_distance(line), bodypart)
+    elif "died" in line:  # is_death_event, narrowed to "died" by the old loop
+        kind, fields = "death", (extract_timestamp(line), extract_player_name(line))
+    return actor, marker, position, online, kind, fields
+
+
+def tokenized(raw):
+    """The same facts as legacy_classify, read from the tokenizer's AdmEvent."""
+    event = killfeed_tokenizer.tokenize_line(raw)
+    kind = event.kind
+    marker = "list" if kind == killfeed_tokenizer.PLAYER_LIST else ("end" if kind == killfeed_tokenizer.PLAYER_LIST_END else "")
+    position = killfeed_tokenizer.position_xz(event.positions[0]) if event.positions else None
+    if kind in (killfeed_tokenizer.OTHER, killfeed_tokenizer.PLAYER_LIST, killfeed_tokenizer.PLAYER_LIST_END,
+                killfeed_tokenizer.STATE_MACHINE):
+        kind = None
+    fields = ()
+    if kind in (killfeed_tokenizer.CONNECT, killfeed_tokenizer.DISCONNECT):
+        fields = (event.time, event.actor)
+    elif kind == killfeed_tokenizer.EXPLOSION:
+        fields = (event.time, event.victim, event.detail)
+    elif kind == killfeed_tokenizer.PVP:
+        fields = (event.time, event.actor, event.victim, event.positions,
+                  Weapons.weapons["data"].get(event.weapon, event.weapon), event.distance, event.bodypart)
+    elif kind:
+        fields = (event.time, event.victim)
+    # The old loop's actor was the first quoted name, which on a kill line is the victim
+    actor = event.victim if kind == killfeed_tokenizer.PVP else event.actor or event.victim
+    return actor, marker, position, event.players, kind, fields
+
+
+def synthetic_log(count, rng):
+    """`count` ADM lines in roughly the mix of a busy server."""
+    names = [f"Player{i}" for i in range(200)] + ["Some Guy", "x_y__z"]
+
+    def pos():
+        return f"{rng.uniform(0, 15000):.1f}, {rng.uniform(0, 400):.1f}, {rng.uniform(0, 15000):.1f}"
+
+    def uid():
+        return "".join(rng.choice("ABCDEF0123456789") for _ in range(40))
+
+    def ts():
+        return f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+
+    def player(dead=False):
+        return f'Player "{rng.choice(names)}"{" (DEAD)" if dead else ""} (id={uid()} pos=<{pos()}>)'
+
+    generators = [
+        (20, lambda: f'{ts()} | Player "{rng.choice(names)}"(id={uid()}) is connected'),
+        (20, lambda: f'{ts()} | Player "{rng.choice(names)}"(id={uid()}) has been disconnected'),
+        (120, lambda: f'{ts()} | {player()}[HP: 71.3] hit by {player()} into Torso(23) for 28.7 damage (Bullet_556x45) with M4-A1 from 54.3 meters '),
+        (10, lambda: f'{ts()} | {player(True)} killed by {player()} with {rng.choice(["KA-M", "M4-A1", "Mosin 91/30"])} from {rng.uniform(1, 400):.5f} meters '),
+        (3, lambda: f'{ts()} | {player()} committed suicide'),
+        (3, lambda: f'{ts()} | {player(True)}[HP: 0] hit by explosion (LandMineExplosion)'),
+        (3, lambda: f'{ts()} | {player(True)} bled out'),
+        (3, lambda: f'{ts()} | {player(True)} killed by Animal_CanisLupus_Grey'),
+        (3, lambda: f'{ts()} | {player(True)} killed by Animal_UrsusArctos'),
+        (3, lambda: f'{ts()} | {player(True)}[HP: 0] hit by FallDamage'),
+        (5, lambda: f'{ts()} | {player(True)} died. Stats> Water: 1234.5 Energy: 987.3 Bleed sources: 0'),
+        (60, lambda: f'{ts()} | {player()} placed Fireplace'),
+        (40, lambda: f'{ts()} | [emote] SurvivorF_Baty:2:INSTANCETYPE_SERVER play emote id=14 IH=M4A1:4240'),
+    ]
+    weights = [weight for weight, _ in generators]
+    lines = []
+    while len(lines) < count:
+        if rng.random() < 0.01:
+            stamp, online = ts(), rng.randint(1, 30)
+            lines.append(f"{stamp} | ##### PlayerList log: {online} players")
+            lines += [f"{stamp} | {player()}" for _ in range(online)]
+            lines.append(f"{stamp} | #####")
+        else:
+            lines.append(rng.choices(generators, weights)[0][1]())
+    return lines[:count]
+
+
+def main(count: int = 1000000) -> int:
+    lines = synthetic_log(count, random.Random(1))
+    sample = open(SAMPLE_LOG, encoding="utf-8", errors="replace").read().splitlines() if os.path.exists(SAMPLE_LOG) else []
+
+    mismatches = 0
+    for line in sample + lines[:COMPARED_LINES]:
+        old, new = legacy_classify(line), tokenized(line)
+        # The tokenizer only reads positions and the player count where the killfeed uses them
+        if old[:2] + old[4:] != new[:2] + new[4:] or (old[1] == "list" and old[3] != new[3]):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"Mismatch: {line}\n  old: {old}\n  new: {new}")
+    print(f"Compared {len(sample) + min(count, COMPARED_LINES)} lines, {mismatches} mismatches")
+
+    for label, classify in (("old per-line chain", legacy_classify), ("tokenizer", killfeed_tokenizer.tokenize_line)):
+        started = time.perf_counter()
+        for line in lines:
+            classify(line)
+        elapsed = time.perf_counter() - started
+        print(f"{label:>18}: {len(lines) / elapsed:>10,.0f} lines/s ({elapsed:.2f}s)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000))
@@ -0,0 +1,81 @@
+"""
+Query plan regression check for the killfeed database.
+Builds a scratch stats table of many players through initialize_master_db() (so
+every migration runs), then asks SQLite for the plan of each hot query and fails
+if any of them falls back to a full table SCAN.
+
+Usage:
+    python scripts/check_query_plans.py [players]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import killfeed_database  # noqa: E402
+
+# Hot queries of the killfeed and the slash commands, with sample parameters
+HOT_QUERIES = {
+    "player lookup (get_player_stats)": (
+        "SELECT user, kills, deaths, alivetime, deathstreak, killstreak FROM stats WHERE user = ? COLLATE NOCASE",
+        ("player123",)),
+    "rank snapshot": ("SELECT kills, deaths FROM stats WHERE user = ? COLLATE NOCASE", ("player123",)),
+    "new player insert guard": (killfeed_database.INSERT_NEW_PLAYER_SQL, ("x", 0, "x")),
+    "batched stat update": (
+        "UPDATE stats SET kills = kills + ?, deaths = deaths + ?, "
+        "killstreak = killstreak * ? + ?, deathstreak = deathstreak * ? + ? WHERE user = ? COLLATE NOCASE",
+        (1, 0, 1, 1, 0, 0, "player5")),
+    "batched device update": ("UPDATE stats SET device_id = ?, uid = ? WHERE user = ?", ("d", "u", "Player5")),
+    "device update": ("UPDATE stats SET device_id = ?, uid = ? WHERE user = ? COLLATE NOCASE", ("d", "u", "player5")),
+    "users by device (alt detection)": ("SELECT user FROM stats WHERE device_id = ?", ("dev5",)),
+    "uid lookup": ("SELECT user FROM stats WHERE uid = ?", ("UID5",)),
+    "device ban check": ("SELECT 1 FROM deviceid_bans WHERE device_id = ?", ("dev7",)),
+    "unban by username": ("DELETE FROM deviceid_bans WHERE username = ?", ("nobody",)),
+    "/stats by name": (killfeed_database.STATS_PROFILE_SQL + "WHERE user = ? COLLATE NOCASE", ("player77",)),
+    "/stats by link": (killfeed_database.STATS_PROFILE_SQL + "WHERE dcid = ?", (5,)),
+    "/link, /unlink lookup": ("SELECT user FROM stats WHERE dcid = ?", (5,)),
+    "/staffunlink": ("UPDATE stats SET dcid = NULL WHERE dcid = ?", (5,)),
+}
+
+
+def build_database(db_path: str, players: int):
+    """Create the schema and fill stats and deviceid_bans with random players."""
+    conn, _ = killfeed_database.initialize_master_db(db_path)
+    random.seed(3)
+    conn.executemany(
+        "INSERT INTO stats (user, kills, deaths, alivetime, dcid, device_id, uid) VALUES (?, ?, ?, 0, ?, ?, ?)",
+        [(f"Player{i}", random.randint(0, 2000), random.randint(0, 2000), random.randint(1, 10 ** 17),
+          f"dev{i // 3}", f"UID{i}") for i in range(players)]
+    )
+    conn.executemany("INSERT INTO deviceid_bans (username, device_id) VALUES (?, ?)",
+                     [(f"Player{i}", f"dev{i}") for i in range(0, min(players, 5000), 7)])
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def main(players: int = 500000) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        conn = build_database(os.path.join(directory, "plans.db"), players)
+        print(f"Built {players} players in {time.perf_counter() - started:.1f}s")
+        failures = 0
+        for name, (sql, params) in HOT_QUERIES.items():
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            # The INSERT ... SELECT guard reads one constant row, which is not a table scan
+            scans = [step for step in plan if step.startswith("SCAN") and step != "SCAN CONSTANT ROW"]
+            failures += bool(scans)
+            print(f"{'SCAN' if scans else 'ok  '} {name:35s} {' | '.join(plan)}")
+        conn.close()
+    if failures:
+        print(f"{failures} hot queries fall back to a table scan")
+        return 1
+    print("All hot queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000))
@@ -0,0 +1,83 @@
+"""
+Event loop responsiveness check for gameserver setting updates.
+Runs a sequential sweep of postSetting calls (what /bandevice does across
+accounts and servers) against a local stub of the Nitrado settings endpoint
+that answers slowly, while a ticker measures how late the event loop wakes it.
+Fails if any call does not succeed or the loop stalls.
+
+Usage:
+    python scripts/check_settings_sweep.py [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+from config import Config  # noqa: E402
+
+# Keep the client's rate limiter out of the measurement
+Config.NITRADO_RATE_LIMIT = 6000
+Config.NITRADO_RATE_BURST = 100
+
+from utils import nitradoFuncs  # noqa: E402
+
+RESPONSE_DELAY = 0.1   # Seconds the stub takes to answer each request
+TICK = 0.01            # Seconds between ticker wake-ups
+MAX_LAG = 0.05         # Worst tolerated ticker delay, far below one blocked request
+
+
+async def settings(request: web.Request) -> web.Response:
+    """Stub of POST /services/{id}/gameservers/settings."""
+    await asyncio.sleep(RESPONSE_DELAY)
+    return web.Response(text="{}")
+
+
+async def main(requests: int = 50) -> int:
+    app = web.Application()
+    app.router.add_post("/services/{id}/gameservers/settings", settings)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    nitradoFuncs.NITRADO_API_URL = f"http://{host}:{port}"
+
+    lags = []
+    sweeping = True
+
+    async def ticker():
+        while sweeping:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - started - TICK)
+
+    ticks = asyncio.create_task(ticker())
+    functions = nitradoFuncs.NitradoFunctions()
+    started = time.perf_counter()
+    try:
+        statuses = [await functions.postSetting("general", "bans", f"player{i}", i) for i in range(requests)]
+    finally:
+        sweeping = False
+        await ticks
+        await nitradoFuncs.client.close()
+        await runner.cleanup()
+    elapsed = time.perf_counter() - started
+
+    failed = sum(status != 200 for status in statuses)
+    worst = max(lags, default=0.0)
+    # A blocked loop can't run the ticker at all, so too few ticks fail the check as well
+    expected_ticks = int(elapsed / (TICK + MAX_LAG))
+    print(f"{requests} requests in {elapsed:.2f}s, {failed} failed; "
+          f"{len(lags)} ticks, worst loop lag {worst * 1000:.1f}ms")
+    if failed or worst > MAX_LAG or len(lags) < expected_ticks:
+        print("Settings sweep blocked the event loop or failed")
+        return 1
+    print("Event loop stayed responsive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)))
@@ -1,6 +1,20 @@
+import functools
+import io
+import os
 import numpy as np
 import cv2
 
+# Output formats and the cv2 option their quality setting maps to (PNG is lossless)
+IMAGE_FORMATS = {
+    "jpg": cv2.IMWRITE_JPEG_QUALITY,
+    "png": None,
+    "webp": cv2.IMWRITE_WEBP_QUALITY,
+}
+
+# Decoded map backgrounds kept per process, one entry per (file version, output size)
+BACKGROUND_CACHE_SIZE = 8
+
+@functools.lru_cache(maxsize=None)
 def create_custom_colormap():
     colors = [
         [0, 0, 128],     # Dark Blue
@@ -25,54 +39,179 @@ def create_custom_colormap():
         colormap.append(colors[-1])
         
     custom_colormap = np.array(colormap, dtype=np.uint8).reshape(256, 1, 3)
+    # Built once and shared, so it must not be modified
+    custom_colormap.setflags(write=False)
     return custom_colormap
-def generate_heatmap(background_path, playercoords, map_name="chernarus"):
+
+@functools.lru_cache(maxsize=BACKGROUND_CACHE_SIZE)
+def decode_background(background_path, modified, size):
+    """Decode a background and shrink it so its longest side is at most `size` (0 keeps it as is)."""
+    map_image = cv2.imread(background_path)
+    if map_image is None:
+        raise ValueError(f"Error loading image from path: {background_path}")
+    height, width = map_image.shape[:2]
+    if size and max(height, width) > size:
+        scale = size / max(height, width)
+        map_image = cv2.resize(map_image, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA)
+    map_image.setflags(write=False)
+    return map_image
+
+def load_background(background_path, size=None):
+    """Decoded (and optionally downscaled) map background, read from disk once per file version; read-only."""
     try:
-        map_image = cv2.imread(background_path)
-        if map_image is None:
-            raise ValueError(f"Error loading image from path: {background_path}")
-
-        height, width, _ = map_image.shape
-
-        # Map dimensions for coordinate scaling
-        map_dimensions = {
-            "chernarus": 15360.0,
-            "livonia": 12800.0,
-            "sahkal": 12800.0 #Placeholder value until actual map size is known
-        }
-        
-        map_size = map_dimensions.get(map_name.lower(), 15360.0)
-        
-        x_scale_factor = width / map_size
-        y_scale_factor = height / map_size
+        modified = os.stat(background_path).st_mtime_ns
+    except OSError:
+        raise ValueError(f"Error loading image from path: {background_path}")
+    return decode_background(background_path, modified, size or 0)
+
+# Rows blended at a time; bounds the float64 temporaries on large maps
+BLEND_ROWS = 512
+
+def blend_overlay(image, overlay_rgba):
+    """
+    Alpha-blend a BGRA overlay onto a BGR image in place.
+    Only pixels where the overlay is visible are touched; the arithmetic (float64,
+    truncated back to uint8) matches blending one pixel at a time.
+    """
+    for top in range(0, image.shape[0], BLEND_ROWS):
+        overlay = overlay_rgba[top:top + BLEND_ROWS]
+        visible = overlay[:, :, 3] > 0
+        if not visible.any():
+            continue
+        band = image[top:top + BLEND_ROWS]
+        if np.count_nonzero(visible) > visible.size // 4:
+            # Mostly covered: blending the whole band is cheaper than gathering pixels,
+            # and zero-alpha pixels come out unchanged
+            alpha = overlay[:, :, 3:] / 255.0
+            band[:] = ((1 - alpha) * band + alpha * overlay[:, :, :3]).astype(np.uint8)
+        else:
+            colors = overlay[visible]
+            alpha = colors[:, 3:] / 255.0
+            band[visible] = ((1 - alpha) * band[visible] + alpha * colors[:, :3]).astype(np.uint8)
+    return image
+
+# Map dimensions for coordinate scaling
+MAP_DIMENSIONS = {
+    "chernarus": 15360.0,
+    "livonia": 12800.0,
+    "sahkal": 12800.0 #Placeholder value until actual map size is known
+}
+
+# Density modes: "coverage" marks where anyone was (each spot counts once, the original
+# look); "density" adds up points, or their weights, so busy spots stand out
+DENSITY_MODES = ("coverage", "density")
+
+# Radius in pixels of the spot each position leaves before blurring
+POINT_RADIUS = 5
 
-        heatmap = np.zeros((height, width), dtype=np.float32)
+@functools.lru_cache(maxsize=None)
+def point_kernel(radius=POINT_RADIUS):
+    """Footprint of one position, exactly as cv2.circle fills it; read-only."""
+    kernel = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.float32)
+    cv2.circle(kernel, (radius, radius), radius=radius, color=1, thickness=-1)
+    # Flipped so sliding it over the image stamps the footprint rather than its mirror image
+    kernel = np.ascontiguousarray(kernel[::-1, ::-1])
+    kernel.setflags(write=False)
+    return kernel
 
-        for coord in playercoords:
-            # Livonia and Sakhal use X, Z; Chernarus uses X, Y
-            if map_name.lower() in ["livonia", "sakhal"]:
-                x, y = int(coord[0] * x_scale_factor), int((map_size - coord[2]) * y_scale_factor)
-            else:
-                x, y = int(coord[0] * x_scale_factor), int((map_size - coord[1]) * y_scale_factor)
-            if 0 <= x < width and 0 <= y < height:
-                cv2.circle(heatmap, (x, y), radius=5, color=1, thickness=-1) 
+def project_points(playercoords, map_name, width, height):
+    """
+    Pixel positions of map coordinates on a width x height image.
 
-        heatmap = cv2.GaussianBlur(heatmap, (35, 35), 0)
+    Returns:
+        tuple: (x, y, kept) index arrays; `kept` marks which input points land on the image
+    """
+    coords = np.asarray(playercoords, dtype=np.float64)
+    if coords.size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bool)
+    coords = coords.reshape(len(coords), -1)
+    map_size = MAP_DIMENSIONS.get(map_name.lower(), 15360.0)
+    # Livonia and Sakhal use X, Z; Chernarus uses X, Y
+    north = coords[:, 2] if map_name.lower() in ["livonia", "sakhal"] else coords[:, 1]
+    # Truncate toward zero like int(), and drop anything off the map
+    x = np.trunc(coords[:, 0] * (width / map_size))
+    y = np.trunc((map_size - north) * (height / map_size))
+    kept = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    return x[kept].astype(np.int64), y[kept].astype(np.int64), kept
+
+def accumulate_density(playercoords, map_name, width, height, weights=None, mode="coverage"):
+    """
+    Bin positions into a width x height density grid in one pass, whatever the
+    number of points, then stamp the point footprint once over the whole grid.
+
+    Args:
+        playercoords: Map coordinates, as passed to generate_heatmap
+        map_name: Map the coordinates belong to
+        width, height: Grid size in pixels
+        weights: Optional weight per coordinate (e.g. seconds spent there, kills); density mode only
+        mode: "coverage" or "density" (see DENSITY_MODES)
+
+    Returns:
+        np.ndarray: float32 grid, before blurring
+    """
+    if mode not in DENSITY_MODES:
+        raise ValueError(f"Unknown density mode: {mode}")
+    x, y, kept = project_points(playercoords, map_name, width, height)
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[kept]
+    # bincount over flat pixel indices is np.add.at without its per-element overhead
+    counts = np.bincount(y * width + x, weights=weights, minlength=width * height)
+    grid = counts.reshape(height, width).astype(np.float32)
+    if mode == "coverage":
+        return cv2.dilate((grid > 0).astype(np.uint8), point_kernel().astype(np.uint8)).astype(np.float32)
+    return cv2.filter2D(grid, -1, point_kernel(), borderType=cv2.BORDER_CONSTANT)
+
+def draw_heatmap(background_path, playercoords, map_name="chernarus", size=None, weights=None,
+                 mode="coverage", reference=None):
+    """
+    Draw the heatmap of `playercoords` over the map background and return the BGR image.
+    `size` caps the longest side of the output (the background is downscaled, never enlarged).
+    By default colours are scaled to the busiest spot of this render; a fixed `reference`
+    (the blurred density shown as full heat) keeps renders of different days comparable.
+    """
+    map_image = load_background(background_path, size).copy()
+
+    height, width, _ = map_image.shape
+
+    heatmap = accumulate_density(playercoords, map_name, width, height, weights, mode)
+
+    heatmap = cv2.GaussianBlur(heatmap, (35, 35), 0)
+    if reference:
+        heatmap_normalized = np.clip(heatmap / np.float32(reference), 0, 1)
+    else:
         heatmap_normalized = cv2.normalize(heatmap, None, 0, 1, cv2.NORM_MINMAX, dtype=cv2.CV_32F)
-        alpha_channel = np.clip(heatmap_normalized * 255, 0, 255).astype(np.uint8)
-        heatmap_colored = cv2.applyColorMap(alpha_channel, create_custom_colormap())
-        blue_mask = (heatmap_colored[:, :, 0] > 100) & (heatmap_colored[:, :, 1] < 100) & (heatmap_colored[:, :, 2] < 100)
-        alpha_channel[blue_mask] = np.clip(alpha_channel[blue_mask] * 3, 0, 255)
-        heatmap_rgba = cv2.merge((heatmap_colored[:, :, 0], heatmap_colored[:, :, 1], heatmap_colored[:, :, 2], alpha_channel))
-        for y in range(height):
-            for x in range(width):
-                if heatmap_rgba[y, x, 3] > 0:
-                    alpha = heatmap_rgba[y, x, 3] / 255.0
-                    map_image[y, x] = (1 - alpha) * map_image[y, x] + alpha * heatmap_rgba[y, x, :3]
-
-        cv2.imwrite('heatmap.jpg', map_image)
-
-        return 'final_heatmap.jpg'
+    alpha_channel = np.clip(heatmap_normalized * 255, 0, 255).astype(np.uint8)
+    heatmap_colored = cv2.applyColorMap(alpha_channel, create_custom_colormap())
+    blue_mask = (heatmap_colored[:, :, 0] > 100) & (heatmap_colored[:, :, 1] < 100) & (heatmap_colored[:, :, 2] < 100)
+    alpha_channel[blue_mask] = np.clip(alpha_channel[blue_mask] * 3, 0, 255)
+    heatmap_rgba = cv2.merge((heatmap_colored[:, :, 0], heatmap_colored[:, :, 1], heatmap_colored[:, :, 2], alpha_channel))
+    return blend_overlay(map_image, heatmap_rgba)
+
+def encode_image(image, image_format="jpg", quality=85):
+    """Encode a BGR image in memory as jpg, png or webp; quality (0-100) applies to jpg and webp."""
+    image_format = image_format.lower().replace("jpeg", "jpg")
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    quality_option = IMAGE_FORMATS[image_format]
+    params = [quality_option, int(quality)] if quality_option is not None else []
+    ok, encoded = cv2.imencode(f'.{image_format}', image, params)
+    if not ok:
+        raise ValueError(f"Could not encode heatmap as {image_format}")
+    return encoded.tobytes()
+
+def render_heatmap(background_path, playercoords, map_name="chernarus", image_format="jpg", quality=85, size=None,
+                   weights=None, mode="coverage", reference=None):
+    """Draw the heatmap and return the encoded image bytes; raises on failure (used by the render pool)."""
+    image = draw_heatmap(background_path, playercoords, map_name, size, weights, mode, reference)
+    return encode_image(image, image_format, quality)
+
+def generate_heatmap(background_path, playercoords, map_name="chernarus", image_format="jpg", quality=85, size=None,
+                     weights=None, mode="coverage", reference=None):
+    """Draw the heatmap at up to `size` pixels and return it encoded in a BytesIO buffer, ready to attach to a message."""
+    try:
+        return io.BytesIO(render_heatmap(background_path, playercoords, map_name, image_format, quality, size,
+                                         weights, mode, reference))
     
     except Exception as e:
         print(f"An error occurred: {str(e)}")
@@ -0,0 +1,171 @@
+"""
+Process pool for heatmap rendering.
+Reading the map, blurring, colouring and blending are CPU-bound and would freeze
+the event loop (and every server's killfeed with it), so renders run in worker
+processes that are started ahead of the first job. At most HEATMAP_WORKERS
+renders run at once, HEATMAP_MAX_QUEUED more may wait, and anything beyond that
+is dropped. A render that exceeds HEATMAP_TIMEOUT has its workers replaced.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Sequence
+import numpy as np
+from config import Config
+from utils import heatmap
+
+logger = logging.getLogger(__name__)
+
+# Map backgrounds decoded into each worker's cache as it starts
+MAP_BACKGROUNDS = ('./utils/y.jpg', './utils/l.jpg', './utils/s.jpg')
+
+
+def warm_worker() -> None:
+    """Runs once in each worker process so the first render doesn't pay for setup."""
+    heatmap.create_custom_colormap()
+    size = max(0, getattr(Config, "HEATMAP_SIZE", 0))
+    for background_path in MAP_BACKGROUNDS:
+        try:
+            heatmap.load_background(background_path, size)
+        except ValueError:
+            pass  # Missing map images are reported when a render needs them
+
+
+def ready() -> bool:
+    """No-op job used to start the workers."""
+    return True
+
+
+class HeatmapRenderer:
+    """
+    Renders heatmaps in a process pool and returns the encoded image bytes
+    (HEATMAP_FORMAT at HEATMAP_QUALITY, at most HEATMAP_SIZE pixels across), to be
+    attached as `filename`. Each worker keeps decoded backgrounds cached.
+
+    Workers are spawned rather than forked: the bot process runs threads (the
+    database executor, discord.py) that must not be copied mid-operation.
+    """
+
+    def __init__(self):
+        self.workers = max(1, getattr(Config, "HEATMAP_WORKERS", 2))
+        self.max_queued = max(0, getattr(Config, "HEATMAP_MAX_QUEUED", 4))
+        self.timeout = getattr(Config, "HEATMAP_TIMEOUT", 60)
+        self.image_format = str(getattr(Config, "HEATMAP_FORMAT", "jpg")).lower().replace("jpeg", "jpg")
+        if self.image_format not in heatmap.IMAGE_FORMATS:
+            logger.warning(f"Unsupported HEATMAP_FORMAT {self.image_format!r}, using jpg")
+            self.image_format = "jpg"
+        self.quality = min(100, max(1, getattr(Config, "HEATMAP_QUALITY", 85)))
+        self.size = max(0, getattr(Config, "HEATMAP_SIZE", 0))
+        self.mode = getattr(Config, "HEATMAP_MODE", "coverage")
+        if self.mode not in heatmap.DENSITY_MODES:
+            logger.warning(f"Unsupported HEATMAP_MODE {self.mode!r}, using coverage")
+            self.mode = "coverage"
+        self.reference = getattr(Config, "HEATMAP_REFERENCE", 0) or None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = 0  # Renders running or waiting for a worker
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Worker processes, created on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_worker,
+            )
+        return self._pool
+
+    @property
+    def filename(self) -> str:
+        """Attachment name matching the configured format."""
+        return f"heatmap.{self.image_format}"
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Concurrency cap, created on first use inside the running loop."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._slots
+
+    async def start(self) -> None:
+        """Start every worker process now instead of on the first render."""
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self.pool, ready) for _ in range(self.workers)))
+            logger.debug(f"Started {self.workers} heatmap workers")
+        except Exception as e:
+            logger.error(f"Error starting heatmap workers: {e}")
+
+    async def render(self, background_path: str, playercoords: Sequence, map_name: str = "chernarus",
+                     weights: Optional[Sequence] = None) -> Optional[bytes]:
+        """
+        Render a heatmap in a worker process.
+
+        Args:
+            background_path: Map image to draw on
+            playercoords: Player positions, as passed to generate_heatmap
+            map_name: Map the positions belong to
+            weights: Optional weight per position (used when HEATMAP_MODE is "density")
+
+        Returns:
+            Optional[bytes]: The encoded image, or None if the render was dropped, timed out or failed
+        """
+        if self.pending >= self.workers + self.max_queued:
+            logger.warning(f"Heatmap render queue full ({self.pending} pending), skipping render")
+            return None
+        self.pending += 1
+        try:
+            async with self.slots:
+                pool = self.pool
+                # A float array pickles far smaller than a list of tuples
+                points = np.asarray(playercoords, dtype=np.float64)
+                if weights is not None:
+                    weights = np.asarray(weights, dtype=np.float64)
+                started = time.perf_counter()
+                job = asyncio.get_running_loop().run_in_executor(pool, functools.partial(
+                    heatmap.render_heatmap, background_path, points, map_name, self.image_format, self.quality,
+                    self.size, weights=weights, mode=self.mode, reference=self.reference
+                ))
+                try:
+                    image = await asyncio.wait_for(job, self.timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Heatmap render timed out after {self.timeout}s, restarting workers")
+                    self._discard(pool)
+                    return None
+                except BrokenProcessPool as e:
+                    logger.error(f"Heatmap worker died: {e}")
+                    self._discard(pool)
+                    return None
+                logger.debug(f"Rendered heatmap of {len(points)} points in {time.perf_counter() - started:.2f}s")
+                return image
+        except Exception as e:
+            logger.error(f"Error rendering heatmap: {e}")
+            return None
+        finally:
+            self.pending -= 1
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a pool whose worker is stuck or dead; the next render starts a fresh one."""
+        if self._pool is pool:
+            self._pool = None
+        # A running job can't be cancelled, so its process has to be terminated
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes (they restart on next use)."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+            logger.debug("Stopped heatmap workers")
+
+
+# Shared instance used by the cogs
+renderer = HeatmapRenderer()
@@ -4,19 +4,91 @@ Uses a single database with multiple tables instead of separate database files.
 """
 import sqlite3
 import logging
+import string
+import threading
 import time
 from datetime import datetime
 from typing import Tuple, Optional, Dict, Any
+from config import Config
+from utils.killfeed_ranks import RankIndex
 
 logger = logging.getLogger(__name__)
 
 # Global database path
 KILLFEED_DB_PATH = "db/killfeed.db"
 
+# Folds names the way SQLite's NOCASE collation does (ASCII letters only)
+NOCASE_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Folded names of every player in the stats table, filled by load_known_players()
+known_players = set()
+
+# Kill and death counts of every player, filled by load_rank_index() and kept in
+# step with every stats write made through this module
+kill_ranks = RankIndex()
+death_ranks = RankIndex()
+
+
+# Per-connection tuning; WAL itself is persistent and enabled by initialize_master_db()
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA cache_size = -{int(getattr(Config, 'DB_CACHE_SIZE_MB', 16) * 1024)}",
+    f"PRAGMA mmap_size = {int(getattr(Config, 'DB_MMAP_SIZE_MB', 128) * 1024 * 1024)}",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Long-lived connections of the current thread, keyed by database path
+connection_pool = threading.local()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Connection kept open for the lifetime of its thread.
+    close() rolls back anything left uncommitted and keeps the connection (and its
+    prepared statement cache) for the next get_connection() call on the same thread.
+    """
+
+    def close(self) -> None:
+        if self.in_transaction:
+            self.rollback()
+
+    def dispose(self) -> None:
+        """Really close the connection."""
+        super().close()
+
+
+def open_connection(db_path: str = KILLFEED_DB_PATH) -> PooledConnection:
+    """Open a tuned connection for the pool."""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=getattr(Config, "DB_BUSY_TIMEOUT", 5),
+        cached_statements=getattr(Config, "DB_STATEMENT_CACHE", 256),
+        factory=PooledConnection,
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 
 def get_connection(db_path: str = KILLFEED_DB_PATH) -> sqlite3.Connection:
-    """Get a database connection."""
-    return sqlite3.connect(db_path)
+    """Get this thread's pooled connection to a database, opening it on first use."""
+    connections = getattr(connection_pool, "connections", None)
+    if connections is None:
+        connections = connection_pool.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = open_connection(db_path)
+    elif conn.in_transaction:
+        # A helper failed before committing; do not let its changes leak into this one
+        conn.rollback()
+    return conn
+
+
+def close_connections() -> None:
+    """Close every pooled connection of the current thread."""
+    for conn in getattr(connection_pool, "connections", {}).values():
+        conn.dispose()
+    connection_pool.connections = {}
 
 
 def initialize_master_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Connection, sqlite3.Cursor]:
@@ -31,6 +103,8 @@ def initialize_master_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Conne
     """
     try:
         conn = sqlite3.connect(db_path)
+        # WAL lets readers run while the killfeed writes; the mode is stored in the database file
+        conn.execute("PRAGMA journal_mode = WAL")
         cursor = conn.cursor()
         
         # Player statistics table
@@ -173,6 +247,34 @@ def initialize_master_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Conne
             )
         """)
         
+        # Per-server log read cursors (byte offset + file header fingerprint)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS log_cursors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                server_id TEXT NOT NULL,
+                log_type TEXT NOT NULL,
+                byte_offset INTEGER DEFAULT 0,
+                fingerprint TEXT DEFAULT '',
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(server_id, log_type)
+            )
+        """)
+        
+        # Last downloaded remote log file per server and log type
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS remote_log_files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                server_id TEXT NOT NULL,
+                log_type TEXT NOT NULL,
+                path TEXT,
+                listed_size INTEGER,
+                modified_at INTEGER,
+                local_size INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(server_id, log_type)
+            )
+        """)
+        
         # Players table for player-specific settings
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS players (
@@ -184,6 +286,7 @@ def initialize_master_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Conne
         """)
         
         conn.commit()
+        apply_migrations(conn)
         logger.info(f"Master database initialized at {db_path}")
         return conn, cursor
     except Exception as e:
@@ -191,6 +294,86 @@ def initialize_master_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Conne
         raise
 
 
+# Schema migrations applied in order by apply_migrations(); PRAGMA user_version
+# records the last one applied. Append new migrations, never edit shipped ones.
+MIGRATIONS = (
+    (1, "Indexes for player lookups, alt detection, account links and ranks", (
+        # Every player lookup compares with COLLATE NOCASE, which the UNIQUE(user) index can't serve
+        "CREATE INDEX IF NOT EXISTS idx_stats_user_nocase ON stats(user COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_device_id ON stats(device_id)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_uid ON stats(uid)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_dcid ON stats(dcid)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_kills ON stats(kills)",
+        "CREATE INDEX IF NOT EXISTS idx_stats_deaths ON stats(deaths)",
+        "CREATE INDEX IF NOT EXISTS idx_deviceid_bans_username ON deviceid_bans(username)",
+    )),
+    (2, "Bucketed activity time series", (
+        # One row per series, server and time bucket. `resolution` is the bucket width in
+        # seconds (raw points, then hourly rollups); total/samples/peak let readers take
+        # sums, averages or maxima. activity_series_data is no longer appended to.
+        """
+        CREATE TABLE IF NOT EXISTS activity_series (
+            series_name TEXT NOT NULL,
+            server_id TEXT NOT NULL DEFAULT '',
+            resolution INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            samples INTEGER NOT NULL DEFAULT 0,
+            peak INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (series_name, server_id, resolution, bucket)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_activity_series_age ON activity_series(resolution, bucket)",
+    )),
+    (3, "Per-server activity counters", (
+        # Replaces the global activity_counters rows; their totals so far carry over
+        # under server_id '' so global sums stay continuous
+        """
+        CREATE TABLE IF NOT EXISTS server_counters (
+            server_id TEXT NOT NULL,
+            counter_name TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (server_id, counter_name)
+        ) WITHOUT ROWID
+        """,
+        "INSERT OR IGNORE INTO server_counters (server_id, counter_name, value) "
+        "SELECT '', counter_name, activedata FROM activity_counters WHERE activedata != 0",
+        # Cross-server series totals
+        "CREATE INDEX IF NOT EXISTS idx_activity_series_totals ON activity_series(series_name, resolution, bucket)",
+    )),
+)
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Apply the schema migrations the database has not seen yet, each in its own transaction.
+
+    Args:
+        conn: Connection to the master database
+
+    Returns:
+        int: Schema version after migrating
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, description, statements in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.error(f"Migration {number} ({description}) failed", exc_info=True)
+            raise
+        version = number
+        logger.info(f"Applied database migration {number}: {description}")
+    return version
+
+
 def initialize_stats_db(db_path: str = KILLFEED_DB_PATH) -> Tuple[sqlite3.Connection, sqlite3.Cursor]:
     """
     Initialize and return the stats database connection and cursor.
@@ -222,18 +405,6 @@ def initialize_activity_db(db_path: str = KILLFEED_DB_PATH) -> sqlite3.Connectio
     series_names = ['data', 'onlinecount', 'deathdata', 'killdata']
     for series in series_names:
         init_activity_series(series, '0;0;0;0;0;0;0;0;0;0;0;0', db_path)
-    
-    # Initialize activity counters
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT OR IGNORE INTO activity_counters (counter_name, activedata) VALUES (?, ?)",
-        ('killcount', 0)
-    )
-    cursor.execute(
-        "INSERT OR IGNORE INTO activity_counters (counter_name, activedata) VALUES (?, ?)",
-        ('deathcount', 0)
-    )
-    conn.commit()
     conn.close()
     
     return get_connection(db_path)
@@ -254,15 +425,99 @@ def init_activity_series(series_name: str, initial_value: str = '', db_path: str
         logger.error(f"Error initializing series {series_name}: {e}")
 
 
+def player_key(player: str) -> str:
+    """Get the key a player name is stored under in known_players."""
+    return player.translate(NOCASE_FOLD)
+
+
+def load_known_players(db_path: str = KILLFEED_DB_PATH) -> int:
+    """
+    Load the names of all players in the stats table into the known player set.
+    
+    Args:
+        db_path: Path to the database
+    
+    Returns:
+        int: Number of known players
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT user FROM stats")
+        known_players.update(player_key(row[0]) for row in cursor.fetchall() if row[0])
+        conn.close()
+        logger.info(f"Loaded {len(known_players)} known players")
+    except Exception as e:
+        logger.error(f"Error loading known players: {e}")
+    return len(known_players)
+
+
+def load_rank_index(db_path: str = KILLFEED_DB_PATH) -> int:
+    """
+    Load the kill and death counts of all players into the rank engine.
+    
+    Args:
+        db_path: Path to the database
+    
+    Returns:
+        int: Number of players indexed
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT kills, deaths FROM stats").fetchall()
+        conn.close()
+        kill_ranks.rebuild(row[0] for row in rows)
+        death_ranks.rebuild(row[1] for row in rows)
+        logger.info(f"Loaded ranks of {len(rows)} players")
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Error loading rank index: {e}")
+        return 0
+
+
+def ensure_rank_index(db_path: str = KILLFEED_DB_PATH) -> None:
+    """Load the rank engine if nothing has loaded it yet."""
+    if not kill_ranks.loaded:
+        load_rank_index(db_path)
+
+
+def rank_snapshot(cursor, players) -> list:
+    """(kills, deaths) of every stats row matching the players (case-insensitive), for update_ranks()."""
+    rows = []
+    for player in players:
+        rows += cursor.execute("SELECT kills, deaths FROM stats WHERE user = ? COLLATE NOCASE", (player,)).fetchall()
+    return rows
+
+
+def update_ranks(before: list, after: list) -> None:
+    """Apply committed stat changes to the rank engine, given rank_snapshot() from before and after the write."""
+    kill_ranks.replace([row[0] for row in before], [row[0] for row in after])
+    death_ranks.replace([row[1] for row in before], [row[1] for row in after])
+
+
+def is_known_player(player: str) -> bool:
+    """Check the in-memory player set (case-insensitive) without touching the database."""
+    return player_key(player) in known_players
+
+
+INSERT_NEW_PLAYER_SQL = (
+    "INSERT INTO stats (user, kills, deaths, alivetime, killstreak, deathstreak, dcid, money, bounty, device_id) "
+    "SELECT ?, 0, 0, ?, 0, 0, 0, 0, 0, NULL WHERE NOT EXISTS (SELECT 1 FROM stats WHERE user = ? COLLATE NOCASE)"
+)
+
+
 def check_user_exists(cursor, player: str, stats_conn: sqlite3.Connection) -> None:
     """
     Check if a player exists in stats table. Create entry if not (case-insensitive lookup).
+    Players already in the known player set are skipped without a query.
     
     Args:
         cursor: Database cursor
         player: Player name
         stats_conn: Database connection
     """
+    if is_known_player(player):
+        return
     try:
         cursor.execute("SELECT * FROM stats WHERE user = ? COLLATE NOCASE", (player,))
         result = cursor.fetchall()
@@ -275,7 +530,9 @@ def check_user_exists(cursor, player: str, stats_conn: sqlite3.Connection) -> No
                 (player, current_time)
             )
             stats_conn.commit()
+            update_ranks([], [(0, 0)])
             logger.debug(f"Initialized player: {player}")
+        known_players.add(player_key(player))
     except Exception as e:
         logger.error(f"Error checking user existence for {player}: {e}")
 
@@ -292,6 +549,7 @@ def update_kill_stats(cursor, killer: str, victim: str, stats_conn: sqlite3.Conn
         stats_conn: Database connection
     """
     try:
+        before = rank_snapshot(cursor, {player_key(killer): killer, player_key(victim): victim}.values())
         cursor.execute(
             "UPDATE stats SET kills = kills + 1, killstreak = killstreak + 1, deathstreak = 0 WHERE user = ? COLLATE NOCASE",
             (killer,)
@@ -300,8 +558,10 @@ def update_kill_stats(cursor, killer: str, victim: str, stats_conn: sqlite3.Conn
             "UPDATE stats SET deaths = deaths + 1, killstreak = 0, deathstreak = deathstreak + 1 WHERE user = ? COLLATE NOCASE",
             (victim,)
         )
+        after = rank_snapshot(cursor, {player_key(killer): killer, player_key(victim): victim}.values())
         
         stats_conn.commit()
+        update_ranks(before, after)
         logger.debug(f"Updated stats: {killer} killed {victim}")
     except Exception as e:
         logger.error(f"Error updating kill stats: {e}")
@@ -317,12 +577,15 @@ def update_death_stats(cursor, victim: str, stats_conn: sqlite3.Connection) -> N
         stats_conn: Database connection
     """
     try:
+        before = rank_snapshot(cursor, [victim])
         cursor.execute(
             "UPDATE stats SET deaths = deaths + 1, killstreak = 0, deathstreak = deathstreak + 1 WHERE user = ? COLLATE NOCASE",
             (victim,)
         )
+        after = rank_snapshot(cursor, [victim])
         
         stats_conn.commit()
+        update_ranks(before, after)
         logger.debug(f"Updated death stats: {victim}")
     except Exception as e:
         logger.error(f"Error updating death stats: {e}")
@@ -341,19 +604,21 @@ def get_player_stats(cursor, player: str) -> Dict[str, Any]:
     """
     try:
         result = cursor.execute(
-            "SELECT p1.*, (SELECT COUNT(*) FROM stats p2 WHERE p2.kills > p1.kills) as KillRank FROM stats p1 WHERE user = ? COLLATE NOCASE",
+            "SELECT user, kills, deaths, alivetime, deathstreak, killstreak FROM stats WHERE user = ? COLLATE NOCASE",
             (player,)
         ).fetchall()
         
         if result:
-            rank = result[0][11] if result[0][11] is not None and result[0][11] > 0 else 1
+            ensure_rank_index()
+            # Players with more kills; the top player and the runner-up both show as #1
+            rank = kill_ranks.count_above(result[0][1]) or 1
             return {
-                'user': result[0][1],  # Adjusted for new schema with id column
-                'kills': result[0][2] if result[0][2] is not None else 0,
-                'deaths': result[0][3] if result[0][3] is not None else 0,
-                'alivetime': result[0][4] if result[0][4] is not None else 0,
-                'killstreak': result[0][6] if result[0][6] is not None else 0,
-                'deathstreak': result[0][5] if result[0][5] is not None else 0,
+                'user': result[0][0],
+                'kills': result[0][1] if result[0][1] is not None else 0,
+                'deaths': result[0][2] if result[0][2] is not None else 0,
+                'alivetime': result[0][3] if result[0][3] is not None else 0,
+                'killstreak': result[0][5] if result[0][5] is not None else 0,
+                'deathstreak': result[0][4] if result[0][4] is not None else 0,
                 'rank': rank
             }
         return {}
@@ -362,33 +627,34 @@ def get_player_stats(cursor, player: str) -> Dict[str, Any]:
         return {}
 
 
-def update_series(table_name: str, value: int, db_path: str = KILLFEED_DB_PATH) -> None:
+# Activity series buckets: raw points, rolled up into coarser buckets once they age out
+SERIES_RAW_INTERVAL = getattr(Config, "SERIES_RAW_INTERVAL", 300)
+SERIES_RAW_RETENTION = getattr(Config, "SERIES_RAW_RETENTION_DAYS", 7) * 86400
+SERIES_ROLLUP_INTERVAL = getattr(Config, "SERIES_ROLLUP_INTERVAL", 3600)
+SERIES_ROLLUP_RETENTION = getattr(Config, "SERIES_ROLLUP_RETENTION_DAYS", 365) * 86400
+
+APPEND_SERIES_SQL = (
+    "INSERT INTO activity_series (series_name, server_id, resolution, bucket, total, samples, peak) "
+    "VALUES (?, ?, ?, ?, ?, 1, ?) "
+    "ON CONFLICT (series_name, server_id, resolution, bucket) DO UPDATE SET "
+    "total = total + excluded.total, samples = samples + 1, peak = MAX(peak, excluded.peak)"
+)
+
+
+def update_series(table_name: str, value: int, server_id: str = "", db_path: str = KILLFEED_DB_PATH) -> None:
     """
-    Update activity series data (rolling window of stats).
+    Record a value in an activity series.
     
     Args:
         table_name: Name of the series to update
-        value: Value to append to series
+        value: Value to record
+        server_id: Server the value belongs to ('' for bot-wide series)
         db_path: Path to database
     """
     try:
         conn = get_connection(db_path)
         cursor = conn.cursor()
-        
-        cursor.execute("SELECT activedata FROM activity_series_data WHERE series_name = ?", (table_name,))
-        result = cursor.fetchone()
-        
-        if result:
-            current = result[0]
-            history = current.split(';')[1:] if current else []
-            history.append(str(value))
-            result_str = ';'.join([''] + history)
-            
-            cursor.execute("UPDATE activity_series_data SET activedata = ?, updated_at = CURRENT_TIMESTAMP WHERE series_name = ?", (result_str, table_name))
-        else:
-            result_str = ';' + str(value)
-            cursor.execute("INSERT INTO activity_series_data (series_name, activedata) VALUES (?, ?)", (table_name, result_str))
-        
+        append_series_value(cursor, table_name, value, server_id)
         conn.commit()
         conn.close()
         logger.debug(f"Updated series {table_name} with value {value}")
@@ -396,30 +662,156 @@ def update_series(table_name: str, value: int, db_path: str = KILLFEED_DB_PATH)
         logger.error(f"Error updating series {table_name}: {e}")
 
 
-def increment_activity_counters(kills: int, deaths: int, db_path: str = KILLFEED_DB_PATH) -> None:
+def append_series_value(cursor, table_name: str, value: int, server_id: str = "", timestamp: Optional[float] = None) -> None:
+    """Add a value to the current raw bucket of a series using the caller's cursor (no commit)."""
+    timestamp = time.time() if timestamp is None else timestamp
+    bucket = int(timestamp) // SERIES_RAW_INTERVAL * SERIES_RAW_INTERVAL
+    cursor.execute(APPEND_SERIES_SQL, (table_name, server_id, SERIES_RAW_INTERVAL, bucket, value, value))
+
+
+def get_series(series_name: str, server_id: str = "", start: Optional[float] = None, end: Optional[float] = None,
+               db_path: str = KILLFEED_DB_PATH) -> list:
     """
-    Increment global kill and death counters.
+    Read a series over a time range, oldest first. Older parts come from rollups,
+    recent parts from raw buckets.
     
     Args:
-        kills: Number of kills to add
-        deaths: Number of deaths to add
+        series_name: Name of the series
+        server_id: Server the series belongs to ('' for bot-wide series)
+        start: Unix time the range starts at; buckets overlapping it are included (default: everything kept)
+        end: Unix time the range ends at (default: now)
         db_path: Path to database
+    
+    Returns:
+        list: (bucket_start, resolution, total, samples, peak, mean) tuples
     """
     try:
         conn = get_connection(db_path)
         cursor = conn.cursor()
-        
-        if kills > 0:
-            cursor.execute(
-                "UPDATE activity_counters SET activedata = activedata + ?, updated_at = CURRENT_TIMESTAMP WHERE counter_name = ?",
-                (kills, 'killcount')
-            )
-        if deaths > 0:
+        start = int(start) if start is not None else 0
+        end = int(end if end is not None else time.time())
+        # Each resolution is its own primary key range; include buckets that began before `start`
+        cursor.execute(
+            "SELECT bucket, resolution, total, samples, peak, CAST(total AS REAL) / samples FROM activity_series "
+            "WHERE series_name = ? AND server_id = ? AND resolution = ? AND bucket BETWEEN ? AND ? "
+            "UNION ALL "
+            "SELECT bucket, resolution, total, samples, peak, CAST(total AS REAL) / samples FROM activity_series "
+            "WHERE series_name = ? AND server_id = ? AND resolution = ? AND bucket BETWEEN ? AND ? "
+            "ORDER BY bucket",
+            (series_name, server_id, SERIES_ROLLUP_INTERVAL, start - SERIES_ROLLUP_INTERVAL + 1, end,
+             series_name, server_id, SERIES_RAW_INTERVAL, start - SERIES_RAW_INTERVAL + 1, end)
+        )
+        result = cursor.fetchall()
+        conn.close()
+        return result
+    except Exception as e:
+        logger.error(f"Error reading series {series_name}: {e}")
+        return []
+
+
+def get_series_totals(series_name: str, start: Optional[float] = None, end: Optional[float] = None,
+                      db_path: str = KILLFEED_DB_PATH) -> list:
+    """
+    Read a series summed over every server, in the format of get_series.
+    `mean` is the sum of each server's mean (e.g. players online across all servers)
+    and `peak` the sum of each server's peak.
+    
+    Args:
+        series_name: Name of the series
+        start: Unix time the range starts at; buckets overlapping it are included (default: everything kept)
+        end: Unix time the range ends at (default: now)
+        db_path: Path to database
+    
+    Returns:
+        list: (bucket_start, resolution, total, samples, peak, mean) tuples
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        start = int(start) if start is not None else 0
+        end = int(end if end is not None else time.time())
+        totals = (
+            "SELECT bucket, resolution, SUM(total), SUM(samples), SUM(peak), SUM(CAST(total AS REAL) / samples) "
+            "FROM activity_series WHERE series_name = ? AND resolution = ? AND bucket BETWEEN ? AND ? GROUP BY bucket"
+        )
+        cursor.execute(
+            f"{totals} UNION ALL {totals} ORDER BY bucket",
+            (series_name, SERIES_ROLLUP_INTERVAL, start - SERIES_ROLLUP_INTERVAL + 1, end,
+             series_name, SERIES_RAW_INTERVAL, start - SERIES_RAW_INTERVAL + 1, end)
+        )
+        result = cursor.fetchall()
+        conn.close()
+        return result
+    except Exception as e:
+        logger.error(f"Error reading series totals {series_name}: {e}")
+        return []
+
+
+def compact_activity_series(now: Optional[float] = None, db_path: str = KILLFEED_DB_PATH) -> int:
+    """
+    Roll raw series buckets past their retention up into hourly (SERIES_ROLLUP_INTERVAL)
+    buckets and drop rollups past theirs. Only whole rollup buckets are rolled, so
+    running this again never counts a raw point twice.
+    
+    Args:
+        now: Current unix time
+        db_path: Path to database
+    
+    Returns:
+        int: Number of raw buckets rolled up
+    """
+    now = time.time() if now is None else now
+    cutoff = int(now - SERIES_RAW_RETENTION) // SERIES_ROLLUP_INTERVAL * SERIES_ROLLUP_INTERVAL
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "UPDATE activity_counters SET activedata = activedata + ?, updated_at = CURRENT_TIMESTAMP WHERE counter_name = ?",
-                (deaths, 'deathcount')
+                "INSERT INTO activity_series (series_name, server_id, resolution, bucket, total, samples, peak) "
+                "SELECT series_name, server_id, ?, bucket / ? * ?, SUM(total), SUM(samples), MAX(peak) FROM activity_series "
+                "WHERE resolution = ? AND bucket < ? GROUP BY series_name, server_id, bucket / ? "
+                "ON CONFLICT (series_name, server_id, resolution, bucket) DO UPDATE SET "
+                "total = total + excluded.total, samples = samples + excluded.samples, peak = MAX(peak, excluded.peak)",
+                (SERIES_ROLLUP_INTERVAL, SERIES_ROLLUP_INTERVAL, SERIES_ROLLUP_INTERVAL,
+                 SERIES_RAW_INTERVAL, cutoff, SERIES_ROLLUP_INTERVAL)
             )
-        
+            rolled = cursor.execute(
+                "DELETE FROM activity_series WHERE resolution = ? AND bucket < ?", (SERIES_RAW_INTERVAL, cutoff)
+            ).rowcount
+            if SERIES_ROLLUP_RETENTION > 0:
+                cursor.execute(
+                    "DELETE FROM activity_series WHERE resolution = ? AND bucket < ?",
+                    (SERIES_ROLLUP_INTERVAL, int(now - SERIES_ROLLUP_RETENTION))
+                )
+        conn.close()
+        if rolled:
+            logger.info(f"Rolled up {rolled} activity series buckets")
+        return rolled
+    except Exception as e:
+        logger.error(f"Error compacting activity series: {e}")
+        return 0
+
+
+UPSERT_COUNTER_SQL = (
+    "INSERT INTO server_counters (server_id, counter_name, value) VALUES (?, ?, ?) "
+    "ON CONFLICT (server_id, counter_name) DO UPDATE SET value = value + excluded.value, updated_at = CURRENT_TIMESTAMP"
+)
+
+
+def increment_activity_counters(kills: int, deaths: int, server_id: str = "", db_path: str = KILLFEED_DB_PATH) -> None:
+    """
+    Increment a server's kill and death counters.
+    
+    Args:
+        kills: Number of kills to add
+        deaths: Number of deaths to add
+        server_id: Server the activity happened on ('' for unattributed totals)
+        db_path: Path to database
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        add_activity_counters(cursor, {(server_id, 'killcount'): kills, (server_id, 'deathcount'): deaths})
         conn.commit()
         conn.close()
         logger.debug(f"Incremented counters: {kills} kills, {deaths} deaths")
@@ -427,30 +819,283 @@ def increment_activity_counters(kills: int, deaths: int, db_path: str = KILLFEED
         logger.error(f"Error incrementing activity counters: {e}")
 
 
-def get_total_kills(db_path: str = KILLFEED_DB_PATH) -> int:
-    """Get total kills from database."""
+def add_activity_counters(cursor, counters: Dict[Tuple[str, str], int]) -> None:
+    """Add {(server_id, counter_name): amount} to the counters in one upsert, using the caller's cursor (no commit)."""
+    cursor.executemany(
+        UPSERT_COUNTER_SQL,
+        [(server_id, counter_name, amount) for (server_id, counter_name), amount in counters.items() if amount]
+    )
+
+
+def get_counter(counter_name: str, server_id: Optional[str] = None, db_path: str = KILLFEED_DB_PATH) -> int:
+    """
+    Get an activity counter.
+    
+    Args:
+        counter_name: Name of the counter ('killcount', 'deathcount')
+        server_id: Server to read, or None for the total over all servers
+        db_path: Path to database
+    
+    Returns:
+        int: Counter value
+    """
     try:
         conn = get_connection(db_path)
         cursor = conn.cursor()
-        result = cursor.execute("SELECT activedata FROM activity_counters WHERE counter_name = ?", ('killcount',)).fetchone()
+        if server_id is None:
+            result = cursor.execute(
+                "SELECT SUM(value) FROM server_counters WHERE counter_name = ?", (counter_name,)
+            ).fetchone()
+        else:
+            result = cursor.execute(
+                "SELECT value FROM server_counters WHERE server_id = ? AND counter_name = ?", (server_id, counter_name)
+            ).fetchone()
         conn.close()
-        return result[0] if result else 0
+        return (result[0] or 0) if result else 0
     except Exception as e:
-        logger.error(f"Error getting total kills: {e}")
+        logger.error(f"Error getting counter {counter_name}: {e}")
         return 0
 
 
-def get_total_deaths(db_path: str = KILLFEED_DB_PATH) -> int:
-    """Get total deaths from database."""
+def get_counters_by_server(counter_name: str, db_path: str = KILLFEED_DB_PATH) -> Dict[str, int]:
+    """Get an activity counter broken down by server ('' holds totals from before the split)."""
     try:
         conn = get_connection(db_path)
         cursor = conn.cursor()
-        result = cursor.execute("SELECT activedata FROM activity_counters WHERE counter_name = ?", ('deathcount',)).fetchone()
+        rows = cursor.execute(
+            "SELECT server_id, value FROM server_counters WHERE counter_name = ?", (counter_name,)
+        ).fetchall()
         conn.close()
-        return result[0] if result else 0
+        return dict(rows)
     except Exception as e:
-        logger.error(f"Error getting total deaths: {e}")
-        return 0
+        logger.error(f"Error getting counter {counter_name} by server: {e}")
+        return {}
+
+
+def get_total_kills(server_id: Optional[str] = None, db_path: str = KILLFEED_DB_PATH) -> int:
+    """Get total kills of a server, or of all servers."""
+    return get_counter('killcount', server_id, db_path)
+
+
+def get_total_deaths(server_id: Optional[str] = None, db_path: str = KILLFEED_DB_PATH) -> int:
+    """Get total deaths of a server, or of all servers."""
+    return get_counter('deathcount', server_id, db_path)
+
+
+# Unit of work
+class StatsBatch:
+    """
+    Buffers every stat mutation of one server cycle and writes them in a single
+    transaction on commit(): new players, kill/death deltas, streaks, device/UID
+    updates, activity counters, series points and log cursors.
+    Reads made while the batch is open (get_player_stats) include its pending changes.
+    Buffering never touches the database; only the read methods (get_player_stats,
+    get_users_by_device_id) and commit do, so an async caller can run just those
+    on the database executor.
+    """
+
+    def __init__(self, db_path: str = KILLFEED_DB_PATH):
+        self.db_path = db_path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all buffered changes."""
+        self.new_players = {}     # folded name -> name
+        self.deltas = {}          # folded name -> pending stat delta
+        self.bases = {}           # folded name -> committed stats row when first read
+        self.device_updates = {}  # name -> (device_id, uid)
+        self.counters = {}        # (server_id, counter_name) -> amount
+        self.series = []          # (series_name, value, server_id, timestamp)
+        self.log_cursors = {}     # (server_id, log_type) -> (byte_offset, fingerprint)
+
+    def discard_log_changes(self) -> None:
+        """
+        Drop the stat, counter, series and cursor changes of a log pass that failed,
+        keeping new players and device links. Without its cursor the same lines are
+        read again next cycle, so committing their stats would count them twice.
+        """
+        self.deltas = {}
+        self.bases = {}
+        self.counters = {}
+        self.series = []
+        self.log_cursors = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection used for the batch's reads and its final commit."""
+        if self.conn is None:
+            self.conn = get_connection(self.db_path)
+        return self.conn
+
+    def add_player(self, player: str) -> None:
+        """Create a stats entry for the player on commit if it does not exist."""
+        key = player_key(player)
+        if key not in known_players and key not in self.new_players:
+            self.new_players[key] = player
+
+    def base_stats(self, player: str) -> Dict[str, Any]:
+        """Committed stats of a player, fetched once per batch."""
+        key = player_key(player)
+        base = self.bases.get(key)
+        if base is None:
+            row = self.connection.execute(
+                "SELECT user, kills, deaths, alivetime, deathstreak, killstreak FROM stats WHERE user = ? COLLATE NOCASE",
+                (player,)
+            ).fetchone()
+            if row:
+                base = {'exists': True, 'user': row[0], 'kills': row[1] or 0, 'deaths': row[2] or 0,
+                        'alivetime': row[3] or 0, 'deathstreak': row[4] or 0, 'killstreak': row[5] or 0}
+            else:
+                base = {'exists': False, 'user': player, 'kills': 0, 'deaths': 0,
+                        'alivetime': int(time.mktime(datetime.now().timetuple())), 'deathstreak': 0, 'killstreak': 0}
+            self.bases[key] = base
+        return base
+
+    def delta(self, player: str) -> Dict[str, Any]:
+        """Pending changes of a player; a streak is kept (x1) or reset (x0) before adding to it."""
+        key = player_key(player)
+        if key not in self.deltas:
+            self.add_player(player)
+            self.deltas[key] = {'user': player, 'kills': 0, 'deaths': 0,
+                                'killstreak_keep': 1, 'killstreak_add': 0,
+                                'deathstreak_keep': 1, 'deathstreak_add': 0}
+        return self.deltas[key]
+
+    def record_kill(self, killer: str, victim: str) -> None:
+        """Buffer a PvP kill (same effect as update_kill_stats)."""
+        pending = self.delta(killer)
+        pending['kills'] += 1
+        pending['killstreak_add'] += 1
+        pending['deathstreak_keep'], pending['deathstreak_add'] = 0, 0
+        self.record_death(victim)
+
+    def record_death(self, victim: str) -> None:
+        """Buffer a death (same effect as update_death_stats)."""
+        pending = self.delta(victim)
+        pending['deaths'] += 1
+        pending['killstreak_keep'], pending['killstreak_add'] = 0, 0
+        pending['deathstreak_add'] += 1
+
+    def current_kills(self, key: str) -> int:
+        """Kill count of a touched player including pending kills."""
+        return self.base_stats(self.deltas[key]['user'])['kills'] + self.deltas[key]['kills']
+
+    def get_player_stats(self, player: str) -> Dict[str, Any]:
+        """
+        Stats of a player as they will be after commit, in the format of get_player_stats.
+        The kill rank counts committed players with more kills, corrected for pending kills.
+        """
+        try:
+            key = player_key(player)
+            base = self.base_stats(player)
+            pending = self.deltas.get(key)
+            stats = dict(base)
+            if pending:
+                stats['kills'] += pending['kills']
+                stats['deaths'] += pending['deaths']
+                stats['killstreak'] = stats['killstreak'] * pending['killstreak_keep'] + pending['killstreak_add']
+                stats['deathstreak'] = stats['deathstreak'] * pending['deathstreak_keep'] + pending['deathstreak_add']
+            
+            kills = stats['kills']
+            ensure_rank_index(self.db_path)
+            ahead = kill_ranks.count_above(kills)
+            for other, other_pending in self.deltas.items():
+                if other == key or not other_pending['kills']:
+                    continue
+                other_base = self.base_stats(other_pending['user'])
+                was_ahead = other_base['exists'] and other_base['kills'] > kills
+                ahead += (self.current_kills(other) > kills) - was_ahead
+            stats['rank'] = ahead if ahead > 0 else 1
+            del stats['exists']
+            return stats
+        except Exception as e:
+            logger.error(f"Error retrieving batched stats for {player}: {e}")
+            return {}
+
+    def set_device(self, player: str, device_id: str, uid: str) -> None:
+        """Buffer a device ID / UID assignment for a player."""
+        self.add_player(player)
+        self.device_updates[player] = (device_id, uid)
+
+    def get_users_by_device_id(self, device_id: str) -> list:
+        """Users on a device, including pending device assignments."""
+        users = [
+            user for user in get_all_users_by_device_id(device_id, self.db_path)
+            if user not in self.device_updates or self.device_updates[user][0] == device_id
+        ]
+        users += [user for user, (pending_device, _) in self.device_updates.items() if pending_device == device_id and user not in users]
+        return users
+
+    def add_counters(self, kills: int, deaths: int, server_id: str = "") -> None:
+        """Buffer additions to a server's kill and death counters."""
+        for counter_name, amount in (('killcount', kills), ('deathcount', deaths)):
+            key = (server_id, counter_name)
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_series_value(self, series_name: str, value: int, server_id: str = "") -> None:
+        """Buffer a point for an activity series."""
+        self.series.append((series_name, value, server_id, time.time()))
+
+    def set_log_cursor(self, server_id: str, log_type: str, byte_offset: int, fingerprint: str) -> None:
+        """Buffer the read position reached for a server's log."""
+        self.log_cursors[(server_id, log_type)] = (byte_offset, fingerprint)
+
+    def commit(self) -> bool:
+        """
+        Apply all buffered changes in one transaction and reset the batch.
+        
+        Returns:
+            bool: True if the changes were written (or there were none)
+        """
+        if not (self.new_players or self.deltas or self.device_updates or any(self.counters.values())
+                or self.series or self.log_cursors):
+            self.close()
+            self.clear()
+            return True
+        try:
+            conn = self.connection
+            current_time = int(time.mktime(datetime.now().timetuple()))
+            touched = {**self.new_players, **{key: pending['user'] for key, pending in self.deltas.items()}}
+            with conn:
+                cursor = conn.cursor()
+                before = rank_snapshot(cursor, touched.values())
+                cursor.executemany(INSERT_NEW_PLAYER_SQL, [(player, current_time, player) for player in self.new_players.values()])
+                cursor.executemany(
+                    "UPDATE stats SET kills = kills + ?, deaths = deaths + ?, "
+                    "killstreak = killstreak * ? + ?, deathstreak = deathstreak * ? + ? WHERE user = ? COLLATE NOCASE",
+                    [(d['kills'], d['deaths'], d['killstreak_keep'], d['killstreak_add'],
+                      d['deathstreak_keep'], d['deathstreak_add'], d['user']) for d in self.deltas.values()]
+                )
+                cursor.executemany(
+                    "UPDATE stats SET device_id = ?, uid = ? WHERE user = ?",
+                    [(device_id, uid, user) for user, (device_id, uid) in self.device_updates.items()]
+                )
+                add_activity_counters(cursor, self.counters)
+                for series_name, value, server_id, timestamp in self.series:
+                    append_series_value(cursor, series_name, value, server_id, timestamp)
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO log_cursors (server_id, log_type, byte_offset, fingerprint, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                    [(server_id, log_type, offset, fingerprint) for (server_id, log_type), (offset, fingerprint) in self.log_cursors.items()]
+                )
+                after = rank_snapshot(cursor, touched.values())
+            known_players.update(self.new_players)
+            update_ranks(before, after)
+            logger.debug(f"Committed batch: {len(self.new_players)} new players, {len(self.deltas)} stat updates, "
+                         f"{len(self.device_updates)} device updates, {len(self.series)} series points")
+            return True
+        except Exception as e:
+            logger.error(f"Error committing stats batch: {e}", exc_info=True)
+            return False
+        finally:
+            self.close()
+            self.clear()
+
+    def close(self) -> None:
+        """Close the batch connection."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
 
 
 # Region functions
@@ -484,14 +1129,29 @@ def get_regions(db_path: str = KILLFEED_DB_PATH):
         return []
 
 
+def delete_region(name: str, db_path: str = KILLFEED_DB_PATH) -> None:
+    """Delete a region by name."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM region WHERE name = ?", (name,))
+        conn.commit()
+        conn.close()
+        logger.debug(f"Deleted region: {name}")
+    except Exception as e:
+        logger.error(f"Error deleting region: {e}")
+
+
 # Code/Batch functions
+# codes.redeemed is 1 while a code can still be redeemed and 0 once it has been used,
+# the convention /generatekeys and /redeem have always relied on
 def insert_code(code: str, data: str, batchid: str, db_path: str = KILLFEED_DB_PATH) -> None:
     """Insert a code into the database."""
     try:
         conn = get_connection(db_path)
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO codes (code, data, redeemed, batchid) VALUES (?, ?, 0, ?)",
+            "INSERT INTO codes (code, data, redeemed, batchid) VALUES (?, ?, 1, ?)",
             (code, data, batchid)
         )
         conn.commit()
@@ -501,6 +1161,61 @@ def insert_code(code: str, data: str, batchid: str, db_path: str = KILLFEED_DB_P
         logger.error(f"Error inserting code: {e}")
 
 
+def insert_codes(codes: list, data: str, batchid: int, db_path: str = KILLFEED_DB_PATH) -> None:
+    """Insert a batch of generated codes in one transaction."""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            conn.executemany(
+                "INSERT INTO codes (code, data, redeemed, batchid) VALUES (?, ?, 1, ?)",
+                [(code, data, batchid) for code in codes]
+            )
+        conn.close()
+        logger.debug(f"Inserted {len(codes)} codes for batch {batchid}")
+    except Exception as e:
+        logger.error(f"Error inserting codes: {e}")
+
+
+def get_all_codes(db_path: str = KILLFEED_DB_PATH) -> list:
+    """Get every code string in the database."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT code FROM codes")
+        result = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return result
+    except Exception as e:
+        logger.error(f"Error getting codes: {e}")
+        return []
+
+
+def delete_codes(codes: list, db_path: str = KILLFEED_DB_PATH) -> int:
+    """Delete the given codes, returning how many were removed."""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.executemany("DELETE FROM codes WHERE code = ?", [(code,) for code in codes])
+        conn.close()
+        return cursor.rowcount
+    except Exception as e:
+        logger.error(f"Error deleting codes: {e}")
+        return 0
+
+
+def delete_code_batch(batchid: int, db_path: str = KILLFEED_DB_PATH) -> int:
+    """Delete every code of a batch, returning how many were removed."""
+    try:
+        conn = get_connection(db_path)
+        with conn:
+            cursor = conn.execute("DELETE FROM codes WHERE batchid = ?", (batchid,))
+        conn.close()
+        return cursor.rowcount
+    except Exception as e:
+        logger.error(f"Error deleting code batch: {e}")
+        return 0
+
+
 def get_code(code: str, db_path: str = KILLFEED_DB_PATH):
     """Get a specific code."""
     try:
@@ -521,7 +1236,7 @@ def redeem_code(code: str, user: str, db_path: str = KILLFEED_DB_PATH) -> None:
         conn = get_connection(db_path)
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE codes SET redeemed = 1, user = ? WHERE code = ?",
+            "UPDATE codes SET redeemed = 0, user = ? WHERE code = ?",
             (user, code)
         )
         conn.commit()
@@ -559,6 +1274,19 @@ def get_servers(db_path: str = KILLFEED_DB_PATH):
         return []
 
 
+def delete_server(serverid: str, db_path: str = KILLFEED_DB_PATH) -> None:
+    """Remove a server from the database."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM servers WHERE serverid = ?", (serverid,))
+        conn.commit()
+        conn.close()
+        logger.debug(f"Deleted server: {serverid}")
+    except Exception as e:
+        logger.error(f"Error deleting server: {e}")
+
+
 # Device ban functions
 def insert_device_ban(username: str, device_id: str, db_path: str = KILLFEED_DB_PATH) -> None:
     """Insert a device ban into the database."""
@@ -744,6 +1472,108 @@ def get_all_users_by_device_id(device_id: str, db_path: str = KILLFEED_DB_PATH):
         return []
 
 
+# Stats profile / account link functions
+STATS_PROFILE_SQL = (
+    "SELECT id, user, kills, deaths, alivetime, deathstreak, killstreak, dcid, money, bounty, created_at FROM stats "
+)
+
+
+def with_ranks(row: Optional[tuple]) -> Optional[tuple]:
+    """Append KillRank and DeathRank (players ahead + 1) to a STATS_PROFILE_SQL row."""
+    if row is None:
+        return None
+    ensure_rank_index()
+    return row + (kill_ranks.count_above(row[2]) + 1, death_ranks.count_above(row[3]) + 1)
+
+
+def get_stats_profile(username: str, db_path: str = KILLFEED_DB_PATH) -> Optional[tuple]:
+    """
+    Get the /stats row of a player (case-insensitive).
+
+    Returns:
+        Optional[tuple]: (id, user, kills, deaths, alivetime, deathstreak, killstreak, dcid,
+        money, bounty, created_at, KillRank, DeathRank) or None if the player is unknown
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(STATS_PROFILE_SQL + "WHERE user = ? COLLATE NOCASE", (username,))
+        result = cursor.fetchone()
+        conn.close()
+        return with_ranks(result)
+    except Exception as e:
+        logger.error(f"Error getting stats profile: {e}")
+        return None
+
+
+def get_linked_stats_profile(dcid: int, db_path: str = KILLFEED_DB_PATH) -> Optional[tuple]:
+    """Get the /stats row of the player linked to a Discord user, in the format of get_stats_profile."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(STATS_PROFILE_SQL + "WHERE dcid = ?", (dcid,))
+        result = cursor.fetchone()
+        conn.close()
+        return with_ranks(result)
+    except Exception as e:
+        logger.error(f"Error getting linked stats profile: {e}")
+        return None
+
+
+def get_linked_user(dcid: int, db_path: str = KILLFEED_DB_PATH) -> Optional[str]:
+    """Get the username linked to a Discord user."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT user FROM stats WHERE dcid = ?", (dcid,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+    except Exception as e:
+        logger.error(f"Error getting linked user: {e}")
+        return None
+
+
+def get_stats_username(username: str, db_path: str = KILLFEED_DB_PATH) -> Optional[str]:
+    """Get a player's username as stored in the stats table (case-insensitive lookup)."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT user FROM stats WHERE user = ? COLLATE NOCASE", (username,))
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+    except Exception as e:
+        logger.error(f"Error getting username: {e}")
+        return None
+
+
+def set_discord_link(username: str, dcid: Optional[int], db_path: str = KILLFEED_DB_PATH) -> bool:
+    """Link a player to a Discord user (or unlink with dcid=None)."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE stats SET dcid = ? WHERE user = ?", (dcid, username))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        logger.error(f"Error setting Discord link: {e}")
+        return False
+
+
+def clear_discord_link(dcid: int, db_path: str = KILLFEED_DB_PATH) -> None:
+    """Unlink every player linked to a Discord user."""
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute("UPDATE stats SET dcid = NULL WHERE dcid = ?", (dcid,))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Error clearing Discord link: {e}")
+
+
 # Config/Template functions
 def insert_config(server_id: str, category: str, channelid: Optional[int] = None, db_path: str = KILLFEED_DB_PATH) -> None:
     """Insert a config entry for a specific server."""
@@ -854,6 +1684,113 @@ def get_server_logs(server_id: str, db_path: str = KILLFEED_DB_PATH):
         return []
 
 
+# Log cursor functions
+def get_log_cursor(server_id: str, log_type: str = "ADM", db_path: str = KILLFEED_DB_PATH) -> Optional[Tuple[int, str]]:
+    """
+    Get the stored read position for a server's log file.
+    
+    Args:
+        server_id: Nitrado server ID
+        log_type: Log file type (e.g. "ADM")
+    
+    Returns:
+        Tuple: (byte_offset, fingerprint) or None if the log has never been read
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT byte_offset, fingerprint FROM log_cursors WHERE server_id = ? AND log_type = ?",
+            (server_id, log_type)
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return (result[0], result[1] or "") if result else None
+    except Exception as e:
+        logger.error(f"Error getting log cursor for {server_id}: {e}")
+        return None
+
+
+def update_log_cursor(server_id: str, log_type: str, byte_offset: int, fingerprint: str, db_path: str = KILLFEED_DB_PATH) -> None:
+    """
+    Store the read position for a server's log file.
+    
+    Args:
+        server_id: Nitrado server ID
+        log_type: Log file type (e.g. "ADM")
+        byte_offset: Offset just past the last fully processed line
+        fingerprint: Fingerprint of the log file header the offset belongs to
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO log_cursors (server_id, log_type, byte_offset, fingerprint, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            (server_id, log_type, byte_offset, fingerprint)
+        )
+        conn.commit()
+        conn.close()
+        logger.debug(f"Updated {log_type} cursor for {server_id}: {byte_offset}")
+    except Exception as e:
+        logger.error(f"Error updating log cursor for {server_id}: {e}")
+
+
+# Remote log file functions
+def get_remote_log_file(server_id: str, log_type: str, db_path: str = KILLFEED_DB_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Get the directory-listing metadata of the last downloaded remote log file.
+    
+    Args:
+        server_id: Nitrado server ID
+        log_type: Log file type ("ADM" or "RPT")
+    
+    Returns:
+        Dict: path, listed_size, modified_at and local_size, or None if never downloaded
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT path, listed_size, modified_at, local_size FROM remote_log_files WHERE server_id = ? AND log_type = ?",
+            (server_id, log_type)
+        )
+        result = cursor.fetchone()
+        conn.close()
+        if result:
+            return {'path': result[0], 'listed_size': result[1], 'modified_at': result[2], 'local_size': result[3]}
+        return None
+    except Exception as e:
+        logger.error(f"Error getting remote log file for {server_id}: {e}")
+        return None
+
+
+def update_remote_log_file(server_id: str, log_type: str, path: str, listed_size: Optional[int], modified_at: Any, local_size: int, db_path: str = KILLFEED_DB_PATH) -> None:
+    """
+    Store the directory-listing metadata of a downloaded remote log file.
+    
+    Args:
+        server_id: Nitrado server ID
+        log_type: Log file type ("ADM" or "RPT")
+        path: Remote file path
+        listed_size: File size reported by the directory listing
+        modified_at: Modification time reported by the directory listing
+        local_size: Size of the local copy after the download
+    """
+    try:
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT OR REPLACE INTO remote_log_files (server_id, log_type, path, listed_size, modified_at, local_size, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            (server_id, log_type, path, listed_size, modified_at, local_size)
+        )
+        conn.commit()
+        conn.close()
+        logger.debug(f"Updated remote {log_type} file for {server_id}: {path} ({local_size} bytes)")
+    except Exception as e:
+        logger.error(f"Error updating remote log file for {server_id}: {e}")
+
+
 # Guild settings functions
 def get_guild_setting(guild_id: int, setting_key: str, default: any = None, db_path: str = KILLFEED_DB_PATH) -> any:
     """
@@ -0,0 +1,184 @@
+"""
+Async facade over killfeed_database.
+SQLite calls run on worker threads instead of the event loop: every write goes
+through a single writer thread (so writes never contend with each other) and
+reads are spread over a small reader pool. A bounded number of calls may be
+queued at once; further callers wait, which keeps a slow disk from piling up
+work. Queue depth and per-query latency are tracked and logged.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from config import Config
+from utils import killfeed_database
+
+logger = logging.getLogger(__name__)
+
+# killfeed_database functions with these prefixes only read and go to the reader pool
+READ_PREFIXES = ("get_", "is_")
+
+
+class QueryStats:
+    """Latency totals of one database function."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wait_total = 0.0  # Seconds spent queued before a thread picked the call up
+        self.run_total = 0.0   # Seconds spent executing
+        self.run_max = 0.0
+
+    def add(self, waited: float, elapsed: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.wait_total += waited
+        self.run_total += elapsed
+        self.run_max = max(self.run_max, elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        calls = max(self.calls, 1)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_wait_ms': round(self.wait_total / calls * 1000, 2),
+            'avg_ms': round(self.run_total / calls * 1000, 2),
+            'max_ms': round(self.run_max * 1000, 2),
+        }
+
+
+class DatabaseExecutor:
+    """
+    Runs killfeed_database calls on a writer thread and a reader pool.
+
+    Any killfeed_database function can be awaited through the executor by name,
+    e.g. `await database.get_servers()`; get_*/is_* functions run on the reader
+    pool and everything else on the writer. Arbitrary callables (such as
+    StatsBatch methods) go through read() or write().
+    """
+
+    def __init__(self):
+        self.reader_threads = max(1, getattr(Config, "DB_READER_THREADS", 4))
+        self.max_pending = max(1, getattr(Config, "DB_MAX_PENDING", 64))
+        self.slow_query = getattr(Config, "DB_SLOW_QUERY_MS", 250) / 1000
+        self.report_interval = getattr(Config, "DB_STATS_INTERVAL", 600)
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.lock = threading.Lock()
+        self.stats: Dict[str, QueryStats] = {}
+        self.depth = 0       # Calls submitted to a thread and not finished yet
+        self.max_depth = 0
+        self.waiting = 0     # Calls held back because max_pending was reached
+        self.reported_at = time.monotonic()
+
+    @property
+    def writer(self) -> ThreadPoolExecutor:
+        """Single thread that performs every write."""
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="killfeed-db-writer")
+        return self._writer
+
+    @property
+    def readers(self) -> ThreadPoolExecutor:
+        """Thread pool for read-only queries."""
+        if self._readers is None:
+            self._readers = ThreadPoolExecutor(max_workers=self.reader_threads, thread_name_prefix="killfeed-db-reader")
+        return self._readers
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Backpressure limit, created on first use inside the running loop."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    def _timed(self, name: str, queued: float, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run a call on a worker thread and record how long it waited and ran."""
+        started = time.perf_counter()
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stats.setdefault(name, QueryStats()).add(started - queued, elapsed, failed)
+            if elapsed >= self.slow_query:
+                logger.warning(f"Slow database call {name}: {elapsed * 1000:.0f}ms "
+                               f"(queued {(started - queued) * 1000:.0f}ms)")
+
+    async def _submit(self, pool: ThreadPoolExecutor, func: Callable, args: tuple, kwargs: dict) -> Any:
+        name = getattr(func, "__qualname__", repr(func))
+        queued = time.perf_counter()
+        self.waiting += 1
+        async with self.slots:
+            self.waiting -= 1
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(pool, self._timed, name, queued, func, args, kwargs)
+            finally:
+                self.depth -= 1
+                self._maybe_report()
+
+    async def read(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a read-only callable on the reader pool."""
+        return await self._submit(self.readers, func, args, kwargs)
+
+    async def write(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a callable on the writer thread, after every write submitted before it."""
+        return await self._submit(self.writer, func, args, kwargs)
+
+    def __getattr__(self, name: str) -> Callable:
+        func = getattr(killfeed_database, name, None)
+        if name.startswith("_") or not callable(func):
+            raise AttributeError(f"killfeed_database has no function {name!r}")
+        run = self.read if name.startswith(READ_PREFIXES) else self.write
+
+        async def call(*args, **kwargs):
+            return await run(func, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current queue state and latency per database function.
+
+        Returns:
+            Dict[str, Any]: depth, max_depth, waiting and a per-function summary
+        """
+        with self.lock:
+            queries = {name: stats.summary() for name, stats in self.stats.items()}
+        return {'depth': self.depth, 'max_depth': self.max_depth, 'waiting': self.waiting, 'queries': queries}
+
+    def _maybe_report(self) -> None:
+        now = time.monotonic()
+        if not self.report_interval or now - self.reported_at < self.report_interval:
+            return
+        self.reported_at = now
+        snapshot = self.snapshot()
+        busiest = sorted(snapshot['queries'].items(), key=lambda item: item[1]['calls'] * item[1]['avg_ms'], reverse=True)[:5]
+        logger.info(f"Database queue depth={snapshot['depth']} max={snapshot['max_depth']} waiting={snapshot['waiting']}; "
+                    + ", ".join(f"{name}: {s['calls']} calls avg {s['avg_ms']}ms max {s['max_ms']}ms" for name, s in busiest))
+
+    async def shutdown(self) -> None:
+        """Finish queued calls and stop the worker threads (they restart on next use)."""
+        if self._writer is not None:
+            # Closing the writer's connection checkpoints the WAL
+            await self.write(killfeed_database.close_connections)
+        for pool in (self._writer, self._readers):
+            if pool is not None:
+                await asyncio.to_thread(pool.shutdown, True)
+        self._writer = self._readers = None
+        logger.debug("Stopped database worker threads")
+
+
+# Shared instance used by the cogs
+database = DatabaseExecutor()
@@ -1,11 +1,11 @@
 """
 Event handling and Discord embed creation for killfeed.
 """
-import re
 import discord
 import logging
 from datetime import datetime, timedelta
 from config import Config
+from utils import killfeed_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -155,50 +155,14 @@ async def create_generic_death_embed(victim: str, timestamp: str) -> discord.Emb
     )
 
 
-def is_suicide_event(line: str) -> bool:
-    """Check if log line represents a suicide."""
-    return "committed suicide" in line
-
-
-def is_explosion_event(line: str) -> bool:
-    """Check if log line represents an explosion death."""
-    return "hit by explosion" in line
-
-
-def is_pvp_kill_event(line: str) -> bool:
-    """Check if log line represents a PvP kill."""
-    return "killed by Player" in line
-
-
-def is_bleed_out_event(line: str) -> bool:
-    """Check if log line represents bleeding out."""
-    return "bled out" in line
-
-
-def is_wolf_kill_event(line: str) -> bool:
-    """Check if log line represents a wolf kill."""
-    return any(wolf in line for wolf in ["Animal_CanisLupus_Grey", "Animal_CanisLupus_White"])
-
-
-def is_bear_kill_event(line: str) -> bool:
-    """Check if log line represents a bear kill."""
-    return any(bear in line for bear in ["Animal_UrsusArctos", "Brown Bear"])
-
-
-def is_fall_death_event(line: str) -> bool:
-    """Check if log line represents a fall death."""
-    return "hit by FallDamage" in line
-
-
-def is_death_event(line: str) -> bool:
-    """Check if log line represents a death (generic)."""
-    return "(DEAD)" in line or "died" in line
-
-
-def extract_explosion_type(line: str) -> str:
-    """Extract explosion type from log line."""
-    match = re.search(r"\[HP: 0\] hit by explosion \((.*)\)", line)
-    return match.group(1) if match else "Unknown"
+# Deaths without a killer, all reported the same way: tokenizer kind -> (embed factory, log label)
+SIMPLE_DEATHS = {
+    killfeed_tokenizer.SUICIDE: (create_suicide_embed, "Suicide"),
+    killfeed_tokenizer.BLEED_OUT: (create_bleed_out_embed, "Bleed out"),
+    killfeed_tokenizer.WOLF: (create_wolf_kill_embed, "Wolf kill"),
+    killfeed_tokenizer.BEAR: (create_bear_kill_embed, "Bear kill"),
+    killfeed_tokenizer.FALL: (create_fall_death_embed, "Fall"),
+}
 
 
 async def create_player_connected_embed(player: str, timestamp: str) -> discord.Embed:
@@ -217,14 +181,3 @@ async def create_player_disconnected_embed(player: str, timestamp: str) -> disco
         description=f"**{player}** disconnected from the server",
         color=0xFFFF00,
     )
-
-
-
-def is_player_connected_event(line: str) -> bool:
-    """Check if log line represents a player connection."""
-    return "is connected" in line and "(id=" in line and "has been disconnected" not in line
-
-
-def is_player_disconnected_event(line: str) -> bool:
-    """Check if log line represents a player disconnection."""
-    return "has been disconnected" in line
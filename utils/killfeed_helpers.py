@@ -1,13 +1,15 @@
 """
 Helper utilities for killfeed processing.
 """
+import hashlib
 import math
+import os
 import re
 import sqlite3
 import time
 import logging
 from datetime import datetime
-from typing import Tuple
+from typing import List, Tuple
 import pytz
 import aiofiles
 
@@ -94,107 +96,73 @@ def extract_coordinates(line: str) -> tuple:
     return None, None
 
 
-def extract_player_name(line: str) -> str:
-    """Extract player name from log line. Matches: Player "Name"(id=...) or Player "Name" (id=...)"""
-    match = re.search(r'Player\s+"([^"]+)"', line)
-    if match:
-        return str(match.group(1)).strip()
-    return ""
-
-
-def extract_killer_victim(line: str) -> tuple:
+def format_coordinates(coords_str: str) -> str:
     """
-    Extract both killer and victim names from a kill event line.
-    Format: Player "VictimName" (DEAD) (id=... pos=<...>) killed by Player "KillerName"
-    
-    Returns:
-        Tuple: (killer_name, victim_name)
+    Format coordinates for URL encoding.
+    Removes commas and decimal places.
     """
-    # Extract victim first (appears before "killed by", accounting for (DEAD) status and coordinates)
-    victim = re.search(r'Player\s+"([^"]+)"\s+(?:\(DEAD\))?\s*\(id=[^)]+\s+pos=<[^>]+>\)\s+killed by', line)
-    victim = victim.group(1) if victim else ""
-    
-    # Extract killer (after "killed by Player")
-    killer = re.search(r'killed by Player\s+"([^"]+)"', line)
-    killer = killer.group(1) if killer else ""
-    
-    return killer, victim
-
-
-def extract_timestamp(line: str) -> str:
-    """Extract HH:MM:SS timestamp from log line."""
-    match = re.search(r"(\d+:\d+:\d+)", line)
-    return match.group(1) if match else ""
+    formatted = re.sub(r',\s*', ';', coords_str)
+    formatted = re.sub(r'\.\d+', '', formatted)
+    return formatted
 
 
-def extract_distance(line: str) -> float:
-    """Extract distance in meters from log line."""
-    try:
-        match = re.search(r"from ([0-9.]+) meters", line)
-        return round(float(match.group(1)), 2) if match else 0.0
-    except (AttributeError, ValueError):
-        return 0.0
+LOG_HEADER_MARKER = b"AdminLog started on"
+LOG_HEADER_MAX_BYTES = 4096
 
 
-def extract_weapon(line: str, weapons_data: dict = None) -> str:
+def log_fingerprint(head: bytes) -> str:
     """
-    Extract weapon name from log line and map to friendly name if possible.
+    Fingerprint a log file by its header, up to and including the first
+    "AdminLog started on" line. A different fingerprint means a different file.
     
     Args:
-        line: Log line containing weapon info
-        weapons_data: Optional dict of weapon mappings
+        head: The first bytes of the log file
     
     Returns:
-        String: Weapon name
+        String: SHA1 hex digest of the header, or "" if the header is not complete yet
     """
-    weapon_match = re.search(r" with (.*) from", line) or re.search(r"with (.*)", line)
-    weapon = weapon_match.group(1) if weapon_match else "Unknown"
-    
-    if weapons_data and weapon in weapons_data.get('data', {}):
-        weapon = weapons_data['data'][weapon]
-    
-    return weapon
-
-
-def extract_bodypart(line: str) -> str:
-    """Extract body part hit from log line."""
-    match = re.search(r'into ([^(]+)', line)
-    return match.group(1) if match else ""
+    marker = head.find(LOG_HEADER_MARKER)
+    if marker == -1:
+        return ""
+    line_end = head.find(b"\n", marker)
+    if line_end == -1:
+        return ""
+    return hashlib.sha1(head[:line_end + 1]).hexdigest()
 
 
-def extract_coordinates_from_line(line: str) -> list:
-    """Extract all coordinate pairs from a log line."""
-    return re.findall(r'pos=<([^>]+)>', line)
-
-
-def format_coordinates(coords_str: str) -> str:
-    """
-    Format coordinates for URL encoding.
-    Removes commas and decimal places.
+async def read_log_increment(filepath: str, offset: int = 0, fingerprint: str = "") -> Tuple[List[str], int, str]:
     """
-    formatted = re.sub(r',\s*', ';', coords_str)
-    formatted = re.sub(r'\.\d+', '', formatted)
-    return formatted
-
-
-async def new_logfile(filepath: str) -> bool:
-    """
-    Check if the log file is newly created (contains only one AdminLog entry).
+    Read the complete lines appended to a log file since the given offset.
+    Restarts from the beginning if the file was rotated (header fingerprint changed)
+    or truncated (file is now shorter than the offset). A trailing partial line is
+    left for the next read.
     
     Args:
         filepath: Path to the log file
+        offset: Byte offset just past the last processed line
+        fingerprint: Fingerprint the offset was recorded against
     
     Returns:
-        Bool: True if new logfile, False otherwise
+        Tuple: (new_lines, new_offset, new_fingerprint)
     """
-    try:
-        async with aiofiles.open(filepath, "r") as f:
-            text = await f.read()
-            logs = len(re.findall("AdminLog", text))
-        return logs == 1
-    except Exception as e:
-        logger.error(f"Error checking logfile: {e}")
-        return False
+    async with aiofiles.open(filepath, "rb") as f:
+        current_fingerprint = log_fingerprint(await f.read(LOG_HEADER_MAX_BYTES))
+        size = await f.seek(0, os.SEEK_END)
+        
+        if current_fingerprint != fingerprint or size < offset:
+            if offset:
+                logger.info(f"Log file {filepath} rotated or truncated, reading from start")
+            offset = 0
+        
+        await f.seek(offset)
+        data = await f.read()
+    
+    line_end = data.rfind(b"\n")
+    if line_end == -1:
+        return [], offset, current_fingerprint
+    
+    complete = data[:line_end + 1]
+    return complete.decode("utf-8", errors="replace").splitlines(), offset + len(complete), current_fingerprint
 
 
 def is_mam_device_event(line: str) -> bool:
@@ -314,30 +282,6 @@ def extract_uid_from_connection_event(line: str) -> str:
     return ""
 
 
-def get_player_from_connection_event(line: str) -> Tuple[str, str]:
-    """
-    Extract both player name and UID from connection event.
-    Format: Player Tylerj85 (id=383C4A0D1E702B6598B37338975EA3DB61DBC6D2) has connected.
-    
-    Returns:
-        Tuple: (player_name, uid) or ("", "") if not found
-    """
-    try:
-        # Extract UID from (id=...)
-        uid_match = re.search(r'\(id=([A-F0-9]+)\)', line)
-        uid = uid_match.group(1).strip() if uid_match else ""
-        
-        # Extract player name - matches "Player PlayerName (id="
-        player_match = re.search(r'Player\s+([^\s(]+)\s*\(id=', line)
-        player = player_match.group(1).strip() if player_match else ""
-        
-        return player, uid
-    except Exception as e:
-        logger.error(f"Error extracting player and UID from connection event: {e}")
-    
-    return "", ""
-
-
 def extract_uid_from_state_machine_event(line: str) -> Tuple[str, str]:
     """
     Extract player name and UID from StateMachine log line.
@@ -1,18 +1,146 @@
 """
 Nitrado API utilities for fetching server logs.
 """
-import aiohttp
 import aiofiles
+import asyncio
 import logging
 import os
+import shutil
 from os import path
-from config import Config
 from utils.nitradoFuncs import NitradoFunctions
+from utils.killfeed_db_executor import database
+from utils.nitrado_client import client, NITRADO_API_URL, PRIORITY_KILLFEED
 
 Nitrado = NitradoFunctions()
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the network per write when downloading logs
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+def local_log_path(server_id: int, extension: str) -> str:
+    """Get the local path a server's downloaded log is stored at."""
+    return path.abspath(path.join(path.dirname(__file__), "..", "files", f"{server_id}.{extension}"))
+
+
+def parse_content_range_start(content_range: str) -> int:
+    """Get the first byte position from a Content-Range header ("bytes 100-199/200")."""
+    try:
+        return int(content_range.split()[1].split("-")[0])
+    except (AttributeError, IndexError, ValueError):
+        return -1
+
+
+async def download_log_file(server_id: int, remote_file: dict, extension: str) -> bool:
+    """
+    Download a remote log file to files/{server_id}.{extension}.
+    Nothing is requested when the directory listing (path, size, modified_at) matches
+    the last download and the local copy is intact. If the same remote file has only
+    grown, only the new tail is requested with a Range header and appended to the
+    local copy. Falls back to a full download when the file rotated, shrank, or the
+    server ignores Range.
+    
+    Args:
+        server_id: The Nitrado server ID
+        remote_file: file_server/list entry for the log file
+        extension: "ADM" or "RPT"
+    
+    Returns:
+        bool: True if the local copy is up to date, False otherwise
+    """
+    file_path = remote_file["path"]
+    remote_size = remote_file.get("size")
+    local_fp = local_log_path(server_id, extension)
+    os.makedirs(os.path.dirname(local_fp), exist_ok=True)
+    
+    local_size = os.path.getsize(local_fp) if os.path.exists(local_fp) else 0
+    previous = await database.get_remote_log_file(str(server_id), extension)
+    same_file = previous is not None and previous["path"] == file_path and local_size == previous["local_size"]
+    
+    if (same_file and local_size > 0 and remote_size is not None
+            and previous["listed_size"] == remote_size and previous["modified_at"] == remote_file.get("modified_at")):
+        logger.info(f"[{server_id}] {extension} log unchanged since last download, skipping")
+        return True
+    
+    resume_from = 0
+    if same_file and remote_size is not None and remote_size >= local_size > 0:
+        resume_from = local_size
+    
+    # Get download token
+    download_endpoint = f"{NITRADO_API_URL}/services/{server_id}/gameservers/file_server/download?file={file_path}"
+    async with client.get(download_endpoint, priority=PRIORITY_KILLFEED) as token_response:
+        if token_response.status != 200:
+            logger.error(f"[{server_id}] Failed to retrieve {extension} download token ({token_response.status})")
+            return False
+        token_data = await token_response.json()
+    download_url = token_data["data"]["token"]["url"]
+    
+    mode = "wb"
+    file_response = None
+    if resume_from:
+        file_response = await client.get(download_url, priority=PRIORITY_KILLFEED, headers={"Range": f"bytes={resume_from}-"})
+        if file_response.status == 416:
+            file_response.release()
+            logger.info(f"[{server_id}] {extension} log unchanged ({local_size} bytes)")
+            await database.update_remote_log_file(str(server_id), extension, file_path, remote_size, remote_file.get("modified_at"), local_size)
+            return True
+        if file_response.status == 206 and parse_content_range_start(file_response.headers.get("Content-Range")) == resume_from:
+            mode = "ab"
+        elif file_response.status != 200:
+            logger.info(f"[{server_id}] {extension} range request not honoured ({file_response.status}), downloading full file")
+            file_response.release()
+            file_response = None
+    
+    # Download the actual file
+    if file_response is None:
+        file_response = await client.get(download_url, priority=PRIORITY_KILLFEED)
+    
+    # Build the new copy next to the old one and swap it in atomically, so readers
+    # only ever see the previous or the complete new file
+    temp_fp = f"{local_fp}.part"
+    try:
+        if file_response.status != 200 and mode == "wb":
+            logger.error(f"[{server_id}] {extension} file download failed ({file_response.status})")
+            return False
+        if mode == "ab":
+            await asyncio.to_thread(shutil.copyfile, local_fp, temp_fp)
+        received = await stream_to_file(file_response, temp_fp, mode)
+        os.replace(temp_fp, local_fp)
+    except Exception:
+        if os.path.exists(temp_fp):
+            os.remove(temp_fp)
+        raise
+    finally:
+        # Hands the connection back to the pool whether or not the body was read
+        file_response.release()
+    
+    new_size = local_size + received if mode == "ab" else received
+    await database.update_remote_log_file(str(server_id), extension, file_path, remote_size, remote_file.get("modified_at"), new_size)
+    logger.info(f"[{server_id}] {extension} log download complete ({'appended' if mode == 'ab' else 'full'}, {received} bytes)")
+    return True
+
+
+async def stream_to_file(response, file_path: str, mode: str = "wb") -> int:
+    """
+    Stream a response body to disk in chunks and fsync it.
+    
+    Args:
+        response: aiohttp response to read from
+        file_path: Destination file
+        mode: "wb" to overwrite, "ab" to append
+    
+    Returns:
+        int: Number of body bytes written
+    """
+    received = 0
+    async with aiofiles.open(file_path, mode=mode) as f:
+        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            await f.write(chunk)
+            received += len(chunk)
+        await f.flush()
+        await asyncio.to_thread(os.fsync, f.fileno())
+    return received
+
 
 
 async def fetch_server_log(server_id: int, server_maps: dict = None) -> bool:
@@ -31,92 +159,58 @@ async def fetch_server_log(server_id: int, server_maps: dict = None) -> bool:
     
     logger.info(f"[{server_id}] Initiating log download")
     
-    headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Fetch server info
-            server_info = await session.get(
-                f"https://api.nitrado.net/services/{server_id}/gameservers",
-                headers=headers
-            )
-            if server_info.status != 200:
-                logger.warning(f"[{server_id}] Failed to fetch server info ({server_info.status})")
-                return False
-            
-            details = await server_info.json()
-            username = details["data"]["gameserver"]["username"]
-            game_type = details["data"]["gameserver"]["game"].lower()
-            
-            # Determine map from server name
-            current_map = await Nitrado.getMapFromSettings(server_id)
-            
-            if server_maps is not None:
-                server_maps[server_id] = current_map
-            logger.info(f"[{server_id}] Detected map: {current_map}")
-            
-            # Determine game type and config path
-            if game_type == "dayzps":
-                relative_path = "dayzps/config/DayZServer_PS4_x64.ADM"
-            elif game_type == "dayzxb":
-                relative_path = "dayzxb/config/DayZServer_X1_x64.ADM"
-            else:
-                logger.error(f"[{server_id}] Unsupported game type: {game_type}")
-                return False
-            
-            # List directory to find most recent .ADM file
-            config_dir = f"/games/{username}/noftp/{'/'.join(relative_path.split('/')[:-1])}"
-            list_endpoint = f"https://api.nitrado.net/services/{server_id}/gameservers/file_server/list?dir={config_dir}"
-            list_response = await session.get(list_endpoint, headers=headers)
-            
-            if list_response.status != 200:
-                logger.error(f"[{server_id}] Failed to list directory ({list_response.status})")
-                return False
-            
-            list_data = await list_response.json()
-            adm_files = [entry for entry in list_data["data"]["entries"] 
-                        if entry["type"] == "file" and entry["name"].endswith(".ADM")]
-            
-            if not adm_files:
-                logger.error(f"[{server_id}] No .ADM files found in {config_dir}")
-                return False
-            
-            most_recent_file = max(adm_files, key=lambda x: x["modified_at"])
-            file_path = most_recent_file["path"]
-            
-            # Get download token
-            download_endpoint = f"https://api.nitrado.net/services/{server_id}/gameservers/file_server/download?file={file_path}"
-            token_response = await session.get(download_endpoint, headers=headers)
-            
-            if token_response.status != 200:
-                logger.error(f"[{server_id}] Failed to retrieve download token ({token_response.status})")
-                return False
-            
-            token_data = await token_response.json()
-            download_url = token_data["data"]["token"]["url"]
-            
-            # Download the actual file
-            file_response = await session.get(download_url, headers=headers)
-            if file_response.status != 200:
-                logger.error(f"[{server_id}] Log file download failed ({file_response.status})")
-                return False
-            
-            # Save to local file
-            local_fp = path.abspath(path.join(path.dirname(__file__), "..", "files", f"{server_id}.ADM"))
-            os.makedirs(os.path.dirname(local_fp), exist_ok=True)
-            
-            async with aiofiles.open(local_fp, mode="wb+") as f:
-                await f.write(await file_response.read())
-            
-            logger.info(f"[{server_id}] Log download complete")
-            return True
+    try:
+        # Server info (cached, shared with the map lookup)
+        details = await Nitrado.getServerDetails(server_id)
+        if not details:
+            logger.warning(f"[{server_id}] Failed to fetch server info")
+            return False
+        
+        username = details["username"]
+        game_type = details["game"]
+        
+        current_map = details["map"]
+        
+        if server_maps is not None:
+            server_maps[server_id] = current_map
+        logger.info(f"[{server_id}] Detected map: {current_map}")
         
-        except Exception as e:
-            logger.exception(f"[{server_id}] Exception during log fetch: {e}")
-            # Set default map on error
-            if server_maps is not None and server_id not in server_maps:
-                server_maps[server_id] = "chernarus"
+        # Determine game type and config path
+        if game_type == "dayzps":
+            relative_path = "dayzps/config/DayZServer_PS4_x64.ADM"
+        elif game_type == "dayzxb":
+            relative_path = "dayzxb/config/DayZServer_X1_x64.ADM"
+        else:
+            logger.error(f"[{server_id}] Unsupported game type: {game_type}")
             return False
+        
+        # List directory to find most recent .ADM file
+        config_dir = f"/games/{username}/noftp/{'/'.join(relative_path.split('/')[:-1])}"
+        list_endpoint = f"{NITRADO_API_URL}/services/{server_id}/gameservers/file_server/list?dir={config_dir}"
+        list_response = await client.get(list_endpoint, priority=PRIORITY_KILLFEED)
+        
+        if list_response.status != 200:
+            logger.error(f"[{server_id}] Failed to list directory ({list_response.status})")
+            return False
+        
+        list_data = await list_response.json()
+        adm_files = [entry for entry in list_data["data"]["entries"] 
+                    if entry["type"] == "file" and entry["name"].endswith(".ADM")]
+        
+        if not adm_files:
+            logger.error(f"[{server_id}] No .ADM files found in {config_dir}")
+            return False
+        
+        most_recent_file = max(adm_files, key=lambda x: x["modified_at"])
+        
+        return await download_log_file(server_id, most_recent_file, "ADM")
+    
+    except Exception as e:
+        logger.exception(f"[{server_id}] Exception during log fetch: {e}")
+        # Set default map on error
+        if server_maps is not None and server_id not in server_maps:
+            server_maps[server_id] = "chernarus"
+        return False
 
 
 def get_map_url(server_map: str = "chernarus") -> str:
@@ -150,84 +244,50 @@ async def fetch_server_rpt_log(server_id: int) -> bool:
     """
     logger.info(f"[{server_id}] Initiating RPT log download")
     
-    headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
-    
-    async with aiohttp.ClientSession() as session:
-        try:
-            # Fetch server info
-            server_info = await session.get(
-                f"https://api.nitrado.net/services/{server_id}/gameservers",
-                headers=headers
-            )
-            if server_info.status != 200:
-                logger.warning(f"[{server_id}] Failed to fetch server info for RPT ({server_info.status})")
-                return False
-            
-            details = await server_info.json()
-            username = details["data"]["gameserver"]["username"]
-            game_type = details["data"]["gameserver"]["game"].lower()
-            
-            # Determine path based on game type
-            if game_type == "dayzps":
-                rpt_dir = f"/games/{username}/noftp/dayzps/config"
-            elif game_type == "dayzxb":
-                rpt_dir = f"/games/{username}/noftp/dayzxb/config"
-            else:
-                logger.error(f"[{server_id}] Unsupported game type for RPT: {game_type}")
-                return False
-            
-            # List directory to find most recent .RPT file
-            list_endpoint = f"https://api.nitrado.net/services/{server_id}/gameservers/file_server/list?dir={rpt_dir}"
-            list_response = await session.get(list_endpoint, headers=headers)
-            
-            if list_response.status != 200:
-                logger.warning(f"[{server_id}] Failed to list RPT directory ({list_response.status})")
-                return False
-            
-            list_data = await list_response.json()
-            rpt_files = [entry for entry in list_data["data"]["entries"] 
-                        if entry["type"] == "file" and entry["name"].endswith(".RPT")]
-            
-            if not rpt_files:
-                logger.warning(f"[{server_id}] No .RPT files found in {rpt_dir}")
-                return False
-            
-            # Get most recent RPT file by modified time
-            most_recent_file = max(rpt_files, key=lambda x: x["modified_at"])
-            file_path = most_recent_file["path"]
-            
-            logger.info(f"[{server_id}] Found RPT file: {most_recent_file['name']}")
-            
-            # Get download token
-            download_endpoint = f"https://api.nitrado.net/services/{server_id}/gameservers/file_server/download?file={file_path}"
-            token_response = await session.get(download_endpoint, headers=headers)
-            
-            if token_response.status != 200:
-                logger.error(f"[{server_id}] Failed to retrieve RPT download token ({token_response.status})")
-                return False
-            
-            token_data = await token_response.json()
-            download_url = token_data["data"]["token"]["url"]
-            
-            # Download the actual file
-            file_response = await session.get(download_url, headers=headers)
-            if file_response.status != 200:
-                logger.error(f"[{server_id}] RPT file download failed ({file_response.status})")
-                return False
-            
-            # Save to local file
-            local_fp = path.abspath(path.join(path.dirname(__file__), "..", "files", f"{server_id}.RPT"))
-            os.makedirs(os.path.dirname(local_fp), exist_ok=True)
-            
-            async with aiofiles.open(local_fp, mode="wb+") as f:
-                await f.write(await file_response.read())
-            
-            logger.info(f"[{server_id}] RPT log download complete: {local_fp}")
-            return True
+    try:
+        # Server info (cached, shared with the map lookup)
+        details = await Nitrado.getServerDetails(server_id)
+        if not details:
+            logger.warning(f"[{server_id}] Failed to fetch server info for RPT")
+            return False
+        
+        username = details["username"]
+        game_type = details["game"]
         
-        except Exception as e:
-            logger.exception(f"[{server_id}] Exception during RPT log fetch: {e}")
+        # Determine path based on game type
+        if game_type == "dayzps":
+            rpt_dir = f"/games/{username}/noftp/dayzps/config"
+        elif game_type == "dayzxb":
+            rpt_dir = f"/games/{username}/noftp/dayzxb/config"
+        else:
+            logger.error(f"[{server_id}] Unsupported game type for RPT: {game_type}")
             return False
+        
+        # List directory to find most recent .RPT file
+        list_endpoint = f"{NITRADO_API_URL}/services/{server_id}/gameservers/file_server/list?dir={rpt_dir}"
+        list_response = await client.get(list_endpoint, priority=PRIORITY_KILLFEED)
+        
+        if list_response.status != 200:
+            logger.warning(f"[{server_id}] Failed to list RPT directory ({list_response.status})")
+            return False
+        
+        list_data = await list_response.json()
+        rpt_files = [entry for entry in list_data["data"]["entries"] 
+                    if entry["type"] == "file" and entry["name"].endswith(".RPT")]
+        
+        if not rpt_files:
+            logger.warning(f"[{server_id}] No .RPT files found in {rpt_dir}")
+            return False
+        
+        # Get most recent RPT file by modified time
+        most_recent_file = max(rpt_files, key=lambda x: x["modified_at"])
+        logger.info(f"[{server_id}] Found RPT file: {most_recent_file['name']}")
+        
+        return await download_log_file(server_id, most_recent_file, "RPT")
+    
+    except Exception as e:
+        logger.exception(f"[{server_id}] Exception during RPT log fetch: {e}")
+        return False
 
 
 def get_map_url(server_map: str = "chernarus") -> str:
@@ -0,0 +1,127 @@
+"""
+In-memory rank engine for kill and death counts.
+Keeps how many players have each count in a Fenwick (binary indexed) tree, so
+"how many players have more kills than X" takes O(log max_count) instead of a
+COUNT(*) over the stats table. The database layer feeds it every committed
+change, which keeps it identical to counting rows in SQL.
+"""
+import threading
+from collections import Counter
+from typing import Any, Iterable, Tuple
+
+
+def is_plain(value: Any) -> bool:
+    """Values the Fenwick tree holds: non-negative integers."""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def sqlite_order(value: Any) -> Tuple[int, Any]:
+    """Sort key matching SQLite's ordering of numbers, then text, then blobs."""
+    if isinstance(value, (int, float)):
+        return 0, value
+    if isinstance(value, str):
+        return 1, value
+    return 2, bytes(value)
+
+
+class RankIndex:
+    """Order-statistic counts of one stats column (kills or deaths)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self._reset(0)
+
+    def _reset(self, max_value: int) -> None:
+        self.size = 1
+        while self.size <= max_value:
+            self.size *= 2
+        self.counts = [0] * self.size      # players per value
+        self.tree = [0] * (self.size + 1)  # Fenwick tree over counts, 1-indexed
+        self.total = 0
+        # Values the tree can't hold (NULL never compares greater and is skipped;
+        # negatives, fractions or text only appear after manual edits and are
+        # counted directly, which keeps results exact)
+        self.others = Counter()
+
+    def _build_tree(self) -> None:
+        tree = [0] * (self.size + 1)
+        for index, count in enumerate(self.counts, 1):
+            tree[index] += count
+            parent = index + (index & -index)
+            if parent <= self.size:
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def _grow(self, value: int) -> None:
+        size = self.size
+        while size <= value:
+            size *= 2
+        self.counts.extend([0] * (size - self.size))
+        self.size = size
+        self._build_tree()
+
+    def _add(self, value, delta: int) -> None:
+        if value is None:
+            return
+        if not is_plain(value):
+            self.others[value] += delta
+            if not self.others[value]:
+                del self.others[value]
+            return
+        if value >= self.size:
+            self._grow(value)
+        self.counts[value] += delta
+        self.total += delta
+        index = value + 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def rebuild(self, values: Iterable) -> int:
+        """
+        Replace the index with the given column values (one per player).
+
+        Returns:
+            int: Number of players indexed
+        """
+        values = list(values)
+        with self.lock:
+            plain = [value for value in values if is_plain(value)]
+            self._reset(max(plain, default=0))
+            for value in plain:
+                self.counts[value] += 1
+            self.total = len(plain)
+            self._build_tree()
+            self.others.update(value for value in values if value is not None and not is_plain(value))
+            self.loaded = True
+        return len(values)
+
+    def replace(self, old_values: Iterable, new_values: Iterable) -> None:
+        """Swap the values of changed rows: remove the old ones and index the new ones."""
+        with self.lock:
+            for value in old_values:
+                self._add(value, -1)
+            for value in new_values:
+                self._add(value, 1)
+
+    def count_above(self, value) -> int:
+        """
+        Number of players whose value is strictly greater than `value`,
+        the same as `SELECT COUNT(*) FROM stats WHERE column > value`.
+        """
+        if value is None:
+            return 0
+        key = sqlite_order(value)
+        with self.lock:
+            above = sum(count for other, count in self.others.items() if sqlite_order(other) > key)
+            if key[0] != 0:
+                return above
+            if value < 0:
+                return self.total + above
+            index = min(int(value), self.size - 1) + 1
+            at_or_below = 0
+            while index > 0:
+                at_or_below += self.tree[index]
+                index -= index & -index
+            return self.total - at_or_below + above
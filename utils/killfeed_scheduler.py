@@ -0,0 +1,146 @@
+"""
+Adaptive per-server polling schedule for the killfeed.
+Each server has its own interval and next run time. Servers with recent activity
+are polled more often, idle servers back off, and a requests-per-minute budget
+caps the total Nitrado API calls spent on polling. By default the budget is what
+the old fixed loop spent (every server every 5 minutes), so adaptive polling only
+moves calls from idle servers to active ones.
+"""
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Interval of the fixed polling loop this replaced; the default budget matches its call rate
+BASELINE_INTERVAL = 300
+# Minutes of calls the budget can save up, enough for polling every server at once on startup
+BURST_MINUTES = BASELINE_INTERVAL / 60
+
+
+class ServerSchedule:
+    """Polling state of a single server."""
+
+    def __init__(self, interval: float, next_run: float):
+        self.interval = interval
+        self.next_run = next_run
+        self.online_players = 0  # From the latest PlayerList block, which DayZ writes every 5 minutes
+
+
+class PollScheduler:
+    """Decides which servers are due for a poll and adapts their intervals."""
+
+    def __init__(self):
+        self.floor = getattr(Config, "POLL_INTERVAL_FLOOR", 60)
+        self.ceiling = getattr(Config, "POLL_INTERVAL_CEILING", 600)
+        self.initial = min(max(getattr(Config, "POLL_INTERVAL_INITIAL", 300), self.floor), self.ceiling)
+        self.backoff = getattr(Config, "POLL_IDLE_BACKOFF", 1.5)
+        self.configured_budget = getattr(Config, "POLL_RPM_BUDGET", 0)  # 0 = match the old fixed loop
+        self.calls_per_poll = getattr(Config, "POLL_CALLS_PER_POLL", 4)
+        self.servers: Dict[str, ServerSchedule] = {}
+        self.rpm_budget = float(self.configured_budget)
+        # Token bucket of API calls, refilled at rpm_budget per minute
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+
+    @property
+    def capacity(self) -> float:
+        """Most API calls the bucket can hold (always at least one poll)."""
+        return max(float(self.calls_per_poll), self.rpm_budget * BURST_MINUTES)
+
+    def sync(self, server_ids: Iterable, now: Optional[float] = None) -> None:
+        """
+        Track newly registered servers (due immediately) and forget removed ones.
+
+        Args:
+            server_ids: IDs of all currently registered servers
+            now: Current monotonic time
+        """
+        now = time.monotonic() if now is None else now
+        current = {str(server_id) for server_id in server_ids}
+        for server_id in current - self.servers.keys():
+            self.servers[server_id] = ServerSchedule(self.initial, now)
+        for server_id in self.servers.keys() - current:
+            del self.servers[server_id]
+        if not self.configured_budget:
+            # Same calls per minute as polling every server every BASELINE_INTERVAL seconds
+            old_capacity = self.capacity
+            self.rpm_budget = len(self.servers) * self.calls_per_poll * 60 / BASELINE_INTERVAL
+            # Added servers bring their first poll with them, removed ones take theirs away
+            self.tokens = min(self.capacity, self.tokens + max(0.0, self.capacity - old_capacity))
+
+    def refill(self, now: float) -> None:
+        """Add the API calls earned since the last refill to the budget."""
+        elapsed = max(0.0, now - self.refilled_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rpm_budget / 60)
+        self.refilled_at = now
+
+    def due(self, now: Optional[float] = None, exclude: Iterable = ()) -> List[str]:
+        """
+        Get the servers to poll now, most overdue first, within the API budget.
+        Due servers that do not fit the budget stay due and are picked up on a later tick.
+
+        Args:
+            now: Current monotonic time
+            exclude: Server IDs to skip (e.g. polls still in flight)
+
+        Returns:
+            List[str]: Server IDs to poll
+        """
+        now = time.monotonic() if now is None else now
+        self.refill(now)
+        skip = {str(server_id) for server_id in exclude}
+        waiting = sorted(
+            (schedule.next_run, server_id)
+            for server_id, schedule in self.servers.items()
+            if schedule.next_run <= now and server_id not in skip
+        )
+        selected = []
+        for _, server_id in waiting:
+            if self.tokens < self.calls_per_poll:
+                logger.debug(f"Poll budget exhausted, deferring {len(waiting) - len(selected)} server(s)")
+                break
+            self.tokens -= self.calls_per_poll
+            selected.append(server_id)
+        return selected
+
+    def record(self, server_id, event_lines: int, online_players: Optional[int], now: Optional[float] = None) -> float:
+        """
+        Adapt a server's interval after a poll and schedule its next run.
+        New events or online players halve the interval, an idle poll backs it off.
+
+        Args:
+            server_id: The server ID
+            event_lines: New ADM lines showing activity (not PlayerList blocks or bare timestamps)
+            online_players: Players in the PlayerList block of this poll, or None if it had
+                none (the last count seen is kept)
+            now: Current monotonic time
+
+        Returns:
+            float: Seconds until the next poll
+        """
+        now = time.monotonic() if now is None else now
+        schedule = self.servers.get(str(server_id))
+        if schedule is None:
+            return 0.0
+        if online_players is not None:
+            schedule.online_players = online_players
+        if event_lines > 0 or schedule.online_players > 0:
+            schedule.interval = max(self.floor, schedule.interval / 2)
+        else:
+            schedule.interval = min(self.ceiling, schedule.interval * self.backoff)
+        schedule.next_run = now + schedule.interval
+        logger.debug(f"[{server_id}] Next poll in {schedule.interval:.0f}s "
+                     f"(events={event_lines}, online={schedule.online_players})")
+        return schedule.interval
+
+    def record_failure(self, server_id, now: Optional[float] = None) -> float:
+        """Back off a server whose poll failed, keeping its last online count."""
+        now = time.monotonic() if now is None else now
+        schedule = self.servers.get(str(server_id))
+        if schedule is None:
+            return 0.0
+        schedule.interval = min(self.ceiling, schedule.interval * self.backoff)
+        schedule.next_run = now + schedule.interval
+        return schedule.interval
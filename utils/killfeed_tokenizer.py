@@ -0,0 +1,228 @@
+"""
+Single-pass tokenizer for ADM log lines.
+Each line is classified once (dispatching on the fixed "HH:MM:SS | " prefix and the
+start of the message) and turned into a compact typed record, so the killfeed loop
+never re-scans the raw string with per-field regexes.
+Player lines are classified by a declarative rule table compiled into one regex,
+so adding an event type adds a table entry rather than another substring test.
+"""
+import re
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+# Event kinds, in the order the killfeed has always classified them
+CONNECT = "connect"
+DISCONNECT = "disconnect"
+SUICIDE = "suicide"
+EXPLOSION = "explosion"
+BLEED_OUT = "bleed_out"
+WOLF = "wolf"
+BEAR = "bear"
+FALL = "fall"
+PVP = "pvp"
+DEATH = "death"
+# Structural lines
+PLAYER_LIST = "player_list"        # "##### PlayerList log: N players"
+PLAYER_LIST_END = "player_list_end"  # "#####"
+STATE_MACHINE = "state_machine"    # "[StateMachine]: Player Name (dpnid ... uid ...)"
+OTHER = "other"
+
+WOLF_MARKERS = ("Animal_CanisLupus_Grey", "Animal_CanisLupus_White")
+BEAR_MARKERS = ("Animal_UrsusArctos", "Brown Bear")
+
+TIME_PATTERN = re.compile(r"(\d+:\d+:\d+)")
+PLAYER_PATTERN = re.compile(r'Player\s+"([^"]+)"')
+POSITION_PATTERN = re.compile(r"pos=<([^>]+)>")
+PLAYER_COUNT_PATTERN = re.compile(r"(\d+)(?=\s*players)")
+CONNECTION_UID_PATTERN = re.compile(r"\(id=([A-F0-9]+)\)")
+STATE_MACHINE_PATTERN = re.compile(r"\[StateMachine\]: Player\s+(.+?)\s+\(dpnid\s+\d+\s+uid\s+([A-F0-9]*)\)")
+VICTIM_PATTERN = re.compile(r'Player\s+"([^"]+)"\s+(?:\(DEAD\))?\s*\(id=[^)]+\s+pos=<[^>]+>\)\s+killed by')
+KILLER_PATTERN = re.compile(r'killed by Player\s+"([^"]+)"')
+WEAPON_PATTERN = re.compile(r" with (.*) from")
+WEAPON_FALLBACK_PATTERN = re.compile(r"with (.*)")
+DISTANCE_PATTERN = re.compile(r"from ([0-9.]+) meters")
+BODYPART_PATTERN = re.compile(r"into ([^(]+)")
+EXPLOSION_PATTERN = re.compile(r"\[HP: 0\] hit by explosion \((.*)\)")
+
+
+class AdmEvent(NamedTuple):
+    """A classified ADM line."""
+    kind: str
+    time: str = ""
+    actor: str = ""        # Player the line is about (the killer for PvP)
+    victim: str = ""       # Player who died
+    positions: Tuple[str, ...] = ()  # Raw "x, y, z" strings in line order
+    weapon: str = ""
+    distance: float = 0.0
+    bodypart: str = ""
+    uid: str = ""
+    detail: str = ""       # Explosion type
+    players: int = -1      # Player count of a PlayerList header
+
+
+def split_prefix(line: str) -> Tuple[str, str]:
+    """Split "HH:MM:SS | message" into (time, message); falls back to a time search."""
+    if len(line) > 11 and line[2] == ":" and line[5] == ":" and line[8:11] == " | ":
+        return line[:8], line[11:]
+    match = TIME_PATTERN.search(line)
+    return (match.group(1) if match else ""), line
+
+
+def position_xz(position: str) -> Optional[Tuple[float, float]]:
+    """Get the (x, z) map coordinates of a raw "x, y, z" position."""
+    parts = position.split(", ")
+    if len(parts) != 3:
+        return None
+    try:
+        return float(parts[0]), float(parts[2])
+    except ValueError:
+        return None
+
+
+def extract_distance(line: str) -> float:
+    """Distance in meters of a kill line, 0.0 if missing."""
+    match = DISTANCE_PATTERN.search(line)
+    try:
+        return round(float(match.group(1)), 2) if match else 0.0
+    except ValueError:
+        return 0.0
+
+
+def extract_weapon(line: str) -> str:
+    """Raw weapon name of a kill line."""
+    match = WEAPON_PATTERN.search(line) or WEAPON_FALLBACK_PATTERN.search(line)
+    return match.group(1) if match else "Unknown"
+
+
+class EventRule(NamedTuple):
+    """
+    A player line event: the line is of this kind if it contains any of `markers`
+    (and every string in `requires`). Earlier rules win when several match.
+    """
+    kind: str
+    markers: Tuple[str, ...]
+    role: str = "victim"           # AdmEvent field that receives the quoted player name
+    requires: Tuple[str, ...] = ()
+
+
+# Player line events, in the order the killfeed has always classified them
+PLAYER_EVENT_RULES = (
+    EventRule(DISCONNECT, ("has been disconnected",), role="actor"),
+    EventRule(CONNECT, ("is connected",), role="actor", requires=("(id=",)),
+    EventRule(SUICIDE, ("committed suicide",)),
+    EventRule(EXPLOSION, ("hit by explosion",)),
+    EventRule(BLEED_OUT, ("bled out",)),
+    EventRule(WOLF, WOLF_MARKERS),
+    EventRule(BEAR, BEAR_MARKERS),
+    EventRule(FALL, ("hit by FallDamage",)),
+    EventRule(PVP, ("killed by Player",), role="actor"),
+    EventRule(DEATH, ("died",)),
+)
+
+
+class EventMatcher:
+    """
+    Rule table compiled into one regex alternation of every marker, tried in rule
+    order. The matched text maps back to its rule through a dict, so a line costs
+    one scan however many rules there are; scanning resumes one character after
+    each hit so overlapping markers are still seen.
+    """
+
+    def __init__(self, rules: Tuple[EventRule, ...]):
+        self.rules = tuple(rules)
+        self.marker_rules: Dict[str, int] = {}
+        for index, rule in enumerate(self.rules):
+            for marker in rule.markers:
+                self.marker_rules.setdefault(marker, index)
+        # No capture groups: they would stop re from using its literal prefix search
+        self.pattern = re.compile("|".join(re.escape(marker) for marker in self.marker_rules))
+
+    def match(self, line: str) -> Optional[EventRule]:
+        """Highest-priority rule matching the line, or None."""
+        best = len(self.rules)
+        found = self.pattern.search(line)
+        while found:
+            index = self.marker_rules[found.group()]
+            if index < best and all(required in line for required in self.rules[index].requires):
+                best = index
+                if best == 0:
+                    break
+            found = self.pattern.search(line, found.start() + 1)
+        return self.rules[best] if best < len(self.rules) else None
+
+
+def build_connect(time: str, line: str, name: str) -> AdmEvent:
+    uid = CONNECTION_UID_PATTERN.search(line)
+    return AdmEvent(CONNECT, time, actor=name, uid=uid.group(1) if uid else "")
+
+
+def build_explosion(time: str, line: str, name: str) -> AdmEvent:
+    explosion = EXPLOSION_PATTERN.search(line)
+    return AdmEvent(EXPLOSION, time, victim=name, detail=explosion.group(1) if explosion else "Unknown")
+
+
+def build_pvp(time: str, line: str, name: str) -> AdmEvent:
+    killer = KILLER_PATTERN.search(line)
+    victim = VICTIM_PATTERN.search(line)
+    bodypart = BODYPART_PATTERN.search(line)
+    return AdmEvent(
+        PVP, time,
+        actor=killer.group(1) if killer else "",
+        victim=victim.group(1) if victim else "",
+        positions=tuple(POSITION_PATTERN.findall(line)),
+        weapon=extract_weapon(line),
+        distance=extract_distance(line),
+        bodypart=bodypart.group(1) if bodypart else "",
+    )
+
+
+# Kinds whose record needs more than the player name; the rest are built from the rule's role
+EVENT_BUILDERS: Dict[str, Callable[[str, str, str], AdmEvent]] = {
+    CONNECT: build_connect,
+    EXPLOSION: build_explosion,
+    PVP: build_pvp,
+}
+
+player_events = EventMatcher(PLAYER_EVENT_RULES)
+
+
+def classify_player_line(time: str, line: str, name: str) -> AdmEvent:
+    """Classify a message starting with a quoted player name."""
+    rule = player_events.match(line)
+    if rule is not None:
+        builder = EVENT_BUILDERS.get(rule.kind)
+        if builder is not None:
+            return builder(time, line, name)
+        return AdmEvent(rule.kind, time, **{rule.role: name})
+    if "pos=<" in line:
+        return AdmEvent(OTHER, time, actor=name, positions=tuple(POSITION_PATTERN.findall(line)))
+    return AdmEvent(OTHER, time, actor=name)
+
+
+def tokenize_line(raw_line: str) -> AdmEvent:
+    """
+    Classify one ADM line.
+
+    Args:
+        raw_line: A line of the ADM log
+
+    Returns:
+        AdmEvent: The typed record for the line
+    """
+    time, line = split_prefix(raw_line.strip())
+    first = line[:1]
+
+    if first == "P" and line.startswith("Player"):
+        name = PLAYER_PATTERN.match(line)
+        if name:
+            return classify_player_line(time, line, name.group(1).strip())
+    elif first == "#" and line.startswith("#####"):
+        if "PlayerList log:" in line:
+            count = PLAYER_COUNT_PATTERN.search(line)
+            return AdmEvent(PLAYER_LIST, time, players=int(count.group(1)) if count else 0)
+        return AdmEvent(PLAYER_LIST_END, time)
+    elif "[StateMachine]:" in line:
+        match = STATE_MACHINE_PATTERN.search(line)
+        if match:
+            return AdmEvent(STATE_MACHINE, time, actor=match.group(1).strip(), uid=match.group(2).strip())
+
+    return AdmEvent(OTHER, time)
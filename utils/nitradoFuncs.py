@@ -1,55 +1,125 @@
 from config import Config
+import asyncio
 import aiohttp
 import json
-import requests
-from utils import killfeed_database
+import time
+from utils.killfeed_db_executor import database
+from utils.nitrado_client import client, NITRADO_API_URL, PRIORITY_KILLFEED, PRIORITY_ADMIN
+
+# Seconds a cached /gameservers response is reused for metadata lookups (username, game, map)
+METADATA_TTL = getattr(Config, "NITRADO_METADATA_TTL", 900)
+
+# Seconds allowed for one settings update attempt (bans, priority)
+SETTINGS_TIMEOUT = getattr(Config, "NITRADO_SETTINGS_TIMEOUT", 30)
+
+# Cached /gameservers metadata per server: {server_id: {"fetched_at", "username", "game", "map", "settings"}}
+gameserver_cache = {}
+gameserver_locks = {}
+
+
+def mapFromSettings(settings_dict):
+    """Extract map name from a parsed /gameservers response"""
+    # Try to get map from query section first
+    map_value = settings_dict['data']['gameserver']['query'].get('map', '')
+    
+    # Extract map name from full mission string (e.g., "dayzOffline.chernarusplus" -> "chernarus")
+    if map_value:
+        if 'livonia' in map_value.lower():
+            return 'livonia'
+        elif 'chernarusplus' in map_value.lower() or 'chernarus' in map_value.lower():
+            return 'chernarus'
+        elif 'sakhal' in map_value.lower() or 'sahkhal' in map_value.lower():
+            return 'sahkal'
+    
+    print(f"Applying for {map_value}")
+    
+    return 'chernarus'  # Default to Chernarus
+
 
 class NitradoFunctions():
 
-    async def getSettings(self, id):
-        headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
-        async with aiohttp.ClientSession() as ses:
-            async with ses.get(f"https://api.nitrado.net/services/{id}/gameservers", headers=headers) as e:
-                return await e.content.read()
+    async def getSettings(self, id, priority=PRIORITY_ADMIN):
+        """Fetch the current /gameservers response and refresh the metadata cache with it"""
+        async with client.get(f"{NITRADO_API_URL}/services/{id}/gameservers", priority=priority) as e:
+            data = await e.content.read()
+            if e.status == 200:
+                self.cacheSettings(id, data)
+            return data
 
-    async def getMapFromSettings(self, id):
-        """Extract map name from Nitrado API settings response"""
+    def cacheSettings(self, id, data):
+        """Store metadata from a raw /gameservers response in the cache"""
         try:
-            data = await self.getSettings(id)
             settings_dict = json.loads(data)
-            
-            # Try to get map from query section first
-            map_value = settings_dict['data']['gameserver']['query'].get('map', '')
-            
-            # Extract map name from full mission string (e.g., "dayzOffline.chernarusplus" -> "chernarus")
-            if map_value:
-                if 'livonia' in map_value.lower():
-                    return 'livonia'
-                elif 'chernarusplus' in map_value.lower() or 'chernarus' in map_value.lower():
-                    return 'chernarus'
-                elif 'sakhal' in map_value.lower() or 'sahkhal' in map_value.lower():
-                    return 'sahkal'
-            
-            print(f"Applying for {map_value}")
-            
+            gameserver = settings_dict['data']['gameserver']
+            try:
+                current_map = mapFromSettings(settings_dict)
+            except Exception as e:
+                print(f"Error extracting map from settings: {e}")
+                current_map = 'chernarus'  # Default to Chernarus on error
+            gameserver_cache[str(id)] = {
+                "fetched_at": time.monotonic(),
+                "username": gameserver['username'],
+                "game": gameserver['game'].lower(),
+                "map": current_map,
+                "settings": data,
+            }
+        except Exception as e:
+            print(f"Error caching settings for {id}: {e}")
+
+    async def getServerDetails(self, id, max_age=None):
+        """
+        Get cached server metadata (username, game, map, raw settings).
+        Only calls /gameservers when the cached entry is older than max_age seconds.
+        Returns None if the metadata could not be fetched.
+        """
+        max_age = METADATA_TTL if max_age is None else max_age
+        key = str(id)
+        cached = gameserver_cache.get(key)
+        if cached and time.monotonic() - cached["fetched_at"] < max_age:
+            return cached
+        
+        # One refresh per server at a time; concurrent callers reuse its result
+        lock = gameserver_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = gameserver_cache.get(key)
+            if cached and time.monotonic() - cached["fetched_at"] < max_age:
+                return cached
+            await self.getSettings(id, PRIORITY_KILLFEED)
+            cached = gameserver_cache.get(key)
+            return cached if cached and time.monotonic() - cached["fetched_at"] < max_age else None
+
+    async def getMapFromSettings(self, id):
+        """Extract map name from the cached Nitrado API settings response"""
+        try:
+            details = await self.getServerDetails(id)
+            if details:
+                return details["map"]
             return 'chernarus'  # Default to Chernarus
         except Exception as e:
             print(f"Error extracting map from settings: {e}")
             return 'chernarus'  # Default to Chernarus on error
 
     async def postSetting(self, category, key, value, id):
-        headers = {"Authorization": f"Bearer {Config.NITRADO_TOKEN}"}
+        """
+        Update one gameserver setting on the shared async client.
+        Retries and rate limiting are handled by the client; returns the HTTP status,
+        or None if the request could not be completed.
+        """
         data = {
             "category": category,
             "key": key,
             "value": value,
         }
-        response = requests.post(
-            f"https://api.nitrado.net/services/{id}/gameservers/settings",
-            headers=headers,
-            data=data
-        )
-        return response.status_code
+        try:
+            async with client.post(
+                f"{NITRADO_API_URL}/services/{id}/gameservers/settings",
+                data=data,
+                timeout=aiohttp.ClientTimeout(total=SETTINGS_TIMEOUT),
+            ) as response:
+                return response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error posting setting {category}.{key} for {id}: {e!r}")
+            return None
 
     async def banPlayer(self, id, username, ban):
         data = await self.getSettings(id)
@@ -63,7 +133,7 @@ class NitradoFunctions():
             if username in currentBans:
                 return "User already banned"
 
-            device_id = killfeed_database.get_device_id_from_stats(username)
+            device_id = await database.get_device_id_from_stats(username)
 
             banData += f'\r\n{username}'
             value = banData.replace("\\n", '\n').replace("\\r", '\r')
@@ -71,10 +141,10 @@ class NitradoFunctions():
 
             if resp == 200:
                 if device_id:
-                    killfeed_database.insert_device_ban(username, device_id)
+                    await database.insert_device_ban(username, device_id)
                     msg = f"Successfully added {username} (Device ID {device_id}) to the ban list"
                 else:
-                    killfeed_database.insert_device_ban(username, None)
+                    await database.insert_device_ban(username, None)
                     msg = f"Successfully added {username} to the ban list. Note: No device ID associated with the player."
                 print(msg)
                 return msg
@@ -93,7 +163,7 @@ class NitradoFunctions():
             resp = await self.postSetting('general', 'bans', value, id)
 
             if resp == 200:
-                killfeed_database.unban_username(username)
+                await database.unban_username(username)
                 msg = f"Successfully removed {username} from the ban list"
                 print(msg)
                 return msg
@@ -0,0 +1,257 @@
+"""
+Shared HTTP client for the Nitrado API.
+One pooled aiohttp session is reused for every Nitrado request so polls do not
+pay a TCP/TLS handshake per call. Every request passes through a rate governor
+that spends from a token bucket, honours 429/Retry-After and quota headers and
+serves killfeed requests before admin commands.
+"""
+import aiohttp
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+NITRADO_API_URL = "https://api.nitrado.net"
+
+# Request priorities; lower values are served first
+PRIORITY_KILLFEED = 0
+PRIORITY_ADMIN = 1
+
+# Responses worth retrying after a backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateGovernor:
+    """
+    Token bucket shared by all Nitrado requests.
+    Waiters are served in priority order, and a 429 or exhausted quota pauses
+    the whole bucket until the API allows requests again.
+    """
+
+    def __init__(self):
+        self.rate = getattr(Config, "NITRADO_RATE_LIMIT", 60) / 60  # tokens per second
+        self.capacity = float(getattr(Config, "NITRADO_RATE_BURST", 10))
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        """Condition used to wake waiters, created on first use inside the running loop."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def _wait_time(self, entry) -> Optional[float]:
+        """Seconds until `entry` may take a token, 0 if it may now, None if it is not next in line."""
+        now = time.monotonic()
+        self._refill(now)
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.waiters[0] != entry:
+            return None
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self, priority: int = PRIORITY_ADMIN) -> None:
+        """Wait for a token; higher priority waiters (lower value) go first."""
+        entry = (priority, next(self.sequence))
+        async with self.condition:
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    delay = self._wait_time(entry)
+                    if delay == 0:
+                        heapq.heappop(self.waiters)
+                        self.tokens -= 1
+                        return
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self.waiters:
+                    self.waiters.remove(entry)
+                    heapq.heapify(self.waiters)
+                raise
+            finally:
+                self.condition.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds`."""
+        until = time.monotonic() + seconds
+        if until > self.blocked_until:
+            self.blocked_until = until
+            logger.warning(f"Nitrado rate limit reached, pausing requests for {seconds:.1f}s")
+
+    def observe(self, response: aiohttp.ClientResponse) -> None:
+        """Adjust the bucket from the quota headers of a response."""
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0:
+            reset = headers.get("X-RateLimit-Reset")
+            try:
+                wait = float(reset) - time.time() if reset else 60.0
+            except ValueError:
+                wait = 60.0
+            self.pause(max(1.0, wait))
+
+
+class GovernedRequest:
+    """Awaitable / async context manager wrapping a governed request, like aiohttp's own."""
+
+    def __init__(self, client: "NitradoClient", method: str, url: str, priority: int, kwargs: dict):
+        self.client = client
+        self.method = method
+        self.url = url
+        self.priority = priority
+        self.kwargs = kwargs
+        self.response: Optional[aiohttp.ClientResponse] = None
+
+    def __await__(self):
+        return self.client.request(self.method, self.url, self.priority, **self.kwargs).__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self.response = await self.client.request(self.method, self.url, self.priority, **self.kwargs)
+        return self.response
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self.response is not None:
+            self.response.release()
+
+
+class NitradoClient:
+    """Long-lived, lazily created aiohttp session with a tuned connection pool."""
+
+    def __init__(self, token: Optional[str] = None):
+        self.token = token if token is not None else Config.NITRADO_TOKEN
+        self.max_connections = getattr(Config, "NITRADO_MAX_CONNECTIONS", 20)
+        self.max_connections_per_host = getattr(Config, "NITRADO_MAX_CONNECTIONS_PER_HOST", 10)
+        self.dns_cache_ttl = getattr(Config, "NITRADO_DNS_CACHE_TTL", 300)
+        self.keepalive_timeout = getattr(Config, "NITRADO_KEEPALIVE_TIMEOUT", 60)
+        self.timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=getattr(Config, "NITRADO_CONNECT_TIMEOUT", 10),
+            sock_read=getattr(Config, "NITRADO_READ_TIMEOUT", 60),
+        )
+        self.max_retries = getattr(Config, "NITRADO_MAX_RETRIES", 3)
+        self.backoff_base = getattr(Config, "NITRADO_BACKOFF_BASE", 1.0)
+        self.backoff_cap = getattr(Config, "NITRADO_BACKOFF_CAP", 60.0)
+        self.governor = RateGovernor()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use inside the running loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"Authorization": f"Bearer {self.token}"},
+            )
+            logger.debug("Opened shared Nitrado HTTP session")
+        return self._session
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def request(self, method: str, url: str, priority: int = PRIORITY_ADMIN, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Send a request through the rate governor, retrying 429s, 5xx responses and
+        connection errors with jittered exponential backoff.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            priority: PRIORITY_KILLFEED or PRIORITY_ADMIN
+            **kwargs: Passed to aiohttp
+
+        Returns:
+            aiohttp.ClientResponse: The final response (the last one if retries ran out)
+        """
+        attempt = 0
+        while True:
+            await self.governor.acquire(priority)
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning(f"Nitrado {method} failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                self.governor.observe(response)
+                if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self.backoff(attempt)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status == 429:
+                    self.governor.pause(retry_after if retry_after is not None else delay)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                response.release()
+                logger.warning(f"Nitrado {method} returned {response.status}, retrying in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def get(self, url: str, priority: int = PRIORITY_ADMIN, **kwargs) -> GovernedRequest:
+        """Send a GET request. Usable with `await` or `async with`."""
+        return GovernedRequest(self, "GET", url, priority, kwargs)
+
+    def post(self, url: str, priority: int = PRIORITY_ADMIN, **kwargs) -> GovernedRequest:
+        """Send a POST request. Usable with `await` or `async with`."""
+        return GovernedRequest(self, "POST", url, priority, kwargs)
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.debug("Closed shared Nitrado HTTP session")
+        self._session = None
+
+
+# Shared instance used by the cogs and Nitrado helpers
+client = NitradoClient()